@@ -0,0 +1,61 @@
+"""Benchmark the parsers of the default formats.
+
+Compare them with the former implementations::
+
+    $ python benchmarks/formats.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import base64
+import datetime
+import timeit
+
+from oas.schema.formats import default_formats
+
+
+def _strptime_date(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _pyrfc3339_date_time(value):
+    import pyrfc3339
+
+    return pyrfc3339.parse(value, utc=True).replace(tzinfo=None)
+
+
+CASES = [
+    ('date', '2020-01-02', _strptime_date),
+    ('date-time', '2020-01-02T03:04:05.123456+09:00', _pyrfc3339_date_time),
+    ('byte', base64.b64encode(b'x' * 64).decode('ascii'), base64.b64decode),
+]
+
+
+def bench(func, value, number):
+    return min(timeit.repeat(lambda: func(value), number=number, repeat=5))
+
+
+def main(number=100000):
+    print(
+        '{:<10} {:>12} {:>12} {:>8}'.format('format', 'before', 'after', 'x')
+    )
+    for name, value, reference in CASES:
+        try:
+            before = bench(reference, value, number)
+        except ImportError:
+            continue
+        after = bench(default_formats[name], value, number)
+        print(
+            '{:<10} {:>10.3f}us {:>10.3f}us {:>8.1f}'.format(
+                name,
+                before / number * 1e6,
+                after / number * 1e6,
+                before / after,
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
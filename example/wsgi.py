@@ -17,6 +17,7 @@ _uri_template_re = re.compile(r'<(?:[^:]+:)?([^>]+)>')
 class FlaskOAS:
     def __init__(self, spec_dict):
         self.spec = oas.create_spec_from_dict(spec_dict)
+        self.schema_unmarshaler = oas.SchemaUnmarshaler(spec=self.spec)
 
     @property
     def request(self):
@@ -33,8 +34,9 @@ class FlaskOAS:
         operation = self.spec.get_operation(
             oas_req.uri_template, oas_req.method, oas_req.media_type
         )
-        schema_unmarshaler = oas.SchemaUnmarshaler(spec=self.spec)
-        return oas.unmarshal_request(schema_unmarshaler, oas_req, operation)
+        return oas.unmarshal_request(
+            self.schema_unmarshaler, oas_req, operation
+        )
 
 
 class FlaskRequestAdapter(oas.Request):
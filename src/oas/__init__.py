@@ -4,6 +4,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from .request.models import Request  # noqa: F401
+from .request.models import UnmarshaledRequest  # noqa: F401
 from .request.unmarshalers import unmarshal_request  # noqa: F401
 from .schema.unmarshalers import SchemaUnmarshaler  # noqa: F401
 from .spec import create_spec_from_dict  # noqa: F401
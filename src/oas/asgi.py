@@ -0,0 +1,389 @@
+"""ASGI middleware, which requires Python 3.5 or later."""
+import asyncio
+import json
+
+from .exceptions import MalformedJSON
+from .exceptions import UndocumentedMediaType
+from .exceptions import UnmarshalError
+from .executors import DEFAULT_THRESHOLD
+from .executors import submit_request_body
+from .request.models import Request
+from .request.unmarshalers import to_unmarshaled_request
+from .request.unmarshalers import unmarshal_operation_parameters
+from .request.unmarshalers import unmarshal_operation_request_body
+from .schema.unmarshalers import SchemaUnmarshaler
+from .utils import cached_property
+from .utils import is_json_media_type
+from .utils import load_media
+from .utils import parse_cookie
+from .utils import parse_media_type
+from .utils import parse_query
+from .wsgi import ENVIRON_OPERATION
+from .wsgi import ENVIRON_PARAMETERS
+from .wsgi import ENVIRON_REQUEST_BODY
+from .wsgi import MALFORMED_JSON_ERROR
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+SCOPE_OPERATION = ENVIRON_OPERATION
+SCOPE_PARAMETERS = ENVIRON_PARAMETERS
+SCOPE_REQUEST_BODY = ENVIRON_REQUEST_BODY
+
+
+class OASMiddleware(object):
+    """ASGI middleware to unmarshal HTTP requests.
+
+    The parameters are unmarshaled before receiving the request body, so
+    that invalid requests are rejected without buffering the body.  The
+    request body is received with the size limit, and then unmarshaled.
+    The results are stored in the scope with the keys
+    :data:`SCOPE_PARAMETERS` and :data:`SCOPE_REQUEST_BODY`, and the
+    received body is replayed to the application.  Only JSON request
+    bodies are unmarshaled.  The request body of the other documented
+    media types, e.g. forms, is not received but left to the
+    application, and :data:`SCOPE_REQUEST_BODY` is ``None``.
+
+    :param app: The ASGI application.
+    :param spec: :class:`~oas.spec.Spec`.
+    :param schema_unmarshaler: :class:`~oas.SchemaUnmarshaler` used for
+        all the requests.
+    :param max_body_size: The maximum size of the request body in bytes.
+    :param executor: The executor to unmarshal large request bodies.  See
+        :func:`unmarshal_request_body_async`.  A process pool requires
+        Python 3.7 or later.  See :func:`~oas.executors.initialize_worker`.
+    :param offload_threshold: The content length from which request
+        bodies are unmarshaled by ``executor``.
+    :param max_message_length: The maximum length of the error messages
+        in the response.
+    :param instance_repr: Whether to include ``repr`` of the invalid
+        instances in the error messages.  See
+        :meth:`~oas.exceptions.UnmarshalError.to_dict`.
+    """
+
+    def __init__(
+        self,
+        app,
+        spec,
+        schema_unmarshaler=None,
+        max_body_size=None,
+        executor=None,
+        offload_threshold=DEFAULT_THRESHOLD,
+        max_message_length=None,
+        instance_repr=True,
+    ):
+        if schema_unmarshaler is None:
+            schema_unmarshaler = SchemaUnmarshaler(spec=spec)
+        # Compile up front rather than by the first requests in parallel.
+        spec.compile(schema_unmarshaler)
+
+        self.app = app
+        self.spec = spec
+        self.schema_unmarshaler = schema_unmarshaler
+        self.max_body_size = max_body_size
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.max_message_length = max_message_length
+        self.instance_repr = instance_repr
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        path = scope.get('root_path', '') + scope['path']
+        matched = self.spec.route(path)
+        if matched is None:
+            return await self.app(scope, receive, send)
+
+        uri_template, path_params = matched
+        request = ASGIRequest(scope, uri_template, path_params)
+        try:
+            operation = self.spec.get_operation(
+                uri_template, request.method, request.media_type
+            )
+        except UndocumentedMediaType:
+            return await _respond_error(
+                send, 415, {'media_type': request.media_type}
+            )
+        if operation is None:
+            return await self.app(scope, receive, send)
+
+        parameters, parameter_errors = await self.unmarshal_parameters(
+            request, operation
+        )
+        if parameter_errors:
+            error = UnmarshalError(parameter_errors)
+            return await _respond_error(send, 400, self.error_to_dict(error))
+
+        if 'requestBody' in operation and is_json_media_type(
+            request.media_type
+        ):
+            if (
+                self.max_body_size is not None
+                and request.content_length > self.max_body_size
+            ):
+                return await _respond_error(send, 413, {})
+            try:
+                request.body = await _receive_body(
+                    receive, self.max_body_size
+                )
+            except _BodyTooLarge:
+                return await _respond_error(send, 413, {})
+            except _Disconnected:
+                return
+
+            try:
+                result = await self.unmarshal_request_body(request, operation)
+            except MalformedJSON:
+                return await _respond_error(send, 400, MALFORMED_JSON_ERROR)
+            request_body, request_body_errors = result
+            if request_body_errors:
+                error = UnmarshalError(None, request_body_errors)
+                return await _respond_error(
+                    send, 400, self.error_to_dict(error)
+                )
+            receive = _replay(request.body, receive)
+        else:
+            request_body = None
+
+        scope[SCOPE_OPERATION] = operation
+        scope[SCOPE_PARAMETERS] = parameters
+        scope[SCOPE_REQUEST_BODY] = request_body
+        return await self.app(scope, receive, send)
+
+    def error_to_dict(self, error):
+        """Serialize :class:`~oas.exceptions.UnmarshalError` with the caps."""
+        return error.to_dict(
+            max_errors=self.schema_unmarshaler.max_errors,
+            max_message_length=self.max_message_length,
+            instance_repr=self.instance_repr,
+        )
+
+    async def unmarshal_parameters(self, request, operation):
+        return unmarshal_operation_parameters(
+            self.schema_unmarshaler,
+            request,
+            operation,
+            max_errors=self.schema_unmarshaler.max_errors,
+        )
+
+    async def unmarshal_request_body(self, request, operation):
+        return await unmarshal_request_body_async(
+            self.schema_unmarshaler,
+            request,
+            operation,
+            executor=self.executor,
+            threshold=self.offload_threshold,
+            max_errors=self.schema_unmarshaler.max_errors,
+        )
+
+
+async def unmarshal_request_async(
+    schema_unmarshaler,
+    request,
+    operation,
+    executor=None,
+    threshold=DEFAULT_THRESHOLD,
+    max_errors=None,
+    typed=False,
+):
+    """Asynchronous version of :func:`~oas.unmarshal_request`.
+
+    See :func:`unmarshal_request_body_async` for ``executor`` and
+    ``threshold``.
+    """
+    if max_errors is None:
+        max_errors = schema_unmarshaler.max_errors
+
+    parameters, parameter_errors = unmarshal_operation_parameters(
+        schema_unmarshaler,
+        request,
+        operation,
+        max_errors=max_errors,
+        typed=typed,
+    )
+    if max_errors is not None and parameter_errors:
+        max_errors -= len(parameter_errors)
+    if max_errors is not None and max_errors <= 0:
+        raise UnmarshalError(parameter_errors)
+
+    request_body, request_body_errors = await unmarshal_request_body_async(
+        schema_unmarshaler,
+        request,
+        operation,
+        executor=executor,
+        threshold=threshold,
+        max_errors=max_errors,
+    )
+
+    if parameter_errors or request_body_errors:
+        raise UnmarshalError(parameter_errors, request_body_errors)
+
+    if typed:
+        return to_unmarshaled_request(parameters, request_body)
+    return parameters, request_body
+
+
+async def unmarshal_request_body_async(
+    schema_unmarshaler,
+    request,
+    operation,
+    executor=None,
+    threshold=DEFAULT_THRESHOLD,
+    max_errors=None,
+):
+    """Unmarshal the request body without blocking the event loop long.
+
+    The request body smaller than ``threshold`` is unmarshaled inline.
+    The larger one is unmarshaled by ``executor`` if given.  A
+    :class:`~concurrent.futures.ProcessPoolExecutor` must be initialized
+    with :func:`~oas.executors.initialize_worker`.
+    """
+    if executor is None or request.content_length < threshold:
+        return unmarshal_operation_request_body(
+            schema_unmarshaler, request, operation, max_errors=max_errors
+        )
+
+    future = submit_request_body(
+        executor, schema_unmarshaler, request, operation, max_errors
+    )
+    return await asyncio.wrap_future(future)
+
+
+class ASGIRequest(Request):
+    """:class:`~oas.Request` over the ASGI scope.
+
+    :attr:`body` must be set before accessing :attr:`media`.
+    """
+
+    body = None
+
+    def __init__(self, scope, uri_template, path_params):
+        self._scope = scope
+        self._uri_template = uri_template
+        self._path_params = path_params
+
+    @property
+    def uri_template(self):
+        return self._uri_template
+
+    @cached_property
+    def method(self):
+        return self._scope['method'].lower()
+
+    @property
+    def context(self):
+        return self._scope
+
+    @property
+    def path(self):
+        return self._path_params
+
+    @cached_property
+    def query(self):
+        # Decode as WSGI does for the native strings by PEP 3333.
+        query_string = self._scope.get('query_string', b'')
+        return parse_query(query_string.decode('latin-1'))
+
+    @cached_property
+    def header(self):
+        return _Headers(self._scope)
+
+    @cached_property
+    def cookie(self):
+        return parse_cookie(self.header.get('cookie', ''))
+
+    @property
+    def content_length(self):
+        if self.body is not None:
+            return len(self.body)
+        try:
+            return int(self.header.get('content-length') or 0)
+        except ValueError:
+            return 0
+
+    @cached_property
+    def media_type(self):
+        return parse_media_type(self.header.get('content-type'))
+
+    @cached_property
+    def media(self):
+        return load_media(self.media_type, self.body)
+
+
+class _Headers(Mapping):
+    """Case-insensitive view of the headers in the ASGI scope."""
+
+    def __init__(self, scope):
+        self._headers = {}
+        for name, value in scope.get('headers', ()):
+            name = name.decode('latin-1').lower()
+            value = value.decode('latin-1')
+            if name in self._headers:
+                self._headers[name] += ',' + value
+            else:
+                self._headers[name] = value
+
+    def __getitem__(self, name):
+        return self._headers[name.lower()]
+
+    def __iter__(self):
+        return iter(self._headers)
+
+    def __len__(self):
+        return len(self._headers)
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class _Disconnected(Exception):
+    pass
+
+
+async def _receive_body(receive, max_body_size):
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise _Disconnected()
+
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if max_body_size is not None and size > max_body_size:
+            raise _BodyTooLarge()
+        chunks.append(chunk)
+
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+def _replay(body, receive):
+    replayed = []
+
+    async def replay():
+        if replayed:
+            return await receive()
+        replayed.append(True)
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    return replay
+
+
+async def _respond_error(send, status, obj):
+    body = json.dumps(obj, default=str).encode('utf-8')
+    await send(
+        {
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin-1')),
+            ],
+        }
+    )
+    await send({'type': 'http.response.body', 'body': body})
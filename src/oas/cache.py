@@ -0,0 +1,98 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+
+from six import text_type
+
+from .spec import create_spec_from_dict
+
+try:
+    from .__version__ import __version__
+except ImportError:  # pragma: no cover
+    __version__ = None
+
+_MAGIC = b'OASSPEC'
+
+# Increment when the layout of the cache file or ``Spec`` changes.
+FORMAT_VERSION = 1
+
+
+def create_spec_from_cache(cache_path, source, loader=json.loads):
+    """Return the spec from the cache file or build it from the source.
+
+    The cache file holds the pickled :class:`~oas.spec.Spec` with the
+    dereferenced document and the operation table.  It is keyed on the
+    hash of the source, the format version, the library version and
+    the Python version.  If the cache file is missing or stale, the spec
+    is built from the source and the cache file is rewritten.  The spec
+    is returned even if the cache file cannot be written, e.g. to a
+    read-only directory.
+
+    The cache file must be trusted as it is unpickled.
+
+    :param cache_path: The path of the cache file.
+    :param source: The source document of the spec.
+    :param loader: The function to load the spec dict from the source,
+        e.g. ``yaml.safe_load``.
+    """
+    key = _get_key(source)
+    spec = read_spec_cache(cache_path, key)
+    if spec is None:
+        spec = create_spec_from_dict(loader(source)).compile()
+        try:
+            write_spec_cache(cache_path, spec, key)
+        except (IOError, OSError):
+            # The cache is only an optimization.
+            pass
+    return spec
+
+
+def read_spec_cache(cache_path, key):
+    """Return the spec in the cache file or ``None`` if it is stale."""
+    try:
+        with open(cache_path, 'rb') as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                return None
+            if pickle.load(f) != key:
+                return None
+            return pickle.load(f)
+    except Exception:
+        # Missing, truncated or incompatible cache file
+        return None
+
+
+def write_spec_cache(cache_path, spec, key):
+    """Write the spec to the cache file atomically."""
+    dirname = os.path.dirname(os.path.abspath(cache_path))
+    fd, temp_path = tempfile.mkstemp(dir=dirname, prefix='.oas-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_MAGIC)
+            pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(spec, f, protocol=pickle.HIGHEST_PROTOCOL)
+        _replace(temp_path, cache_path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def _get_key(source):
+    if isinstance(source, text_type):
+        source = source.encode('utf-8')
+    return (
+        FORMAT_VERSION,
+        __version__,
+        tuple(sys.version_info[:2]),
+        hashlib.sha256(source).hexdigest(),
+    )
+
+
+_replace = getattr(os, 'replace', os.rename)
@@ -3,11 +3,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from ..exceptions import prepend_path
 from ..exceptions import UndocumentedMediaType
 from ..exceptions import ValidationError
 
 
-def unmarshal_content(schema_unmarshaler, content, content_spec_dict):
+def unmarshal_content(
+    schema_unmarshaler, content, content_spec_dict, max_errors=None
+):
     try:
         media_type_spec_dict = content_spec_dict[content.media_type]
     except KeyError:
@@ -19,10 +22,13 @@ def unmarshal_content(schema_unmarshaler, content, content_spec_dict):
         return content.media, None
 
     try:
-        unmarshaled = schema_unmarshaler.unmarshal(content.media, schema)
+        unmarshaled = schema_unmarshaler.unmarshal(
+            content.media, schema, max_errors=max_errors
+        )
     except ValidationError as e:
+        schema_path = (content.media_type, 'schema')
         for error in e.errors:
-            error.schema_path.extendleft(['schema', content.media_type])
+            prepend_path(error, schema_path=schema_path)
         return None, e.errors
     else:
         return unmarshaled, None
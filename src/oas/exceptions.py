@@ -3,15 +3,199 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from collections import deque
+
+import jsonschema
+from six import integer_types
+from six import string_types
+from six.moves import reprlib
+
+
+# The value of the attributes not given to ``ErrorRecord``
+_unset = object()
+
 
 class Error(Exception):
     pass
 
 
+class ErrorRecord(jsonschema.ValidationError):
+    """:class:`jsonschema.ValidationError` built on demand.
+
+    The message is formatted from ``template`` and ``args`` on first
+    access.  ``path`` and ``schema_path`` are kept as linked lists, to
+    which :meth:`prepend` adds the segments of the outer layers without
+    building deques.  They become deques on first access, so that the
+    record is compatible with :class:`jsonschema.ValidationError`.
+
+    The records are built by :class:`~oas.schema.codegen.CodegenBackend`
+    and for the parameters and the request bodies.  The default
+    :class:`~oas.schema.validators.JSONSchemaBackend` still builds
+    :class:`jsonschema.ValidationError` with the formatted messages.
+    """
+
+    def __init__(
+        self,
+        template,
+        args=None,
+        validator=_unset,
+        validator_value=_unset,
+        instance=_unset,
+        schema=_unset,
+        path=(),
+        schema_path=(),
+        cause=None,
+        context=(),
+    ):
+        self._template = template
+        self._args = args
+        self._message = None
+        self._path = _link(path)
+        self._schema_path = _link(schema_path)
+        self.validator = validator
+        self.validator_value = validator_value
+        self.instance = instance
+        self.schema = schema
+        self.cause = cause
+        if cause is not None:
+            self.__cause__ = cause
+        self.context = list(context)
+        self.parent = None
+
+        for error in context:
+            error.parent = self
+
+    @property
+    def message(self):
+        if self._message is None:
+            if self._args is None:
+                self._message = self._template
+            else:
+                self._message = self._template % self._args
+        return self._message
+
+    @property
+    def path(self):
+        if type(self._path) is not deque:
+            self._path = deque(_iter_linked(self._path))
+        return self._path
+
+    relative_path = path
+
+    @property
+    def schema_path(self):
+        if type(self._schema_path) is not deque:
+            self._schema_path = deque(_iter_linked(self._schema_path))
+        return self._schema_path
+
+    relative_schema_path = schema_path
+
+    def prepend(self, path=(), schema_path=()):
+        """Prepend the segments to ``path`` and ``schema_path``."""
+        if path:
+            self._path = _prepend(self._path, path)
+        if schema_path:
+            self._schema_path = _prepend(self._schema_path, schema_path)
+
+    def format_message(self, max_length=None, instance_repr=True):
+        """Format the message without the full ``repr`` of the instance.
+
+        If ``instance_repr`` is false, the instance is replaced with its
+        type, e.g. ``<object>``.  Otherwise, if ``max_length`` is given,
+        the instance is abbreviated by :mod:`reprlib` to that length.
+        """
+        if self._args is None or self.instance is _unset:
+            return self.message
+        if instance_repr and max_length is None:
+            return self.message
+
+        if instance_repr:
+            placeholder = _Placeholder(_short_repr(self.instance, max_length))
+        else:
+            placeholder = _Placeholder(_type_name(self.instance))
+        args = tuple(
+            placeholder if arg is self.instance else arg for arg in self._args
+        )
+        return self._template % args
+
+    def iter_path(self):
+        """Iterate the segments of ``path`` without building the deque."""
+        if type(self._path) is deque:
+            return iter(self._path)
+        return _iter_linked(self._path)
+
+    def to_jsonschema(self):
+        """Return the equivalent :class:`jsonschema.ValidationError`."""
+        # Leave the attributes not given unset as jsonschema does.
+        kwargs = {
+            name: value
+            for name, value in (
+                ('validator', self.validator),
+                ('validator_value', self.validator_value),
+                ('instance', self.instance),
+                ('schema', self.schema),
+            )
+            if value is not _unset
+        }
+        return jsonschema.ValidationError(
+            self.message,
+            path=list(self.iter_path()),
+            schema_path=list(self.schema_path),
+            cause=self.cause,
+            context=[_to_jsonschema(error) for error in self.context],
+            **kwargs
+        )
+
+    def __reduce__(self):
+        return self.to_jsonschema().__reduce__()
+
+
+def prepend_path(error, path=(), schema_path=()):
+    """Prepend the segments to ``path`` and ``schema_path`` of the error.
+
+    The error is either :class:`ErrorRecord` or
+    :class:`jsonschema.ValidationError`.
+    """
+    if isinstance(error, ErrorRecord):
+        error.prepend(path, schema_path)
+    else:
+        error.path.extendleft(reversed(path))
+        error.schema_path.extendleft(reversed(schema_path))
+
+
+def _link(segments):
+    return _prepend(None, tuple(segments))
+
+
+def _prepend(node, segments):
+    if type(node) is deque:
+        node.extendleft(reversed(segments))
+        return node
+    for segment in reversed(segments):
+        node = (segment, node)
+    return node
+
+
+def _iter_linked(node):
+    while node is not None:
+        yield node[0]
+        node = node[1]
+
+
+def _to_jsonschema(error):
+    if isinstance(error, ErrorRecord):
+        return error.to_jsonschema()
+    return error
+
+
 class UndocumentedMediaType(Error):
     pass
 
 
+class MalformedJSON(Error, ValueError):
+    """The request body is not valid JSON in UTF-8."""
+
+
 class ValidationError(Error):
     def __init__(self, errors):
         self.errors = errors
@@ -22,27 +206,124 @@ class UnmarshalError(Error):
         self.parameter_errors = parameter_errors
         self.request_body_errors = request_body_errors
 
-    def to_dict(self, obj_type=dict):
-        obj = obj_type()
+    def to_dict(
+        self,
+        obj_type=dict,
+        max_errors=None,
+        max_message_length=None,
+        instance_repr=True,
+    ):
+        """Serialize the errors with the caps on the size.
 
-        if self.parameter_errors is not None:
-            obj['parameters'] = [
-                _error_to_dict(error, obj_type)
-                for error in self.parameter_errors
-            ]
+        :param max_errors: The maximum number of the errors in total.  The
+            number of the errors left out is stored as ``omitted``.
+        :param max_message_length: The maximum length of the messages.
+            Longer messages are truncated with ``...``.
+        :param instance_repr: Whether to include ``repr`` of the invalid
+            instances in the messages.  The instances are replaced with
+            their types, e.g. ``<object>``.  The messages of the errors
+            collected by the default
+            :class:`~oas.schema.validators.JSONSchemaBackend` have already
+            been formatted with ``repr``, which is stripped afterwards.
+            Only :class:`~oas.schema.codegen.CodegenBackend` avoids the
+            cost of ``repr``.
+        """
+        obj = obj_type()
+        options = (obj_type, max_message_length, instance_repr)
+        remaining = max_errors
+        omitted = 0
 
-        if self.request_body_errors is not None:
-            obj['request_body'] = [
-                _error_to_dict(error, obj_type)
-                for error in self.request_body_errors
-            ]
+        for key, errors in (
+            ('parameters', self.parameter_errors),
+            ('request_body', self.request_body_errors),
+        ):
+            if errors is None:
+                continue
+            if remaining is not None:
+                omitted += max(len(errors) - remaining, 0)
+                errors = errors[:remaining]
+                remaining -= len(errors)
+            obj[key] = [_error_to_dict(error, *options) for error in errors]
 
+        if omitted:
+            obj['omitted'] = omitted
         return obj
 
 
-def _error_to_dict(error, obj_type):
+def _error_to_dict(error, obj_type, max_message_length, instance_repr):
     obj = obj_type()
-    obj['path'] = list(error.path)
+    if isinstance(error, ErrorRecord):
+        obj['path'] = list(error.iter_path())
+        message = error.format_message(max_message_length, instance_repr)
+    else:
+        obj['path'] = list(error.path)
+        if instance_repr:
+            message = error.message
+        else:
+            message = _strip_instance(error)
     obj['validator'] = error.validator
-    obj['message'] = error.message
+    obj['message'] = _truncate(message, max_message_length)
     return obj
+
+
+def _strip_instance(error):
+    """Return the message with ``repr`` of the instance replaced.
+
+    The messages of jsonschema embed the instance at the start or the
+    end, if at all.  The messages embedding it elsewhere are replaced as
+    a whole.
+    """
+    message = error.message
+    instance_repr = repr(error.instance)
+    if instance_repr not in message:
+        return message
+    type_name = _type_name(error.instance)
+    if message.startswith(instance_repr):
+        return type_name + message[len(instance_repr) :]
+    if message.endswith(instance_repr):
+        return message[: -len(instance_repr)] + type_name
+    return 'Failed validating {!r}'.format(error.validator)
+
+
+class _Placeholder(object):
+    """Object whose ``repr`` is the given text."""
+
+    __slots__ = ('_text',)
+
+    def __init__(self, text):
+        self._text = text
+
+    def __repr__(self):
+        return str(self._text)
+
+
+def _short_repr(instance, max_length):
+    short_repr = reprlib.Repr()
+    short_repr.maxstring = short_repr.maxother = max_length
+    return short_repr.repr(instance)
+
+
+def _type_name(instance):
+    if instance is None:
+        return '<null>'
+    if isinstance(instance, bool):
+        return '<boolean>'
+    if isinstance(instance, integer_types):
+        return '<integer>'
+    if isinstance(instance, float):
+        return '<number>'
+    if isinstance(instance, string_types):
+        return '<string>'
+    if isinstance(instance, list):
+        return '<array>'
+    if isinstance(instance, dict):
+        return '<object>'
+    return '<{}>'.format(type(instance).__name__)
+
+
+def _truncate(message, max_length):
+    if max_length is None or len(message) <= max_length:
+        return message
+    if max_length < 3:
+        return message[:max_length]
+    return message[: max_length - 3] + '...'
@@ -0,0 +1,224 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import functools
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from six import iteritems
+from six.moves import cPickle as pickle
+
+from .request.unmarshalers import unmarshal_operation_request_body
+from .request_body.models import RequestBody
+from .schema.unmarshalers import SchemaUnmarshaler
+from .utils import load_media
+
+# The content length from which request bodies are offloaded
+DEFAULT_THRESHOLD = 64 * 1024
+
+# The number of instances in a chunk sent to the executor
+DEFAULT_CHUNK_SIZE = 1000
+
+# The spec and the schema unmarshaler preloaded in the worker process
+_worker = {}
+
+
+def initialize_worker(spec_factory, schema_unmarshaler_factory=None):
+    """Preload the compiled spec in the worker process.
+
+    Pass it as ``initializer`` of :class:`ProcessPoolExecutor`, which
+    requires Python 3.7 or later, so that only the payload of the request
+    is sent to the worker.  Other executors, e.g.
+    :class:`~concurrent.futures.ThreadPoolExecutor`, need no initializer.
+
+    :param spec_factory: The picklable function to return the spec, e.g.
+        :func:`functools.partial` of
+        :func:`~oas.cache.create_spec_from_cache`.
+    :param schema_unmarshaler_factory: The picklable function to return
+        :class:`~oas.SchemaUnmarshaler` from the spec.
+    """
+    if schema_unmarshaler_factory is None:
+        schema_unmarshaler_factory = _create_schema_unmarshaler
+
+    spec = spec_factory()
+    schema_unmarshaler = schema_unmarshaler_factory(spec)
+    spec.compile(schema_unmarshaler)
+    _worker['spec'] = spec
+    _worker['schema_unmarshaler'] = schema_unmarshaler
+
+
+def submit_request_body(
+    executor, schema_unmarshaler, request, operation, max_errors=None
+):
+    """Submit unmarshaling the request body to the executor.
+
+    :class:`ProcessPoolExecutor` must be initialized with
+    :func:`initialize_worker`.  The raw ``body`` of the request, if any,
+    is sent to the worker and deserialized there.  Otherwise the
+    deserialized ``media`` is sent.
+
+    :returns: :class:`~concurrent.futures.Future` of the result of
+        :func:`~oas.request.unmarshalers.unmarshal_operation_request_body`.
+    """
+    if not isinstance(executor, ProcessPoolExecutor):
+        return executor.submit(
+            unmarshal_operation_request_body,
+            schema_unmarshaler,
+            request,
+            operation,
+            max_errors,
+        )
+
+    body = getattr(request, 'body', None)
+    return executor.submit(
+        _unmarshal_request_body_in_worker,
+        request.uri_template,
+        request.method,
+        request.media_type,
+        request.content_length,
+        body,
+        request.media if body is None else None,
+        max_errors,
+    )
+
+
+def unmarshal_many(
+    executor,
+    schema_unmarshaler,
+    instances,
+    schema,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    max_pending=None,
+):
+    """Unmarshal chunks of the instances with the executor.
+
+    The results are generated in order as
+    :meth:`~oas.SchemaUnmarshaler.unmarshal_many`.  At most
+    ``max_pending`` chunks, twice the number of CPUs by default, are
+    submitted ahead, so that the instances are consumed lazily.
+
+    :class:`ProcessPoolExecutor` must be initialized with
+    :func:`initialize_worker`.  If the schema is in the spec of
+    ``schema_unmarshaler``, only its path is sent and the schema is
+    looked up in the spec preloaded in the worker, so that the schemas
+    referred by the discriminator are matched.  Otherwise the schema is
+    pickled once.  The schema is compiled once per worker.
+    """
+    if max_pending is None:
+        max_pending = 2 * multiprocessing.cpu_count()
+
+    if isinstance(executor, ProcessPoolExecutor):
+        path = None
+        if schema_unmarshaler is not None:
+            path = _find_path(schema_unmarshaler._spec_dict, schema)
+        if path is not None:
+            fn = functools.partial(_unmarshal_chunk_in_worker, path, None)
+        else:
+            fn = functools.partial(
+                _unmarshal_chunk_in_worker,
+                None,
+                pickle.dumps(schema, pickle.HIGHEST_PROTOCOL),
+            )
+    else:
+        fn = functools.partial(_unmarshal_chunk, schema_unmarshaler, schema)
+
+    futures = []
+    it = iter(instances)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(it, chunk_size))
+        if chunk:
+            futures.append(executor.submit(fn, chunk, start))
+            start += len(chunk)
+        if futures and (not chunk or len(futures) >= max_pending):
+            for result in futures.pop(0).result():
+                yield result
+        elif not chunk:
+            return
+
+
+def _create_schema_unmarshaler(spec):
+    return SchemaUnmarshaler(spec=spec)
+
+
+def _unmarshal_request_body_in_worker(
+    uri_template, method, media_type, content_length, body, media, max_errors
+):
+    spec = _worker['spec']
+    operation = spec.get_operation(uri_template, method, media_type)
+    request_body = _RequestBody(media_type, content_length, body, media)
+    return unmarshal_operation_request_body(
+        _worker['schema_unmarshaler'], request_body, operation, max_errors
+    )
+
+
+def _unmarshal_chunk(schema_unmarshaler, schema, chunk, start):
+    return list(schema_unmarshaler.unmarshal_many(chunk, schema, start))
+
+
+def _unmarshal_chunk_in_worker(path, pickled_schema, chunk, start):
+    if path is not None:
+        schema = _worker['spec'].data
+        for key in path:
+            schema = schema[key]
+    else:
+        # Keep the last schema not to unpickle it for every chunk.
+        if _worker.get('pickled_schema') != pickled_schema:
+            _worker['schema'] = pickle.loads(pickled_schema)
+            _worker['pickled_schema'] = pickled_schema
+        schema = _worker['schema']
+    return _unmarshal_chunk(
+        _worker['schema_unmarshaler'], schema, chunk, start
+    )
+
+
+def _find_path(document, node):
+    """Return the keys and indexes to the node in the document, if any.
+
+    The node is searched by identity, since the resolved references make
+    the document a graph, possibly with cycles.
+    """
+    seen = set()
+    stack = [(document, ())]
+    while stack:
+        current, path = stack.pop()
+        if current is node:
+            return path
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, dict):
+            children = iteritems(current)
+        elif isinstance(current, list):
+            children = enumerate(current)
+        else:
+            continue
+        for key, child in children:
+            if isinstance(child, (dict, list)):
+                stack.append((child, path + (key,)))
+    return None
+
+
+class _RequestBody(RequestBody):
+    def __init__(self, media_type, content_length, body, media):
+        self._media_type = media_type
+        self._content_length = content_length
+        self._body = body
+        self._media = media
+
+    @property
+    def media_type(self):
+        return self._media_type
+
+    @property
+    def content_length(self):
+        return self._content_length
+
+    @property
+    def media(self):
+        if self._body is None:
+            return self._media
+        return load_media(self._media_type, self._body)
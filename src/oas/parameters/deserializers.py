@@ -3,33 +3,329 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-from distutils.util import strtobool
+from six import iteritems
+
+# The same values as ``distutils.util.strtobool``
+_booleans = {
+    'y': True,
+    'yes': True,
+    't': True,
+    'true': True,
+    'on': True,
+    '1': True,
+    'n': False,
+    'no': False,
+    'f': False,
+    'false': False,
+    'off': False,
+    '0': False,
+}
+
+
+def _parse_boolean(value):
+    try:
+        return _booleans[value.lower()]
+    except KeyError:
+        raise ValueError(value)
+
 
 _parsers = {
     'integer': int,
     'number': float,
-    'boolean': lambda x: bool(strtobool(x)),
+    'boolean': _parse_boolean,
     'string': lambda x: x,
 }
 
+_default_styles = {
+    'path': 'simple',
+    'query': 'form',
+    'header': 'simple',
+    'cookie': 'form',
+}
+
+# The delimiters of the values of the styles without ``explode``
+_delimiters = {
+    'simple': ',',
+    'label': ',',
+    'matrix': ',',
+    'form': ',',
+    'spaceDelimited': ' ',
+    'pipeDelimited': '|',
+}
+
+# The schema of the parameters without type, shared so that it is
+# compiled only once
+_any_schema = {}
+
 
-# TODO: Support style and explode
 def deserialize_parameter(parameters, location, name, parameter_spec_dict):
-    try:
-        value = getattr(parameters, location)[name]
-    except (AttributeError, KeyError):
-        schema = parameter_spec_dict['schema']
-        return schema['default'], schema
+    """Return the deserialized value of the parameter and its schema.
 
-    try:
-        schema = parameter_spec_dict['schema']
-        schema_type = schema['type']
-    except KeyError:
-        return value, {}
+    If the parameter is absent, the default value of the schema is
+    returned.  The value which cannot be deserialized is returned as is
+    to let the validator report it.
+
+    :raises KeyError: If the parameter is absent without default value.
+    """
+    deserialize = _build_deserializer(location, name, parameter_spec_dict)
+    return deserialize(getattr(parameters, location, None))
+
+
+def compile_deserializer(parameter_spec_dict, excluded_names=()):
+    """Return the function to deserialize the parameter.
+
+    The function takes the mapping of the raw values in the location of
+    the parameter, and returns the same as :func:`deserialize_parameter`.
+    ``style`` and ``explode`` are interpreted once, so that the function
+    is expected to be kept, e.g. by the plan of the operation.  Multiple
+    values of a parameter, e.g. of ``form`` style with ``explode``, are
+    taken by ``getall`` or ``getlist`` of the mapping if available.
+
+    :param excluded_names: The names of the other parameters in the
+        location, which are not read as the additional properties of an
+        object of ``form`` style with ``explode``.
+    """
+    return _build_deserializer(
+        parameter_spec_dict['in'],
+        parameter_spec_dict['name'],
+        parameter_spec_dict,
+        excluded_names,
+    )
 
+
+def _build_deserializer(location, name, parameter_spec_dict, excluded=()):
+    style = parameter_spec_dict.get('style', _default_styles.get(location))
+    explode = parameter_spec_dict.get('explode', style == 'form')
+    schema = parameter_spec_dict.get('schema', {})
+    schema_type = schema.get('type')
+
+    if schema_type == 'array':
+        read, parse = _compile_array(name, style, explode, schema)
+    elif schema_type == 'object':
+        read, parse = _compile_object(name, style, explode, schema, excluded)
+    else:
+        read = _reader(name)
+        # The unknown type is left to the validator.
+        parse = _chain(
+            _stripper(_prefix(name, style)),
+            _parsers.get(schema_type, _raise_value_error),
+        )
+
+    def deserialize(values):
+        try:
+            if values is None:
+                raise KeyError(name)
+            value = read(values)
+        except KeyError:
+            default_schema = parameter_spec_dict['schema']
+            return default_schema['default'], default_schema
+
+        if schema_type is None:
+            return value, _any_schema
+        try:
+            return parse(value), schema
+        except ValueError:
+            # Let the validator handle the error
+            return value, schema
+
+    return deserialize
+
+
+def _compile_array(name, style, explode, schema):
+    parse_item = _compile_parser(schema.get('items', {}))
+
+    if explode and style in ('form', 'spaceDelimited', 'pipeDelimited'):
+        return _multi_reader(name), _mapper(parse_item)
+    if style == 'deepObject':
+        return _multi_reader(name), _mapper(parse_item)
+
+    split = _splitter(name, style, explode)
+    if style == 'matrix' and explode:
+        split = _chain(split, _mapper(_stripper(name + '=')))
+    return _reader(name), _chain(split, _mapper(parse_item))
+
+
+def _compile_object(name, style, explode, schema, excluded):
+    parsers = {
+        k: _compile_parser(v)
+        for k, v in iteritems(schema.get('properties', {}))
+    }
+    additional_properties = schema.get('additionalProperties')
+    if isinstance(additional_properties, dict):
+        parse_additional = _compile_parser(additional_properties)
+    else:
+        parse_additional = _identity
+
+    def parse_properties(pairs):
+        return {k: parsers.get(k, parse_additional)(v) for k, v in pairs}
+
+    if style == 'deepObject':
+        return _deep_object_reader(name), _chain(iteritems, parse_properties)
+    if explode and style in ('form', 'spaceDelimited', 'pipeDelimited'):
+        if additional_properties is False:
+            reader = _properties_reader(list(parsers))
+        else:
+            # Each of the other keys is an additional property.
+            reader = _properties_reader(
+                list(parsers), frozenset(excluded).difference(parsers)
+            )
+        return reader, _chain(iteritems, parse_properties)
+
+    split = _splitter(name, style, explode)
+    if explode:
+        split = _chain(split, _mapper(_split_pair))
+    else:
+        split = _chain(split, _pairs)
+    return _reader(name), _chain(split, parse_properties)
+
+
+def _compile_parser(schema):
+    """Return the function to parse the string as the type of the schema.
+
+    The string which cannot be parsed is returned as is.
+    """
     try:
-        parser = _parsers[schema_type]
-        return parser(value), schema
-    except (KeyError, ValueError):
-        # Let the validator handle the error
-        return value, schema
+        parse = _parsers[schema['type']]
+    except (KeyError, TypeError):
+        return _identity
+
+    def parser(value):
+        try:
+            return parse(value)
+        except ValueError:
+            return value
+
+    return parser
+
+
+def _prefix(name, style):
+    if style == 'label':
+        return '.'
+    if style == 'matrix':
+        return ';' + name + '='
+    return ''
+
+
+def _splitter(name, style, explode):
+    """Return the function to split the value of the style into strings."""
+    strip = _stripper(_prefix(name, style))
+    if style == 'label' and explode:
+        delimiter = '.'
+    elif style == 'matrix' and explode:
+        strip = _stripper(';')
+        delimiter = ';'
+    else:
+        delimiter = _delimiters.get(style, ',')
+
+    def split(value):
+        value = strip(value)
+        return value.split(delimiter) if value else []
+
+    return split
+
+
+def _stripper(prefix):
+    if not prefix:
+        return _identity
+
+    def strip(value):
+        if not value.startswith(prefix):
+            raise ValueError(value)
+        return value[len(prefix) :]
+
+    return strip
+
+
+def _reader(name):
+    def read(values):
+        return values[name]
+
+    return read
+
+
+def _multi_reader(name):
+    def read(values):
+        getall = getattr(values, 'getall', None) or getattr(
+            values, 'getlist', None
+        )
+        if getall is None:
+            return [values[name]]
+        result = getall(name)
+        if not result:
+            raise KeyError(name)
+        return result
+
+    return read
+
+
+def _properties_reader(names, excluded=None):
+    """Return the function to read the properties of an object.
+
+    If ``excluded`` is given, all the keys except it are read.
+    """
+
+    def read(values):
+        if excluded is None:
+            result = {k: values[k] for k in names if k in values}
+        else:
+            result = {
+                k: v for k, v in iteritems(values) if k not in excluded
+            }
+        if not result:
+            raise KeyError(names)
+        return result
+
+    return read
+
+
+def _deep_object_reader(name):
+    prefix = name + '['
+
+    def read(values):
+        result = {
+            k[len(prefix) : -1]: v
+            for k, v in iteritems(values)
+            if k.startswith(prefix) and k.endswith(']')
+        }
+        if not result:
+            raise KeyError(name)
+        return result
+
+    return read
+
+
+def _split_pair(value):
+    k, sep, v = value.partition('=')
+    if not sep:
+        raise ValueError(value)
+    return k, v
+
+
+def _pairs(items):
+    if len(items) % 2:
+        raise ValueError(items)
+    return zip(items[::2], items[1::2])
+
+
+def _mapper(func):
+    def map_(values):
+        return [func(x) for x in values]
+
+    return map_
+
+
+def _chain(*funcs):
+    def chain(value):
+        for func in funcs:
+            value = func(value)
+        return value
+
+    return chain
+
+
+def _identity(value):
+    return value
+
+
+def _raise_value_error(value):
+    raise ValueError(value)
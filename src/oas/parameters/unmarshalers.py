@@ -5,30 +5,52 @@ from __future__ import unicode_literals
 
 from collections import defaultdict
 
-import jsonschema
-
+from ..exceptions import ErrorRecord
+from ..exceptions import prepend_path
 from ..exceptions import ValidationError
-from .deserializers import deserialize_parameter
+from .deserializers import compile_deserializer
+
 
+def unmarshal_parameters(
+    schema_unmarshaler,
+    parameters,
+    parameter_spec_dicts,
+    max_errors=None,
+    typed=False,
+):
+    """Unmarshal the parameters into the dicts keyed by the locations.
 
-def unmarshal_parameters(schema_unmarshaler, parameters, parameter_spec_dicts):
-    unmarshaled = defaultdict(dict)
+    The result is :class:`~collections.defaultdict`.  If ``typed`` is
+    true, it is a dict preallocated with only the locations of the
+    parameters instead.
+    """
+    plan = compile_parameters(parameter_spec_dicts)
+    # Read each location of the parameters only once.
+    sources = {
+        location: getattr(parameters, location, None)
+        for location in plan.locations
+    }
+    if typed:
+        unmarshaled = {location: {} for location in plan.locations}
+    else:
+        unmarshaled = defaultdict(dict)
     errors = []
 
-    for index, parameter_spec_dict in enumerate(parameter_spec_dicts):
-        name = parameter_spec_dict['name']
-        location = parameter_spec_dict['in']
+    for index, location, name, deserialize, parameter_spec_dict in plan.steps:
+        if max_errors is None:
+            remaining = None
+        elif len(errors) < max_errors:
+            remaining = max_errors - len(errors)
+        else:
+            break
 
         try:
-            value, schema = deserialize_parameter(
-                parameters, location, name, parameter_spec_dict
-            )
+            value, schema = deserialize(sources[location])
         except KeyError:
             if parameter_spec_dict.get('required', False):
-                error = jsonschema.ValidationError(
-                    '{!r} is a required in {!r} parameter'.format(
-                        name, location
-                    ),
+                error = ErrorRecord(
+                    '%r is a required in %r parameter',
+                    (name, location),
                     validator='required',
                     validator_value=True,
                     schema=parameter_spec_dict,
@@ -38,13 +60,67 @@ def unmarshal_parameters(schema_unmarshaler, parameters, parameter_spec_dicts):
                 errors.append(error)
         else:
             try:
-                value = schema_unmarshaler.unmarshal(value, schema)
+                value = schema_unmarshaler.unmarshal(
+                    value, schema, max_errors=remaining
+                )
             except ValidationError as e:
                 for error in e.errors:
-                    error.schema_path.extendleft(('schema', index))
-                    error.path.extendleft([name, location])
+                    prepend_path(error, (location, name), (index, 'schema'))
                 errors.extend(e.errors)
             else:
                 unmarshaled[location][name] = value
 
     return unmarshaled, errors or None
+
+
+def compile_parameters(parameter_spec_dicts):
+    """Return the plan to unmarshal the parameters.
+
+    The plan is built with the deserializers of the parameters and the
+    locations to read.  :class:`ParameterList`, e.g. the parameters of
+    the operations in the spec, keeps the plan so that it is built once
+    per operation.  The plan of the other lists is built on every call.
+    """
+    plan = getattr(parameter_spec_dicts, 'plan', None)
+    if plan is None:
+        plan = _Plan(parameter_spec_dicts)
+        if isinstance(parameter_spec_dicts, ParameterList):
+            parameter_spec_dicts.plan = plan
+    return plan
+
+
+class ParameterList(list):
+    """List of Parameter Objects keeping the plan to unmarshal them.
+
+    The plan is not pickled but built again on demand.
+    """
+
+    plan = None
+
+    def __reduce__(self):
+        return ParameterList, (list(self),)
+
+
+class _Plan(object):
+    __slots__ = ('locations', 'steps')
+
+    def __init__(self, parameter_spec_dicts):
+        names = defaultdict(set)
+        for parameter_spec_dict in parameter_spec_dicts:
+            names[parameter_spec_dict['in']].add(parameter_spec_dict['name'])
+
+        locations = []
+        steps = []
+        for index, parameter_spec_dict in enumerate(parameter_spec_dicts):
+            location = parameter_spec_dict['in']
+            name = parameter_spec_dict['name']
+            if location not in locations:
+                locations.append(location)
+            deserialize = compile_deserializer(
+                parameter_spec_dict, names[location] - {name}
+            )
+            steps.append(
+                (index, location, name, deserialize, parameter_spec_dict)
+            )
+        self.locations = tuple(locations)
+        self.steps = tuple(steps)
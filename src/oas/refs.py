@@ -0,0 +1,146 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import timeit
+
+from six import iteritems
+from six import string_types
+from six.moves.urllib_parse import unquote
+
+
+class LoadStats(
+    collections.namedtuple('LoadStats', ['refs', 'nodes', 'seconds'])
+):
+    """Statistics of :func:`resolve_refs`.
+
+    :param refs: The number of resolved ``$ref``.
+    :param nodes: The number of objects and arrays in the result.
+    :param seconds: The elapsed time.
+    """
+
+    __slots__ = ()
+
+
+def resolve_refs(document):
+    """Return a copy of the document with local ``$ref`` replaced.
+
+    Every object and array is copied only once and the referred ones are
+    shared, so a recursive reference results in a cyclic structure.
+    ``$ref`` which is not local, cannot be resolved or refers to itself
+    is kept as is.
+
+    :returns: A tuple of the copy and :class:`LoadStats`.
+    """
+    started = timeit.default_timer()
+    resolver = _Resolver(document)
+    result = resolver.copy(document)
+    seconds = timeit.default_timer() - started
+    return result, LoadStats(resolver.refs, resolver.nodes, seconds)
+
+
+class _Resolver(object):
+    def __init__(self, document):
+        self.refs = 0
+        self.nodes = 0
+        self._document = document
+        # The copies keyed by the identity of the original nodes
+        self._copies = {}
+        # The identities of ``$ref`` being resolved, i.e. the cycle marker
+        self._resolving = set()
+        # The identities of ``$ref`` kept in the result
+        self._kept = set()
+
+    def copy(self, node):
+        if isinstance(node, dict):
+            key = id(node)
+            try:
+                return self._copies[key]
+            except KeyError:
+                pass
+
+            ref = node.get('$ref')
+            if isinstance(ref, string_types):
+                return self._copy_ref(node, ref)
+
+            result = self._copies[key] = {}
+            self.nodes += 1
+            for k, v in iteritems(node):
+                result[k] = self.copy(v)
+            return result
+
+        if isinstance(node, list):
+            key = id(node)
+            try:
+                return self._copies[key]
+            except KeyError:
+                pass
+
+            result = self._copies[key] = []
+            self.nodes += 1
+            result.extend(self.copy(x) for x in node)
+            return result
+
+        return node
+
+    def _copy_ref(self, node, ref):
+        key = id(node)
+        if key in self._resolving:
+            # ``$ref`` refers to itself without any object in between.
+            return self._keep(node)
+
+        target = self._get_target(ref)
+        if target is None:
+            return self._keep(node)
+
+        self._resolving.add(key)
+        try:
+            result = self.copy(target)
+        finally:
+            self._resolving.discard(key)
+        self._copies[key] = result
+        if id(result) not in self._kept:
+            self.refs += 1
+        return result
+
+    def _keep(self, node):
+        result = self._copies[id(node)] = dict(node)
+        self._kept.add(id(result))
+        self.nodes += 1
+        return result
+
+    def _get_target(self, ref, seen=frozenset()):
+        if not ref.startswith('#'):
+            return None
+
+        node = self._document
+        pointer = unquote(ref[1:])
+        if not pointer:
+            return node
+        if not pointer.startswith('/'):
+            return None
+
+        for token in pointer[1:].split('/'):
+            token = token.replace('~1', '/').replace('~0', '~')
+            node = self._follow(node, seen)
+            try:
+                if isinstance(node, list):
+                    node = node[int(token)]
+                else:
+                    node = node[token]
+            except (KeyError, IndexError, TypeError, ValueError):
+                return None
+        return node
+
+    def _follow(self, node, seen):
+        """Return the node referred by ``$ref`` in the middle of a pointer."""
+        while isinstance(node, dict) and isinstance(
+            node.get('$ref'), string_types
+        ):
+            if id(node) in seen:
+                return None
+            seen = seen | frozenset([id(node)])
+            node = self._get_target(node['$ref'], seen)
+        return node
@@ -4,6 +4,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import abc
+import collections
 
 import six
 
@@ -24,3 +25,20 @@ class Request(Parameters, RequestBody):
     @abc.abstractproperty
     def context(self):
         """Return the request context."""
+
+
+class UnmarshaledRequest(
+    collections.namedtuple(
+        'UnmarshaledRequest', ['path', 'query', 'header', 'cookie', 'body']
+    )
+):
+    """Immutable result of :func:`~oas.unmarshal_request` with ``typed``.
+
+    :param path: The dict of the unmarshaled path parameters.
+    :param query: The dict of the unmarshaled query parameters.
+    :param header: The dict of the unmarshaled header parameters.
+    :param cookie: The dict of the unmarshaled cookie parameters.
+    :param body: The unmarshaled request body.
+    """
+
+    __slots__ = ()
@@ -3,31 +3,96 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from ..exceptions import prepend_path
 from ..exceptions import UnmarshalError
 from ..parameters.unmarshalers import unmarshal_parameters
 from ..request_body.unmarshalers import unmarshal_request_body
+from .models import UnmarshaledRequest
 
 
-def unmarshal_request(schema_unmarshaler, request, operation):
-    parameters, parameter_errors = unmarshal_parameters(
-        schema_unmarshaler, request, operation['parameters']
+def unmarshal_request(
+    schema_unmarshaler, request, operation, max_errors=None, typed=False
+):
+    """Unmarshal the parameters and the request body of the request.
+
+    If ``max_errors`` is given, :attr:`~oas.SchemaUnmarshaler.max_errors`
+    by default, it stops after finding that number of errors in total.
+
+    :returns: The tuple of the parameters and the request body, or
+        :class:`~oas.request.models.UnmarshaledRequest` if ``typed`` is
+        true.
+    :raises UnmarshalError: If the request is invalid.
+    """
+    if max_errors is None:
+        max_errors = schema_unmarshaler.max_errors
+
+    parameters, parameter_errors = unmarshal_operation_parameters(
+        schema_unmarshaler,
+        request,
+        operation,
+        max_errors=max_errors,
+        typed=typed,
+    )
+    if max_errors is not None and parameter_errors:
+        max_errors -= len(parameter_errors)
+    if max_errors is not None and max_errors <= 0:
+        raise UnmarshalError(parameter_errors)
+
+    request_body, request_body_errors = unmarshal_operation_request_body(
+        schema_unmarshaler, request, operation, max_errors=max_errors
     )
-    if parameter_errors:
-        for error in parameter_errors:
-            error.schema_path.appendleft('parameters')
-
-    if 'requestBody' in operation:
-        request_body, request_body_errors = unmarshal_request_body(
-            schema_unmarshaler, request, operation['requestBody']
-        )
-        if request_body_errors:
-            for error in request_body_errors:
-                error.schema_path.appendleft('requestBody')
-    else:
-        request_body = None
-        request_body_errors = None
 
     if parameter_errors or request_body_errors:
         raise UnmarshalError(parameter_errors, request_body_errors)
 
+    if typed:
+        return to_unmarshaled_request(parameters, request_body)
     return parameters, request_body
+
+
+def to_unmarshaled_request(parameters, request_body):
+    """Return :class:`~oas.request.models.UnmarshaledRequest`.
+
+    The locations without parameters are empty dicts.
+    """
+    return UnmarshaledRequest(
+        parameters.get('path') or {},
+        parameters.get('query') or {},
+        parameters.get('header') or {},
+        parameters.get('cookie') or {},
+        request_body,
+    )
+
+
+def unmarshal_operation_parameters(
+    schema_unmarshaler, request, operation, max_errors=None, typed=False
+):
+    parameters, parameter_errors = unmarshal_parameters(
+        schema_unmarshaler,
+        request,
+        operation['parameters'],
+        max_errors=max_errors,
+        typed=typed,
+    )
+    if parameter_errors:
+        for error in parameter_errors:
+            prepend_path(error, schema_path=('parameters',))
+    return parameters, parameter_errors
+
+
+def unmarshal_operation_request_body(
+    schema_unmarshaler, request, operation, max_errors=None
+):
+    if 'requestBody' not in operation:
+        return None, None
+
+    request_body, request_body_errors = unmarshal_request_body(
+        schema_unmarshaler,
+        request,
+        operation['requestBody'],
+        max_errors=max_errors,
+    )
+    if request_body_errors:
+        for error in request_body_errors:
+            prepend_path(error, schema_path=('requestBody',))
+    return request_body, request_body_errors
@@ -3,17 +3,17 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import jsonschema
-
 from ..content.unmarshalers import unmarshal_content
+from ..exceptions import ErrorRecord
+from ..exceptions import prepend_path
 
 
 def unmarshal_request_body(
-    schema_unmarshaler, request_body, request_body_spec_dict
+    schema_unmarshaler, request_body, request_body_spec_dict, max_errors=None
 ):
     if not request_body.content_length:
         if request_body_spec_dict.get('required', False):
-            error = jsonschema.ValidationError(
+            error = ErrorRecord(
                 'Request body is required',
                 validator='required',
                 validator_value=True,
@@ -24,9 +24,12 @@ def unmarshal_request_body(
         return None, None
 
     unmarshaled, errors = unmarshal_content(
-        schema_unmarshaler, request_body, request_body_spec_dict['content']
+        schema_unmarshaler,
+        request_body,
+        request_body_spec_dict['content'],
+        max_errors=max_errors,
     )
     if errors:
         for error in errors:
-            error.schema_path.appendleft('content')
+            prepend_path(error, schema_path=('content',))
     return unmarshaled, errors
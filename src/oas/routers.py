@@ -0,0 +1,128 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import re
+
+_template_re = re.compile(r'\{([^}]+)\}')
+
+
+class Router(object):
+    """Match request paths against URI templates.
+
+    The templates are compiled into a prefix tree of path segments, so
+    the time to match depends on the length of the path rather than the
+    number of the templates.  Static segments take precedence over
+    templated ones.
+    """
+
+    def __init__(self, uri_templates=()):
+        self._root = _Node()
+        for uri_template in uri_templates:
+            self.add(uri_template)
+
+    def add(self, uri_template):
+        node = self._root
+        for segment in _split(uri_template):
+            node = node.add_child(segment)
+        node.uri_template = uri_template
+
+    def match(self, path):
+        """Return the URI template and the path parameters of the path.
+
+        It returns ``None`` if no template matches the path.
+        """
+        if not path.startswith('/'):
+            return None
+        params = {}
+        uri_template = self._root.match(_split(path), 0, params)
+        if uri_template is None:
+            return None
+        return uri_template, params
+
+
+class _Node(object):
+    __slots__ = ('static', 'variables', 'uri_template')
+
+    def __init__(self):
+        self.static = {}
+        # Templated segments in the order of addition
+        self.variables = []
+        self.uri_template = None
+
+    def add_child(self, segment):
+        names = _template_re.findall(segment)
+        if not names:
+            try:
+                return self.static[segment]
+            except KeyError:
+                child = self.static[segment] = _Node()
+                return child
+
+        if len(names) == 1 and segment == '{' + names[0] + '}':
+            # The whole segment is a variable.
+            regex = None
+        else:
+            regex = _compile_segment(segment)
+
+        for variable in self.variables:
+            if variable.segment == segment:
+                return variable.child
+
+        child = _Node()
+        self.variables.append(_Variable(segment, regex, names, child))
+        return child
+
+    def match(self, segments, index, params):
+        if index == len(segments):
+            return self.uri_template
+
+        segment = segments[index]
+        child = self.static.get(segment)
+        if child is not None:
+            uri_template = child.match(segments, index + 1, params)
+            if uri_template is not None:
+                return uri_template
+
+        for variable in self.variables:
+            values = variable.match(segment)
+            if values is None:
+                continue
+            uri_template = variable.child.match(segments, index + 1, params)
+            if uri_template is not None:
+                params.update(zip(variable.names, values))
+                return uri_template
+
+        return None
+
+
+class _Variable(object):
+    __slots__ = ('segment', 'regex', 'names', 'child')
+
+    def __init__(self, segment, regex, names, child):
+        self.segment = segment
+        self.regex = regex
+        self.names = names
+        self.child = child
+
+    def match(self, segment):
+        if self.regex is None:
+            return (segment,) if segment else None
+        m = self.regex.match(segment)
+        return m.groups() if m else None
+
+
+def _split(path):
+    return path.split('/')[1:]
+
+
+def _compile_segment(segment):
+    pattern = []
+    position = 0
+    for m in _template_re.finditer(segment):
+        pattern.append(re.escape(segment[position : m.start()]))
+        pattern.append('(.+?)')
+        position = m.end()
+    pattern.append(re.escape(segment[position:]))
+    return re.compile(''.join(pattern) + '$')
@@ -0,0 +1,775 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import itertools
+import numbers
+import threading
+
+import jsonschema
+from jsonschema.exceptions import UnknownType
+from six import integer_types
+from six import iteritems
+from six import string_types
+
+from ..exceptions import ErrorRecord
+from .compilers import _is_unique
+from .compilers import _unbool
+from .discriminators import get_branches
+from .patterns import compile_pattern
+
+# The Python expressions of the types of ``instance``, the same as
+# ``Draft4Validator``
+_type_expressions = {
+    'array': 'isinstance(instance, list)',
+    'boolean': 'isinstance(instance, bool)',
+    'integer': (
+        '(isinstance(instance, integer_types)'
+        ' and not isinstance(instance, bool))'
+    ),
+    'null': 'instance is None',
+    'number': (
+        '(isinstance(instance, Number) and not isinstance(instance, bool))'
+    ),
+    'object': 'isinstance(instance, dict)',
+    'string': 'isinstance(instance, string_types)',
+}
+
+
+def _error(
+    template,
+    args,
+    validator,
+    validator_value,
+    instance,
+    schema,
+    keyword=None,
+    path=(),
+    cause=None,
+    context=(),
+):
+    return ErrorRecord(
+        template,
+        args,
+        validator=validator,
+        validator_value=validator_value,
+        instance=instance,
+        schema=schema,
+        schema_path=(validator if keyword is None else keyword,),
+        path=path,
+        cause=cause,
+        context=context,
+    )
+
+
+def _unknown_type(schema_type, instance, schema):
+    raise UnknownType(schema_type, instance, schema)
+
+
+def _is_valid(validate, instance):
+    return next(iter(validate(instance)), None) is None
+
+
+def _in_enum(instance, enums):
+    if instance == 0 or instance == 1:
+        unbooled = _unbool(instance)
+        return any(unbooled == _unbool(each) for each in enums)
+    return instance in enums
+
+
+def _extras_message(extras):
+    verb = 'was' if len(extras) == 1 else 'were'
+    return ', '.join(repr(extra) for extra in extras), verb
+
+
+def _join_reprs(values):
+    return ', '.join(repr(value) for value in values)
+
+
+def _tuple_source(names):
+    """Return the Python expression of the tuple of the names."""
+    if not names:
+        return '()'
+    return '({},)'.format(', '.join(names))
+
+
+_runtime = {
+    'Number': numbers.Number,
+    'integer_types': integer_types,
+    'string_types': string_types,
+    '_error': _error,
+    '_unknown_type': _unknown_type,
+    '_is_valid': _is_valid,
+    '_in_enum': _in_enum,
+    '_is_unique': _is_unique,
+    '_extras_message': _extras_message,
+    '_join_reprs': _join_reprs,
+}
+
+
+class CodegenBackend(object):
+    """Validator backend generating Python source for each schema.
+
+    Each schema is translated into the source of a generator function
+    yielding :class:`~oas.exceptions.ErrorRecord`, with the same messages,
+    paths and keywords as :class:`~oas.schema.validators.JSONSchemaBackend`.
+    The source is compiled with :func:`compile` on first use and cached by
+    the identity of the schema.  The OpenAPI extensions ``nullable`` and
+    ``discriminator`` are supported.  ``readOnly`` and ``writeOnly`` are
+    annotations as in the other validators.  Like
+    :class:`~oas.schema.compilers.SchemaCompiler`, the functions are
+    generated under a lock and published when the outermost one is
+    compiled, so that the backend can be shared between threads.
+    """
+
+    def __init__(self, schema, format_checker=None, use_re2=False):
+        self._resolver = jsonschema.RefResolver.from_schema(schema)
+        self._format_checker = format_checker
+        self._use_re2 = use_re2
+        self._namespace = dict(_runtime)
+        self._names = {}
+        self._sources = {}
+        self._counter = itertools.count()
+        self._lock = threading.RLock()
+        # The names of the functions being generated by the ongoing call
+        self._pending = None
+
+    def iter_errors(self, instance, schema):
+        return self._namespace[self._get_name(schema)](instance)
+
+    def get_source(self, schema):
+        """Return the generated source of the function of the schema."""
+        return self._sources[self._get_name(schema)]
+
+    def _get_name(self, schema):
+        key = id(schema)
+        try:
+            return self._names[key][1]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if self._pending is not None:
+                return self._generate(schema)
+
+            self._pending = {}
+            try:
+                name = self._generate(schema)
+                self._names.update(self._pending)
+            finally:
+                self._pending = None
+            return name
+
+    def _generate(self, schema):
+        key = id(schema)
+        for names in (self._names, self._pending):
+            try:
+                return names[key][1]
+            except KeyError:
+                pass
+
+        name = 'validate_{}'.format(next(self._counter))
+        # Recursive schemas refer to the function by the name in advance.
+        self._pending[key] = (schema, name)
+        source = _Generator(self, schema, name).generate()
+        code = compile(source, '<oas.schema.codegen>', 'exec')
+        exec(code, self._namespace)
+        self._sources[name] = source
+        return name
+
+    def _add_constant(self, value):
+        name = 'c_{}'.format(next(self._counter))
+        self._namespace[name] = value
+        return name
+
+
+class _Generator(object):
+    def __init__(self, backend, schema, name):
+        self._backend = backend
+        self._schema = schema
+        self._name = name
+        self._lines = []
+        self._indent = 1
+
+    def generate(self):
+        self._indent = 0
+        self._emit('def {}(instance):', self._name)
+        self._indent = 1
+
+        ref = self._schema.get('$ref')
+        if ref is not None:
+            # Other keywords are ignored as ``Draft4Validator``.
+            resolver = self._backend._resolver
+            with resolver.resolving(ref) as resolved:
+                target = self._backend._get_name(resolved)
+            self._emit('return {}(instance)', target)
+        else:
+            for keyword, value in iteritems(self._schema):
+                try:
+                    generate = self._generators[keyword]
+                except KeyError:
+                    continue
+                generate(self, keyword, value)
+            self._emit('if False:')
+            self._emit('    yield')
+
+        self._lines.append('')
+        return '\n'.join(self._lines)
+
+    def _emit(self, line, *args):
+        self._lines.append('    ' * self._indent + line.format(*args))
+
+    def _const(self, value):
+        return self._backend._add_constant(value)
+
+    def _function(self, schema):
+        return self._backend._get_name(schema)
+
+    def _compile_pattern(self, pattern):
+        return compile_pattern(pattern, self._backend._use_re2)
+
+    def _yield_error(self, template, args, validator, value, **kwargs):
+        """Emit the statement to yield the error.
+
+        ``args``, ``value`` and the keyword arguments are the Python
+        expressions of the arguments of ``_error``.  The message is
+        formatted from ``template`` and ``args`` on demand.
+        """
+        arguments = [
+            self._const(template),
+            args,
+            self._const(validator),
+            value,
+            'instance',
+            self._const(self._schema),
+        ]
+        arguments.extend(
+            '{}={}'.format(k, v) for k, v in sorted(iteritems(kwargs))
+        )
+        self._emit('yield _error({})', ', '.join(arguments))
+
+    def _yield_from(self, call, *schema_path, **kwargs):
+        """Emit the loop to yield the errors of the call with the paths."""
+        path = kwargs.get('path')
+        self._emit('for error in {}:', call)
+        self._emit(
+            '    error.prepend({}, ({},))',
+            '()' if path is None else '({},)'.format(path),
+            ', '.join(schema_path),
+        )
+        self._emit('    yield error')
+
+    def _type(self, keyword, value):
+        types = value if isinstance(value, list) else [value]
+        expressions = []
+        for schema_type in types:
+            try:
+                expressions.append(_type_expressions[schema_type])
+            except KeyError:
+                expressions.append(
+                    '_unknown_type({}, instance, {})'.format(
+                        self._const(schema_type), self._const(self._schema)
+                    )
+                )
+        condition = 'not ({})'.format(' or '.join(expressions))
+        if self._schema.get('nullable'):
+            condition = 'instance is not None and ' + condition
+
+        template = '%r is not of type ' + ', '.join(
+            repr(t) for t in types
+        ).replace('%', '%%')
+        self._emit('if {}:', condition)
+        self._indent += 1
+        self._yield_error(template, '(instance,)', keyword, self._const(value))
+        self._indent -= 1
+
+    def _enum(self, keyword, value):
+        enums = self._const(value)
+        condition = 'not _in_enum(instance, {})'.format(enums)
+        if self._schema.get('nullable'):
+            condition = 'instance is not None and ' + condition
+
+        self._emit('if {}:', condition)
+        self._indent += 1
+        self._yield_error(
+            '%r is not one of %r',
+            '(instance, {})'.format(enums),
+            keyword,
+            enums,
+        )
+        self._indent -= 1
+
+    def _multiple_of(self, keyword, value):
+        c = self._const(value)
+        self._emit('if {}:', _type_expressions['number'])
+        if isinstance(value, float):
+            self._emit('    quotient = instance / {}', c)
+            self._emit('    failed = int(quotient) != quotient')
+        else:
+            self._emit('    failed = instance % {}', c)
+        self._emit('    if failed:')
+        self._indent += 2
+        self._yield_error(
+            '%r is not a multiple of %r',
+            '(instance, {})'.format(c),
+            keyword,
+            c,
+        )
+        self._indent -= 2
+
+    def _bound(self, keyword, value, exclusive, operator, description):
+        c = self._const(value)
+        if self._schema.get(exclusive, False):
+            operator += '='
+            description += ' or equal to'
+        self._emit(
+            'if {} and instance {} {}:',
+            _type_expressions['number'],
+            operator,
+            c,
+        )
+        self._indent += 1
+        self._yield_error(
+            '%r is {} the {} of %r'.format(description, keyword),
+            '(instance, {})'.format(c),
+            keyword,
+            c,
+        )
+        self._indent -= 1
+
+    def _maximum(self, keyword, value):
+        self._bound(keyword, value, 'exclusiveMaximum', '>', 'greater than')
+
+    def _minimum(self, keyword, value):
+        self._bound(keyword, value, 'exclusiveMinimum', '<', 'less than')
+
+    def _size(self, keyword, value, schema_type, operator, message):
+        c = self._const(value)
+        self._emit(
+            'if {} and len(instance) {} {}:',
+            _type_expressions[schema_type],
+            operator,
+            c,
+        )
+        self._indent += 1
+        self._yield_error(message, '(instance,)', keyword, c)
+        self._indent -= 1
+
+    def _max_length(self, keyword, value):
+        self._size(keyword, value, 'string', '>', '%r is too long')
+
+    def _min_length(self, keyword, value):
+        self._size(keyword, value, 'string', '<', '%r is too short')
+
+    def _max_items(self, keyword, value):
+        self._size(keyword, value, 'array', '>', '%r is too long')
+
+    def _min_items(self, keyword, value):
+        self._size(keyword, value, 'array', '<', '%r is too short')
+
+    def _max_properties(self, keyword, value):
+        self._size(keyword, value, 'object', '>', '%r has too many properties')
+
+    def _min_properties(self, keyword, value):
+        self._size(
+            keyword,
+            value,
+            'object',
+            '<',
+            '%r does not have enough properties',
+        )
+
+    def _pattern(self, keyword, value):
+        search = self._const(self._compile_pattern(value).search)
+        c = self._const(value)
+        self._emit(
+            'if {} and not {}(instance):',
+            _type_expressions['string'],
+            search,
+        )
+        self._indent += 1
+        self._yield_error(
+            '%r does not match %r', '(instance, {})'.format(c), keyword, c
+        )
+        self._indent -= 1
+
+    def _format(self, keyword, value):
+        format_checker = self._backend._format_checker
+        if format_checker is None:
+            return
+        try:
+            func, raises = format_checker.checkers[value]
+        except KeyError:
+            return
+
+        c = self._const(value)
+        self._emit('try:')
+        self._emit('    result = {}(instance)', self._const(func))
+        self._emit('    cause = None')
+        self._emit('except {} as e:', self._const(raises))
+        self._emit('    result = False')
+        self._emit('    cause = e')
+        self._emit('if not result:')
+        self._indent += 1
+        self._yield_error(
+            '%r is not a %r',
+            '(instance, {})'.format(c),
+            keyword,
+            c,
+            cause='cause',
+        )
+        self._indent -= 1
+
+    def _items(self, keyword, value):
+        self._emit('if {}:', _type_expressions['array'])
+        self._indent += 1
+        if isinstance(value, dict):
+            self._emit('for index, item in enumerate(instance):')
+            self._indent += 1
+            self._yield_from(
+                '{}(item)'.format(self._function(value)),
+                self._const(keyword),
+                path='index',
+            )
+            self._indent -= 1
+        else:
+            functions = _tuple_source([self._function(s) for s in value])
+            self._emit(
+                'for index, (item, validate) in enumerate(zip(instance, {})):',
+                functions,
+            )
+            self._indent += 1
+            self._yield_from(
+                'validate(item)', self._const(keyword), 'index', path='index'
+            )
+            self._indent -= 1
+        self._indent -= 1
+
+    def _additional_items(self, keyword, value):
+        items = self._schema.get('items', {})
+        if isinstance(items, dict):
+            return
+
+        length = len(items)
+        if isinstance(value, dict):
+            self._emit('if {}:', _type_expressions['array'])
+            self._emit(
+                '    for index, item in enumerate(instance[{}:], {}):',
+                length,
+                length,
+            )
+            self._indent += 2
+            self._yield_from(
+                '{}(item)'.format(self._function(value)),
+                self._const(keyword),
+                path='index',
+            )
+            self._indent -= 2
+        elif not value:
+            self._emit(
+                'if {} and len(instance) > {}:',
+                _type_expressions['array'],
+                length,
+            )
+            self._indent += 1
+            self._yield_error(
+                'Additional items are not allowed (%s %s unexpected)',
+                '_extras_message(instance[{}:])'.format(length),
+                keyword,
+                self._const(value),
+            )
+            self._indent -= 1
+
+    def _unique_items(self, keyword, value):
+        if not value:
+            return
+
+        self._emit(
+            'if {} and not _is_unique(instance):', _type_expressions['array']
+        )
+        self._indent += 1
+        self._yield_error(
+            '%r has non-unique elements',
+            '(instance,)',
+            keyword,
+            self._const(value),
+        )
+        self._indent -= 1
+
+    def _required(self, keyword, value):
+        c = self._const(value)
+        self._emit('if {}:', _type_expressions['object'])
+        self._emit('    for name in {}:', c)
+        self._emit('        if name not in instance:')
+        self._indent += 3
+        self._yield_error('%r is a required property', '(name,)', keyword, c)
+        self._indent -= 3
+
+    def _properties(self, keyword, value):
+        if not value:
+            return
+
+        self._emit('if {}:', _type_expressions['object'])
+        self._indent += 1
+        for name, sub_schema in iteritems(value):
+            c = self._const(name)
+            self._emit('if {} in instance:', c)
+            self._indent += 1
+            self._yield_from(
+                '{}(instance[{}])'.format(self._function(sub_schema), c),
+                self._const(keyword),
+                c,
+                path=c,
+            )
+            self._indent -= 1
+        self._indent -= 1
+
+    def _pattern_properties(self, keyword, value):
+        if not value:
+            return
+
+        self._emit('if {}:', _type_expressions['object'])
+        self._indent += 1
+        for pattern, sub_schema in iteritems(value):
+            search = self._const(self._compile_pattern(pattern).search)
+            self._emit('for k, v in instance.items():')
+            self._emit('    if {}(k):', search)
+            self._indent += 2
+            self._yield_from(
+                '{}(v)'.format(self._function(sub_schema)),
+                self._const(keyword),
+                self._const(pattern),
+                path='k',
+            )
+            self._indent -= 2
+        self._indent -= 1
+
+    def _additional_properties(self, keyword, value):
+        properties = self._const(self._schema.get('properties', {}))
+        pattern_properties = self._schema.get('patternProperties', {})
+        patterns = '|'.join(pattern_properties)
+        self._emit('if {}:', _type_expressions['object'])
+        self._indent += 1
+        if patterns:
+            search = self._const(self._compile_pattern(patterns).search)
+            self._emit(
+                'extras = [k for k in instance'
+                ' if k not in {} and not {}(k)]',
+                properties,
+                search,
+            )
+        else:
+            self._emit(
+                'extras = [k for k in instance if k not in {}]', properties
+            )
+
+        if isinstance(value, dict):
+            self._emit('for k in extras:')
+            self._indent += 1
+            self._yield_from(
+                '{}(instance[k])'.format(self._function(value)),
+                self._const(keyword),
+                path='k',
+            )
+            self._indent -= 1
+        elif not value:
+            self._emit('if extras:')
+            self._indent += 1
+            if 'patternProperties' in self._schema:
+                self._emit("verb = 'does' if len(extras) == 1 else 'do'")
+                template = '%s %s not match any of the regexes: %s'
+                args = '(_join_reprs(sorted(extras)), verb, {})'.format(
+                    self._const(_join_reprs(sorted(pattern_properties)))
+                )
+            else:
+                template = (
+                    'Additional properties are not allowed (%s %s unexpected)'
+                )
+                args = '_extras_message(extras)'
+            self._yield_error(template, args, keyword, self._const(value))
+            self._indent -= 1
+        self._indent -= 1
+
+    def _dependencies(self, keyword, value):
+        if not value:
+            return
+
+        self._emit('if {}:', _type_expressions['object'])
+        self._indent += 1
+        for name, dependency in iteritems(value):
+            c = self._const(name)
+            self._emit('if {} in instance:', c)
+            self._indent += 1
+            if isinstance(dependency, list):
+                self._emit('for each in {}:', self._const(dependency))
+                self._emit('    if each not in instance:')
+                self._indent += 2
+                self._yield_error(
+                    '%r is a dependency of %r',
+                    '(each, {})'.format(c),
+                    keyword,
+                    self._const(value),
+                )
+                self._indent -= 2
+            else:
+                self._yield_from(
+                    '{}(instance)'.format(self._function(dependency)),
+                    self._const(keyword),
+                    c,
+                )
+            self._indent -= 1
+        self._indent -= 1
+
+    def _all_of(self, keyword, value):
+        for index, sub_schema in enumerate(value):
+            self._yield_from(
+                '{}(instance)'.format(self._function(sub_schema)),
+                self._const(keyword),
+                str(index),
+            )
+
+    def _any_of(self, keyword, value):
+        self._discriminate(keyword, value, self._generate_any_of)
+
+    def _one_of(self, keyword, value):
+        self._discriminate(keyword, value, self._generate_one_of)
+
+    def _collect_branch_errors(self, keyword, value):
+        functions = _tuple_source([self._function(s) for s in value])
+        self._emit('errors = []')
+        self._emit('for index, validate in enumerate({}):', functions)
+        self._emit('    sub_errors = list(validate(instance))')
+        self._emit('    if not sub_errors:')
+        self._emit('        break')
+        self._emit('    for error in sub_errors:')
+        self._emit('        error.prepend((), (index,))')
+        self._emit('    errors.extend(sub_errors)')
+        self._emit('else:')
+        self._indent += 1
+        self._yield_error(
+            '%r is not valid under any of the given schemas',
+            '(instance,)',
+            keyword,
+            self._const(value),
+            context='errors',
+        )
+        self._indent -= 1
+        return functions
+
+    def _generate_any_of(self, keyword, value):
+        self._collect_branch_errors(keyword, value)
+
+    def _generate_one_of(self, keyword, value):
+        functions = self._collect_branch_errors(keyword, value)
+        self._emit('    index = None')
+        self._emit('if index is not None:')
+        self._emit('    more_valid = [')
+        self._emit('        {}[i]', self._const(value))
+        self._emit('        for i, validate in enumerate({})', functions)
+        self._emit('        if i > index and _is_valid(validate, instance)')
+        self._emit('    ]')
+        self._emit('    if more_valid:')
+        self._emit('        more_valid.append({}[index])', self._const(value))
+        self._indent += 2
+        self._yield_error(
+            '%r is valid under each of %s',
+            '(instance, _join_reprs(more_valid))',
+            keyword,
+            self._const(value),
+        )
+        self._indent -= 2
+
+    def _discriminate(self, keyword, value, generate):
+        discriminator = self._schema.get('discriminator')
+        if discriminator is None:
+            generate(keyword, value)
+            return
+
+        property_name = discriminator['propertyName']
+        branches = get_branches(discriminator, value, self._backend._resolver)
+        c_name = self._const(property_name)
+        c_discriminator = self._const(discriminator)
+        c_keyword = self._const(keyword)
+        functions = _tuple_source([self._function(s) for s in value])
+
+        self._emit('if {}:', _type_expressions['object'])
+        self._indent += 1
+        self._emit('if {} not in instance:', c_name)
+        self._indent += 1
+        self._yield_error(
+            '{!r} is a required property'.format(property_name),
+            'None',
+            'discriminator',
+            c_discriminator,
+            keyword=c_keyword,
+        )
+        self._indent -= 1
+        self._emit('else:')
+        self._indent += 1
+        self._emit('value = instance[{}]', c_name)
+        self._emit('if isinstance(value, string_types):')
+        self._emit('    index = {}.get(value)', self._const(branches))
+        self._emit('else:')
+        self._emit('    index = None')
+        self._emit('if index is None:')
+        self._indent += 1
+        self._yield_error(
+            '%r is not a valid value of %r',
+            '(value, {})'.format(c_name),
+            'discriminator',
+            c_discriminator,
+            keyword=c_keyword,
+            path='({},)'.format(c_name),
+        )
+        self._indent -= 1
+        self._emit('else:')
+        self._indent += 1
+        self._yield_from(
+            '{}[index](instance)'.format(functions), c_keyword, 'index'
+        )
+        self._indent -= 3
+        self._emit('else:')
+        self._indent += 1
+        generate(keyword, value)
+        self._indent -= 1
+
+    def _not(self, keyword, value):
+        c = self._const(value)
+        self._emit('if _is_valid({}, instance):', self._function(value))
+        self._indent += 1
+        self._yield_error(
+            '%r is not allowed for %r',
+            '({}, instance)'.format(c),
+            keyword,
+            c,
+        )
+        self._indent -= 1
+
+    _generators = {
+        'type': _type,
+        'enum': _enum,
+        'multipleOf': _multiple_of,
+        'maximum': _maximum,
+        'minimum': _minimum,
+        'maxLength': _max_length,
+        'minLength': _min_length,
+        'pattern': _pattern,
+        'format': _format,
+        'items': _items,
+        'additionalItems': _additional_items,
+        'maxItems': _max_items,
+        'minItems': _min_items,
+        'uniqueItems': _unique_items,
+        'maxProperties': _max_properties,
+        'minProperties': _min_properties,
+        'required': _required,
+        'properties': _properties,
+        'patternProperties': _pattern_properties,
+        'additionalProperties': _additional_properties,
+        'dependencies': _dependencies,
+        'allOf': _all_of,
+        'anyOf': _any_of,
+        'oneOf': _one_of,
+        'not': _not,
+    }
@@ -0,0 +1,1053 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import numbers
+import threading
+
+import jsonschema
+from six import integer_types
+from six import iteritems
+from six import itervalues
+from six import string_types
+
+from ..utils import cached_property
+from .discriminators import get_branches
+from .patterns import compile_pattern
+from .views import copy_default
+
+
+class Invalid(Exception):
+    """Raised by compiled functions when the instance is invalid.
+
+    It carries no details.  The errors are collected by
+    :class:`~oas.schema.validators.SchemaValidator` on demand.
+    """
+
+
+def _is_integer(instance):
+    # bool inherits from int, so ensure bools aren't reported as ints
+    return isinstance(instance, integer_types) and not isinstance(
+        instance, bool
+    )
+
+
+def _is_number(instance):
+    return isinstance(instance, numbers.Number) and not isinstance(
+        instance, bool
+    )
+
+
+def _is_string(instance):
+    return isinstance(instance, string_types)
+
+
+def _is_array(instance):
+    return isinstance(instance, list)
+
+
+def _is_object(instance):
+    return isinstance(instance, dict)
+
+
+# The same type checker as ``Draft4Validator``
+_type_checkers = {
+    'array': _is_array,
+    'boolean': lambda instance: isinstance(instance, bool),
+    'integer': _is_integer,
+    'null': lambda instance: instance is None,
+    'number': _is_number,
+    'object': _is_object,
+    'string': _is_string,
+}
+
+_primitive_types = ('integer', 'number', 'boolean', 'string')
+
+
+def _unbool(element, true=object(), false=object()):
+    if element is True:
+        return true
+    elif element is False:
+        return false
+    return element
+
+
+def _is_unique(container):
+    try:
+        return len(set(_unbool(x) for x in container)) == len(container)
+    except TypeError:
+        seen = []
+        for x in container:
+            x = _unbool(x)
+            if x in seen:
+                return False
+            seen.append(x)
+        return True
+
+
+def _is_valid(validate, instance):
+    try:
+        validate(instance)
+    except Invalid:
+        return False
+    return True
+
+
+def _validate_all(validates, instance):
+    for validate in validates:
+        validate(instance)
+
+
+class SchemaCompiler(object):
+    """Compile schemas into functions.
+
+    A validator function raises :exc:`Invalid` if the instance is
+    invalid.  An unmarshaler function also returns the unmarshaled
+    instance, which is the same as the result of
+    :meth:`SchemaUnmarshaler._unmarshal
+    <oas.schema.unmarshalers.SchemaUnmarshaler._unmarshal>`, so that
+    the instance is validated and unmarshaled in one pass.
+
+    The compiled functions of the schemas in the spec are cached by the
+    identity of the schema.  Other schemas, e.g. built for a single call,
+    are compiled every time, so that the caches do not grow with them.
+    A compiler can be shared between threads.  Schemas are
+    compiled under a lock, and the functions are published to the cache
+    only when the outermost schema is compiled, so that no thread sees
+    a function referring to one still being built.
+
+    :param spec_dict: The root schema to resolve ``$ref``.
+    :param formats: :class:`~oas.schema.formats.Formats` to check and
+        modify formats.
+    :param unmarshal: The function to unmarshal values that are not
+        validated, e.g. ``default``.
+    :param use_re2: Whether to compile ``pattern`` by RE2.  See
+        :func:`~oas.schema.patterns.compile_pattern`.
+    """
+
+    def __init__(self, spec_dict, formats, unmarshal, use_re2=False):
+        self._spec_dict = spec_dict
+        self._resolver = jsonschema.RefResolver.from_schema(spec_dict)
+        self._formats = formats
+        self._unmarshal = unmarshal
+        self._use_re2 = use_re2
+        self._validators = {}
+        self._unmarshalers = {}
+        self._identities = {}
+        self._lock = threading.RLock()
+        # The entries built by the ongoing compilation by the cache
+        self._pending = None
+
+    def compile(self, schema):
+        """Return the function to validate and unmarshal instances."""
+        return self._get(schema, self._unmarshalers, self._build_unmarshaler)
+
+    def compile_validator(self, schema):
+        """Return the function to validate instances."""
+        return self._get(schema, self._validators, self._build_validator)
+
+    def owns(self, schema):
+        """Return whether the schema is in the spec.
+
+        Only what is built for such schemas is cached.
+        """
+        return id(schema) in self._owned
+
+    @cached_property
+    def _owned(self):
+        return _collect_ids(self._spec_dict)
+
+    def is_identity(self, schema):
+        """Return whether unmarshaling never transforms valid instances.
+
+        The unmarshaled instance of such a schema is equal to the
+        instance, so that the compiled function only validates it and
+        returns a shallow copy.
+        """
+        key = id(schema)
+        try:
+            return self._identities[key][1]
+        except KeyError:
+            pass
+        return self._publish(self._get_identity, schema)
+
+    def _get_identity(self, schema):
+        pending = self._get_pending(self._identities)
+        visited = {}
+        if self._reaches_transform(schema, visited, pending):
+            return False
+        # No schema reachable from the schema transforms.
+        for key, visited_schema in iteritems(visited):
+            pending[key] = (visited_schema, True)
+        return True
+
+    def _reaches_transform(self, schema, visited, pending):
+        """Return whether any schema reachable from the schema transforms.
+
+        The schemas found to transform are recorded in ``pending``.  The
+        other ``visited`` schemas are not, because the result of a schema
+        in a cycle is not known until the whole cycle is explored.
+        """
+        key = id(schema)
+        for entries in (self._identities, pending):
+            try:
+                return not entries[key][1]
+            except KeyError:
+                pass
+        if key in visited:
+            # Explored or being explored by the caller
+            return False
+        visited[key] = schema
+
+        if self._transforms(schema) or any(
+            self._reaches_transform(s, visited, pending)
+            for s in _iter_unmarshaled_sub_schemas(schema)
+        ):
+            pending[key] = (schema, False)
+            return True
+        return False
+
+    def _transforms(self, schema):
+        """Return whether the schema transforms instances by itself.
+
+        The sub-schemas are not taken into account.
+        """
+        if '$ref' in schema:
+            # ``_unmarshal`` does not follow ``$ref``.
+            return False
+        if schema.get('allOf'):
+            return True
+        if schema.get('oneOf') or schema.get('anyOf'):
+            return False
+
+        schema_type = schema.get('type')
+        if schema_type == 'object':
+            properties = schema.get('properties', {})
+            if any('default' in s for s in itervalues(properties)):
+                return True
+            # The properties matched by ``patternProperties`` are dropped.
+            additional_properties = schema.get('additionalProperties', True)
+            return additional_properties is False and bool(
+                schema.get('patternProperties')
+            )
+        if schema_type in _primitive_types and 'format' in schema:
+            try:
+                self._formats[schema['format']]
+            except KeyError:
+                return False
+            return True
+        return False
+
+    def _get(self, schema, cache, build):
+        key = id(schema)
+        try:
+            return cache[key][1]
+        except KeyError:
+            pass
+        return self._publish(self._get_function, schema, cache, build)
+
+    def _get_function(self, schema, cache, build):
+        key = id(schema)
+        pending = self._get_pending(cache)
+        for entries in (cache, pending):
+            try:
+                return entries[key][1]
+            except KeyError:
+                pass
+
+        # Recursive schemas refer to the function being built.
+        cell = []
+
+        def forward(instance):
+            return cell[0](instance)
+
+        pending[key] = (schema, forward)
+        func = build(schema)
+        cell.append(func)
+        pending[key] = (schema, func)
+        return func
+
+    def _publish(self, func, *args):
+        """Call ``func`` under the lock and publish what it has built.
+
+        Nested calls share the pending entries of the outermost call,
+        which are published to the caches only if it succeeds.
+        """
+        with self._lock:
+            if self._pending is not None:
+                return func(*args)
+
+            self._pending = {}
+            try:
+                result = func(*args)
+                owned = self._owned
+                for cache, entries in itervalues(self._pending):
+                    cache.update(
+                        (key, entry)
+                        for key, entry in iteritems(entries)
+                        if key in owned
+                    )
+            finally:
+                self._pending = None
+            return result
+
+    def _get_pending(self, cache):
+        """Return the entries built for the cache by the ongoing call."""
+        try:
+            return self._pending[id(cache)][1]
+        except KeyError:
+            pass
+        pending = {}
+        self._pending[id(cache)] = (cache, pending)
+        return pending
+
+    def _build_validator(self, schema):
+        if '$ref' in schema:
+            with self._resolver.resolving(schema['$ref']) as resolved:
+                return self.compile_validator(resolved)
+
+        checks = self._build_checks(schema)
+
+        def validate(instance):
+            for check in checks:
+                check(instance)
+
+        return validate
+
+    def _build_unmarshaler(self, schema):
+        if '$ref' in schema:
+            # ``_unmarshal`` does not follow ``$ref``.
+            validate = self.compile_validator(schema)
+
+            def unmarshal_ref(instance):
+                validate(instance)
+                return instance
+
+            return unmarshal_ref
+
+        if self.is_identity(schema):
+            validate = self.compile_validator(schema)
+
+            def unmarshal_identity(instance):
+                validate(instance)
+                return _shallow_copy(instance)
+
+            return unmarshal_identity
+
+        transform, consumed = self._build_transform(schema)
+        checks = self._build_checks(schema, consumed)
+
+        if transform is None:
+
+            def unmarshal(instance):
+                for check in checks:
+                    check(instance)
+                return instance
+
+        else:
+
+            def unmarshal(instance):
+                for check in checks:
+                    check(instance)
+                return transform(instance)
+
+        return unmarshal
+
+    def _build_checks(self, schema, consumed=()):
+        checks = []
+        for keyword, value in iteritems(schema):
+            if keyword in consumed:
+                continue
+            try:
+                build = self._check_builders[keyword]
+            except KeyError:
+                continue
+            check = build(self, value, schema)
+            if check is not None:
+                checks.append(check)
+        return checks
+
+    def _build_transform(self, schema):
+        """Return the function to unmarshal the validated instance.
+
+        The function also validates the keywords consumed by it.
+        """
+        all_of = schema.get('allOf')
+        if all_of:
+            return self._transform_all_of(all_of), ('allOf',)
+
+        if schema.get('oneOf'):
+            return self._transform_one_of(schema['oneOf'], schema), ('oneOf',)
+
+        if schema.get('anyOf'):
+            return self._transform_any_of(schema['anyOf'], schema), ('anyOf',)
+
+        schema_type = schema.get('type')
+        if schema_type == 'array':
+            return self._transform_array(schema)
+        if schema_type == 'object':
+            return self._transform_object(schema)
+        if schema_type in _primitive_types and 'format' in schema:
+            return self._transform_primitive(schema)
+        return None, ()
+
+    def _transform_all_of(self, sub_schemas):
+        validates = [self.compile_validator(s) for s in sub_schemas]
+        first = self.compile(sub_schemas[0])
+
+        if sub_schemas[0].get('type', 'object') == 'object':
+            rest = [self.compile(s) for s in sub_schemas[1:]]
+            validate_rest = validates[1:]
+
+            def transform(instance):
+                if instance is None:
+                    _validate_all(validates, instance)
+                    return instance
+
+                result = first(instance)
+                if not _is_object(instance):
+                    # Only objects are merged.
+                    _validate_all(validate_rest, instance)
+                    return result
+                for unmarshal in rest:
+                    for k, v in iteritems(unmarshal(instance)):
+                        # If ``sub_schema``s have the same property and
+                        # the former unmarshaling has modified the value of
+                        # the property, the former result wins.
+                        if k not in result or result[k] == instance[k]:
+                            result[k] = v
+                return result
+
+        else:
+            rest = validates[1:]
+
+            def transform(instance):
+                if instance is None:
+                    _validate_all(validates, instance)
+                    return instance
+
+                result = first(instance)
+                _validate_all(rest, instance)
+                return result
+
+        return transform
+
+    def _transform_one_of(self, sub_schemas, schema):
+        unmarshalers = [self.compile(s) for s in sub_schemas]
+        validates = [self.compile_validator(s) for s in sub_schemas]
+
+        def transform(instance):
+            for index, unmarshal in enumerate(unmarshalers):
+                try:
+                    result = unmarshal(instance)
+                except Invalid:
+                    continue
+                for validate in validates[index + 1 :]:
+                    if _is_valid(validate, instance):
+                        raise Invalid()
+                return result
+            raise Invalid()
+
+        return self._discriminate(schema, sub_schemas, unmarshalers, transform)
+
+    def _transform_any_of(self, sub_schemas, schema):
+        unmarshalers = [self.compile(s) for s in sub_schemas]
+
+        def transform(instance):
+            for unmarshal in unmarshalers:
+                try:
+                    return unmarshal(instance)
+                except Invalid:
+                    pass
+            raise Invalid()
+
+        return self._discriminate(schema, sub_schemas, unmarshalers, transform)
+
+    def _discriminate(self, schema, sub_schemas, funcs, fallback):
+        """Return the function to dispatch objects by the discriminator.
+
+        Only the function of the branch selected by the discriminator
+        value is called.  Instances other than objects are passed to
+        ``fallback``.
+        """
+        discriminator = schema.get('discriminator')
+        if discriminator is None:
+            return fallback
+
+        property_name = discriminator['propertyName']
+        branches = dict(
+            (value, funcs[index])
+            for value, index in iteritems(
+                get_branches(discriminator, sub_schemas, self._resolver)
+            )
+        )
+
+        def dispatch(instance):
+            if not _is_object(instance):
+                return fallback(instance)
+            try:
+                func = branches[instance[property_name]]
+            except (KeyError, TypeError):
+                raise Invalid()
+            return func(instance)
+
+        return dispatch
+
+    def _transform_array(self, schema):
+        items = schema.get('items')
+        if not isinstance(items, dict):
+            return _copy_array, ()
+
+        unmarshal = self.compile(items)
+
+        def transform(instance):
+            if instance is None:
+                return instance
+            return [unmarshal(x) for x in instance]
+
+        return transform, ('items',)
+
+    def _transform_object(self, schema):
+        properties = schema.get('properties', {})
+        additional_properties = schema.get('additionalProperties', True)
+        patterns = '|'.join(schema.get('patternProperties', {}))
+        search = self._search(patterns) if patterns else None
+        unmarshal_default = self._unmarshal
+
+        # The plan of the properties, which is looked up by the keys of the
+        # instance rather than iterating all the declared properties.
+        # ``transforms`` is false if the function only validates the value.
+        plan = {}
+        defaults = []
+        for name, sub_schema in iteritems(properties):
+            if self.is_identity(sub_schema):
+                plan[name] = (self.compile_validator(sub_schema), False)
+            else:
+                plan[name] = (self.compile(sub_schema), True)
+            if 'default' in sub_schema:
+                defaults.append((name, sub_schema))
+
+        validate_additional = None
+        unmarshal_additional = None
+        if isinstance(additional_properties, dict):
+            if self.is_identity(additional_properties):
+                validate_additional = self.compile_validator(
+                    additional_properties
+                )
+            else:
+                unmarshal_additional = self.compile(additional_properties)
+
+        def transform(instance):
+            if instance is None:
+                return instance
+
+            result = {}
+
+            for k, v in iteritems(instance):
+                try:
+                    func, transforms = plan[k]
+                except KeyError:
+                    pass
+                else:
+                    if transforms:
+                        result[k] = func(v)
+                    else:
+                        func(v)
+                        result[k] = v
+                    continue
+
+                if additional_properties is True:
+                    result[k] = v
+                elif not isinstance(additional_properties, dict):
+                    if not additional_properties and not (
+                        search is not None and search(k)
+                    ):
+                        raise Invalid()
+                elif search is not None and search(k):
+                    # ``additionalProperties`` does not validate the
+                    # properties matched by ``patternProperties``.
+                    if unmarshal_additional is None:
+                        result[k] = v
+                    else:
+                        result[k] = unmarshal_default(v, additional_properties)
+                elif unmarshal_additional is None:
+                    validate_additional(v)
+                    result[k] = v
+                else:
+                    result[k] = unmarshal_additional(v)
+
+            for name, sub_schema in defaults:
+                if name not in instance:
+                    result[name] = unmarshal_default(
+                        copy_default(sub_schema), sub_schema
+                    )
+
+            return result
+
+        return transform, ('properties', 'additionalProperties')
+
+    def _transform_primitive(self, schema):
+        try:
+            modifier = self._formats[schema['format']]
+        except KeyError:
+            return None, ()
+
+        fmt = self._formats.get_format(schema['format'])
+        if fmt is None:
+            # The format is checked separately by the format checker.
+            def transform(instance):
+                if instance is None:
+                    return instance
+                return modifier(instance)
+
+            return transform, ()
+
+        types = fmt.types
+        raises = fmt.raises
+
+        def transform(instance):
+            if instance is None:
+                return instance
+            if isinstance(instance, types):
+                # The format checker has the same check.
+                try:
+                    return modifier(instance)
+                except raises:
+                    raise Invalid()
+            return modifier(instance)
+
+        return transform, ('format',)
+
+    def _search(self, pattern):
+        """Return the ``search`` method of the compiled pattern."""
+        return compile_pattern(pattern, self._use_re2).search
+
+    def _check_type(self, value, schema):
+        if isinstance(value, list):
+            checkers = [_type_checkers[t] for t in value]
+
+            def is_type(instance):
+                return any(checker(instance) for checker in checkers)
+
+        else:
+            is_type = _type_checkers[value]
+        nullable = schema.get('nullable')
+
+        def check(instance):
+            if instance is None and nullable:
+                return
+            if not is_type(instance):
+                raise Invalid()
+
+        return check
+
+    def _check_enum(self, value, schema):
+        nullable = schema.get('nullable')
+        unbooled = [_unbool(x) for x in value]
+
+        def check(instance):
+            if instance is None and nullable:
+                return
+            if instance == 0 or instance == 1:
+                if _unbool(instance) not in unbooled:
+                    raise Invalid()
+            elif instance not in value:
+                raise Invalid()
+
+        return check
+
+    def _check_multiple_of(self, value, schema):
+        def check(instance):
+            if not _is_number(instance):
+                return
+            if isinstance(value, float):
+                quotient = instance / value
+                failed = int(quotient) != quotient
+            else:
+                failed = instance % value
+            if failed:
+                raise Invalid()
+
+        return check
+
+    def _check_maximum(self, value, schema):
+        if schema.get('exclusiveMaximum', False):
+
+            def check(instance):
+                if _is_number(instance) and instance >= value:
+                    raise Invalid()
+
+        else:
+
+            def check(instance):
+                if _is_number(instance) and instance > value:
+                    raise Invalid()
+
+        return check
+
+    def _check_minimum(self, value, schema):
+        if schema.get('exclusiveMinimum', False):
+
+            def check(instance):
+                if _is_number(instance) and instance <= value:
+                    raise Invalid()
+
+        else:
+
+            def check(instance):
+                if _is_number(instance) and instance < value:
+                    raise Invalid()
+
+        return check
+
+    def _check_max_length(self, value, schema):
+        def check(instance):
+            if _is_string(instance) and len(instance) > value:
+                raise Invalid()
+
+        return check
+
+    def _check_min_length(self, value, schema):
+        def check(instance):
+            if _is_string(instance) and len(instance) < value:
+                raise Invalid()
+
+        return check
+
+    def _check_pattern(self, value, schema):
+        search = self._search(value)
+
+        def check(instance):
+            if _is_string(instance) and not search(instance):
+                raise Invalid()
+
+        return check
+
+    def _check_format(self, value, schema):
+        try:
+            func, raises = self._formats.format_checker.checkers[value]
+        except KeyError:
+            return None
+
+        fmt = self._formats.get_format(value)
+        if fmt is not None:
+            modifier = fmt.modifier
+            types = fmt.types
+
+            def check(instance):
+                if isinstance(instance, types):
+                    try:
+                        modifier(instance)
+                    except raises:
+                        raise Invalid()
+
+        else:
+
+            def check(instance):
+                try:
+                    result = func(instance)
+                except raises:
+                    raise Invalid()
+                if not result:
+                    raise Invalid()
+
+        return check
+
+    def _check_items(self, value, schema):
+        if isinstance(value, dict):
+            validate = self.compile_validator(value)
+
+            def check(instance):
+                if _is_array(instance):
+                    for x in instance:
+                        validate(x)
+
+        else:
+            validates = [self.compile_validator(s) for s in value]
+
+            def check(instance):
+                if _is_array(instance):
+                    for x, validate in zip(instance, validates):
+                        validate(x)
+
+        return check
+
+    def _check_additional_items(self, value, schema):
+        items = schema.get('items', {})
+        if isinstance(items, dict):
+            return None
+
+        length = len(items)
+        if isinstance(value, dict):
+            validate = self.compile_validator(value)
+
+            def check(instance):
+                if _is_array(instance):
+                    for x in instance[length:]:
+                        validate(x)
+
+        elif not value:
+
+            def check(instance):
+                if _is_array(instance) and len(instance) > length:
+                    raise Invalid()
+
+        else:
+            return None
+
+        return check
+
+    def _check_max_items(self, value, schema):
+        def check(instance):
+            if _is_array(instance) and len(instance) > value:
+                raise Invalid()
+
+        return check
+
+    def _check_min_items(self, value, schema):
+        def check(instance):
+            if _is_array(instance) and len(instance) < value:
+                raise Invalid()
+
+        return check
+
+    def _check_unique_items(self, value, schema):
+        if not value:
+            return None
+
+        def check(instance):
+            if _is_array(instance) and not _is_unique(instance):
+                raise Invalid()
+
+        return check
+
+    def _check_max_properties(self, value, schema):
+        def check(instance):
+            if _is_object(instance) and len(instance) > value:
+                raise Invalid()
+
+        return check
+
+    def _check_min_properties(self, value, schema):
+        def check(instance):
+            if _is_object(instance) and len(instance) < value:
+                raise Invalid()
+
+        return check
+
+    def _check_required(self, value, schema):
+        def check(instance):
+            if _is_object(instance):
+                for name in value:
+                    if name not in instance:
+                        raise Invalid()
+
+        return check
+
+    def _check_properties(self, value, schema):
+        validates = [
+            (name, self.compile_validator(sub_schema))
+            for name, sub_schema in iteritems(value)
+        ]
+
+        def check(instance):
+            if _is_object(instance):
+                for name, validate in validates:
+                    if name in instance:
+                        validate(instance[name])
+
+        return check
+
+    def _check_pattern_properties(self, value, schema):
+        validates = [
+            (
+                self._search(pattern),
+                self.compile_validator(sub_schema),
+            )
+            for pattern, sub_schema in iteritems(value)
+        ]
+
+        def check(instance):
+            if _is_object(instance):
+                for search, validate in validates:
+                    for k, v in iteritems(instance):
+                        if search(k):
+                            validate(v)
+
+        return check
+
+    def _check_additional_properties(self, value, schema):
+        properties = schema.get('properties', {})
+        patterns = '|'.join(schema.get('patternProperties', {}))
+        search = self._search(patterns) if patterns else None
+
+        if isinstance(value, dict):
+            validate = self.compile_validator(value)
+        elif value:
+            return None
+        else:
+            validate = None
+
+        def check(instance):
+            if not _is_object(instance):
+                return
+            for k, v in iteritems(instance):
+                if k in properties or (search is not None and search(k)):
+                    continue
+                if validate is None:
+                    raise Invalid()
+                validate(v)
+
+        return check
+
+    def _check_dependencies(self, value, schema):
+        dependencies = []
+        for name, dependency in iteritems(value):
+            if isinstance(dependency, list):
+                dependencies.append((name, dependency, None))
+            else:
+                validate = self.compile_validator(dependency)
+                dependencies.append((name, None, validate))
+
+        def check(instance):
+            if not _is_object(instance):
+                return
+            for name, names, validate in dependencies:
+                if name not in instance:
+                    continue
+                if validate is not None:
+                    validate(instance)
+                else:
+                    for x in names:
+                        if x not in instance:
+                            raise Invalid()
+
+        return check
+
+    def _check_all_of(self, value, schema):
+        validates = [self.compile_validator(s) for s in value]
+
+        def check(instance):
+            _validate_all(validates, instance)
+
+        return check
+
+    def _check_any_of(self, value, schema):
+        validates = [self.compile_validator(s) for s in value]
+
+        def check(instance):
+            if not any(_is_valid(v, instance) for v in validates):
+                raise Invalid()
+
+        return self._discriminate(schema, value, validates, check)
+
+    def _check_one_of(self, value, schema):
+        validates = [self.compile_validator(s) for s in value]
+
+        def check(instance):
+            valid = False
+            for validate in validates:
+                if _is_valid(validate, instance):
+                    if valid:
+                        raise Invalid()
+                    valid = True
+            if not valid:
+                raise Invalid()
+
+        return self._discriminate(schema, value, validates, check)
+
+    def _check_not(self, value, schema):
+        validate = self.compile_validator(value)
+
+        def check(instance):
+            if _is_valid(validate, instance):
+                raise Invalid()
+
+        return check
+
+    _check_builders = {
+        'type': _check_type,
+        'enum': _check_enum,
+        'multipleOf': _check_multiple_of,
+        'maximum': _check_maximum,
+        'minimum': _check_minimum,
+        'maxLength': _check_max_length,
+        'minLength': _check_min_length,
+        'pattern': _check_pattern,
+        'format': _check_format,
+        'items': _check_items,
+        'additionalItems': _check_additional_items,
+        'maxItems': _check_max_items,
+        'minItems': _check_min_items,
+        'uniqueItems': _check_unique_items,
+        'maxProperties': _check_max_properties,
+        'minProperties': _check_min_properties,
+        'required': _check_required,
+        'properties': _check_properties,
+        'patternProperties': _check_pattern_properties,
+        'additionalProperties': _check_additional_properties,
+        'dependencies': _check_dependencies,
+        'allOf': _check_all_of,
+        'anyOf': _check_any_of,
+        'oneOf': _check_one_of,
+        'not': _check_not,
+    }
+
+
+def _collect_ids(document):
+    """Return the identities of the dicts in the document.
+
+    The resolved references make the document a graph, possibly with
+    cycles.
+    """
+    ids = set()
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if id(node) in ids:
+                continue
+            ids.add(id(node))
+            stack.extend(itervalues(node))
+        elif isinstance(node, list):
+            stack.extend(node)
+    return ids
+
+
+def _iter_unmarshaled_sub_schemas(schema):
+    """Iterate the sub-schemas which unmarshal parts of the instance."""
+    if '$ref' in schema or schema.get('allOf'):
+        return
+
+    sub_schemas = schema.get('oneOf') or schema.get('anyOf')
+    if sub_schemas:
+        for sub_schema in sub_schemas:
+            yield sub_schema
+        return
+
+    schema_type = schema.get('type')
+    if schema_type == 'array':
+        items = schema.get('items')
+        if isinstance(items, dict):
+            yield items
+    elif schema_type == 'object':
+        for sub_schema in itervalues(schema.get('properties', {})):
+            yield sub_schema
+        additional_properties = schema.get('additionalProperties', True)
+        if isinstance(additional_properties, dict):
+            yield additional_properties
+
+
+def _copy_array(instance):
+    if instance is None:
+        return instance
+    return list(instance)
+
+
+def _shallow_copy(instance):
+    if isinstance(instance, dict):
+        return dict(instance)
+    if isinstance(instance, list):
+        return list(instance)
+    return instance
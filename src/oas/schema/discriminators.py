@@ -0,0 +1,69 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from jsonschema.exceptions import RefResolutionError
+from six import iteritems
+
+_COMPONENTS_SCHEMAS = '#/components/schemas/'
+
+
+def get_branches(discriminator, sub_schemas, resolver):
+    """Return the dict from the discriminator values to the indexes.
+
+    The discriminator values are the names of the schemas in
+    ``components`` and the keys of ``mapping``.  The sub-schemas are
+    matched with the schemas whether or not ``$ref`` has been resolved.
+    Values that do not refer to any of the sub-schemas are omitted.
+
+    :param discriminator: The discriminator object.
+    :param sub_schemas: The sub-schemas of ``oneOf`` or ``anyOf``.
+    :param resolver: :class:`jsonschema.RefResolver` of the spec.
+    """
+    indexes_by_ref = {}
+    indexes_by_id = {}
+    for index, sub_schema in enumerate(sub_schemas):
+        ref = sub_schema.get('$ref')
+        if ref is not None:
+            indexes_by_ref.setdefault(ref, index)
+            target = _resolve(resolver, ref)
+            if target is not None:
+                indexes_by_id.setdefault(id(target), index)
+        indexes_by_id.setdefault(id(sub_schema), index)
+
+    branches = {}
+
+    components = resolver.referrer.get('components', {}).get('schemas', {})
+    for name, component in iteritems(components):
+        index = indexes_by_ref.get(_COMPONENTS_SCHEMAS + name)
+        if index is None:
+            index = indexes_by_id.get(id(component))
+        if index is not None:
+            branches[name] = index
+
+    for value, ref in iteritems(discriminator.get('mapping', {})):
+        if not ref.startswith('#') and '/' not in ref:
+            # The value is the name of the schema.
+            ref = _COMPONENTS_SCHEMAS + ref
+        index = indexes_by_ref.get(ref)
+        if index is None:
+            target = _resolve(resolver, ref)
+            if target is not None:
+                index = indexes_by_id.get(id(target))
+        if index is not None:
+            branches[value] = index
+        else:
+            branches.pop(value, None)
+
+    return branches
+
+
+def _resolve(resolver, ref):
+    # Only local references are resolved not to fetch remote documents.
+    if not ref.startswith('#'):
+        return None
+    try:
+        return resolver.resolve(ref)[1]
+    except RefResolutionError:
+        return None
@@ -5,13 +5,21 @@ from __future__ import unicode_literals
 
 import base64
 import binascii
+import collections
 import datetime
 import functools
+import re
 
 import jsonschema
+import six
 from six import integer_types
 from six import string_types
 
+try:
+    from functools import lru_cache
+except ImportError:  # pragma: no cover
+    from functools32 import lru_cache
+
 _primitive_types = {
     'integer': integer_types,
     'number': float,
@@ -19,31 +27,60 @@ _primitive_types = {
     'string': string_types,
 }
 
+Format = collections.namedtuple(
+    'Format', ['modifier', 'types', 'raises', 'checker']
+)
+
 
 class Formats(object):
     def __init__(self):
         self.format_checker = jsonschema.FormatChecker(formats=())
-        self._modifiers = {}
+        self._formats = {}
+
+    def register(self, name, schema_type, raises=(), cache_size=None):
+        """Return the decorator to register the modifier of the format.
 
-    def register(self, name, schema_type, raises=()):
+        :param cache_size: The maximum size of the LRU cache of the
+            results.  The results are shared among the instances, so it
+            must be used only if the results are immutable.
+        """
         types = _primitive_types[schema_type]
 
         def decorator(modifier):
+            convert = modifier
+            if cache_size:
+                convert = lru_cache(maxsize=cache_size, typed=True)(modifier)
+
             @self.format_checker.checks(name, raises=raises)
             def func(instance):
                 if not isinstance(instance, types):
                     # Let type validator handle the type error.
                     return True
-                modifier(instance)
+                convert(instance)
                 return True
 
-            self._modifiers[name] = modifier
+            self._formats[name] = Format(convert, types, raises, func)
             return modifier
 
         return decorator
 
+    def get_format(self, name):
+        """Return the :class:`Format` registered with the name.
+
+        It returns ``None`` if the format is not registered or the check
+        function of the format checker has been replaced since.
+        """
+        try:
+            fmt = self._formats[name]
+            func, _ = self.format_checker.checkers[name]
+        except KeyError:
+            return None
+        if func is not fmt.checker:
+            return None
+        return fmt
+
     def __getitem__(self, name):
-        return self._modifiers[name]
+        return self._formats[name].modifier
 
 
 default_formats = Formats()
@@ -67,26 +104,95 @@ _register('int32', 'integer', raises=ValueError)(
 _register('int64', 'integer', raises=ValueError)(
     functools.partial(bounded, min_value=-(2 ** 63), max_value=2 ** 63 - 1)
 )
-_register('byte', 'string', raises=(ValueError, TypeError))(base64.b64decode)
+# ``b64decode`` only converts ``str`` to ``bytes`` and, on Python 2, the
+# error to ``TypeError`` before calling ``a2b_base64``.
+_register('byte', 'string', raises=(ValueError, TypeError))(
+    base64.b64decode if six.PY2 else binascii.a2b_base64
+)
 _register('binary', 'string', raises=(ValueError, TypeError))(
     binascii.unhexlify
 )
 
+_DATE_RE = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})\Z')
+
 
 @_register('date', 'string', raises=ValueError)
 def parse_date(value):
-    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
-
+    match = _DATE_RE.match(value)
+    if match is None:
+        # ``strptime`` also accepts e.g. unpadded months and days.
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    year, month, day = match.groups()
+    return datetime.date(int(year), int(month), int(day))
+
+
+# The same syntax as ``pyrfc3339.parse``
+_DATE_TIME_RE = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})[Tt]([0-9]{2}):([0-9]{2}):([0-9]{2})'
+    r'(\.[0-9]+)?(?:[Zz]|([+-][0-9]{2}):([0-9]{2}))$'
+)
 
+_ONE_DAY = datetime.timedelta(days=1)
+
+
+def parse_date_time(value):
+    """Parse the RFC 3339 date-time into the naive datetime in UTC.
+
+    It accepts and rejects the same values as ``pyrfc3339.parse`` 1.1.
+    """
+    match = _DATE_TIME_RE.match(value)
+    if match is None:
+        raise ValueError('timestamp does not conform to RFC 3339')
+
+    (
+        year,
+        month,
+        day,
+        hour,
+        minute,
+        second,
+        secfrac,
+        offset_hours,
+        offset_minutes,
+    ) = match.groups()
+
+    if secfrac is None:
+        microsecond = 0
+    else:
+        microsecond = int(round(float(secfrac) * 1000000))
+
+    result = datetime.datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second),
+        microsecond,
+    )
+    if offset_hours is None:
+        return result
+
+    # The sign of the hours applies to the minutes, so that ``-00:30`` is
+    # 30 minutes ahead of UTC as in ``pyrfc3339``.
+    hours = int(offset_hours)
+    minutes = int(offset_minutes)
+    if hours < 0:
+        minutes = -minutes
+    offset = datetime.timedelta(hours=hours, minutes=minutes)
+    if not -_ONE_DAY < offset < _ONE_DAY:
+        raise ValueError('offset must be strictly between -24 and 24 hours')
+    return result - offset
+
+
+# ``date-time`` is unmarshaled only if opted in by the ``format`` extra,
+# which installs ``pyrfc3339``, though the parser does not use it.
 try:
     import pyrfc3339
 except ImportError:  # pragma: no cover
     pyrfc3339 = None
 else:
-
-    @_register('date-time', 'string', raises=ValueError)
-    def parse_date_time(value):
-        return pyrfc3339.parse(value, utc=True).replace(tzinfo=None)
+    _register('date-time', 'string', raises=ValueError)(parse_date_time)
 
 
 try:
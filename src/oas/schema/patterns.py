@@ -0,0 +1,55 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import re
+
+try:
+    import re2
+except ImportError:  # pragma: no cover
+    re2 = None
+
+# The compiled regular expressions by the patterns and whether RE2 is
+# used, which are never evicted unlike the small cache of :mod:`re` shared
+# by the whole process
+_patterns = {}
+
+
+def compile_pattern(pattern, use_re2=False):
+    """Return the compiled regular expression of the pattern.
+
+    The regular expression is compiled once per pattern.  If ``use_re2``
+    is true, the linear-time RE2 engine of the ``re2`` module is used for
+    the patterns it supports, so that a malicious instance cannot cause
+    catastrophic backtracking.  The other patterns, e.g. with
+    backreferences or lookarounds, are compiled by :mod:`re`.  RE2 may
+    accept different strings from :mod:`re`, e.g. ``\\d`` matches only
+    ASCII digits, so it is used only if requested.
+
+    :raises ImportError: If ``use_re2`` is true but ``re2`` is not
+        installed.
+    """
+    key = (pattern, bool(use_re2))
+    try:
+        return _patterns[key]
+    except KeyError:
+        pass
+
+    regex = None
+    if use_re2:
+        if re2 is None:
+            raise ImportError('re2 is required to use RE2')
+        try:
+            regex = re2.compile(pattern)
+        except re2.error:
+            pass
+    if regex is None:
+        regex = re.compile(pattern)
+    _patterns[key] = regex
+    return regex
+
+
+def search(pattern, string, use_re2=False):
+    """Return whether the pattern matches anywhere in the string."""
+    return compile_pattern(pattern, use_re2).search(string) is not None
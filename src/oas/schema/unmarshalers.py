@@ -3,37 +3,205 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import jsonschema
 from six import iteritems
+from six import string_types
 
+from ..exceptions import prepend_path
 from ..exceptions import ValidationError
 from ..utils import cached_property
+from .compilers import Invalid
+from .compilers import SchemaCompiler
+from .discriminators import get_branches
 from .formats import default_formats
 from .validators import SchemaValidator
+from .views import ArrayView
+from .views import copy_default
+from .views import ObjectView
 
 
 class SchemaUnmarshaler(object):
-    def __init__(self, spec=None, formats=None):
+    """Unmarshaler of instances with schemas in the spec.
+
+    :param spec: :class:`~oas.spec.Spec`.
+    :param formats: :class:`~oas.schema.formats.Formats`.
+    :param max_errors: The maximum number of errors collected for an
+        invalid instance.  ``1`` stops at the first error.
+    :param copy: If true, the unmarshaled instance shares no lists or
+        dicts with the instance.  Otherwise, the instance itself is
+        returned for schemas that never transform instances, and the
+        parts without transformation are shared.
+    :param lazy: If true, objects and arrays are unmarshaled into
+        :class:`~oas.schema.views.ObjectView` and
+        :class:`~oas.schema.views.ArrayView`, whose values are unmarshaled
+        on access.  The instance is still validated up front.
+    :param backend: The class of the validator backend to collect the
+        errors.  See :class:`.SchemaValidator`.
+    :param use_re2: If true, ``pattern`` and ``patternProperties`` are
+        compiled by RE2 of the ``re2`` module, which must be installed.
+        See :func:`~oas.schema.patterns.compile_pattern`.
+    """
+
+    def __init__(
+        self,
+        spec=None,
+        formats=None,
+        max_errors=None,
+        copy=False,
+        lazy=False,
+        backend=None,
+        use_re2=False,
+    ):
         if formats is None:
             formats = default_formats
 
         self._spec = spec
         self._formats = formats
+        self._backend = backend
+        self._use_re2 = use_re2
+        self.max_errors = max_errors
+        self.copy = copy
+        self.lazy = lazy
+        self._functions = {}
+        self._branches = {}
 
-    def unmarshal(self, instance, schema):
+    def unmarshal(self, instance, schema, max_errors=None):
         """Validate and unmarshal the instance with the schema.
 
-        :meth:`~._unmarshal` can assume the validated instance.
+        The schema is compiled into a function to validate and unmarshal
+        the instance in one pass, which stops at the first error.  Only if
+        the instance is invalid, :class:`.SchemaValidator` collects up to
+        ``max_errors`` errors, :attr:`max_errors` by default.
         """
-        self._validator.validate(instance, schema)
-        return self._unmarshal(instance, schema)
+        if max_errors is None:
+            max_errors = self.max_errors
+        try:
+            return self.compile(schema)(instance)
+        except Invalid:
+            self._validator.validate(instance, schema, max_errors)
+        # Unreachable as long as the compiled function agrees with the
+        # validator.
+        return self._unmarshal(instance, schema)  # pragma: no cover
+
+    def unmarshal_many(self, instances, schema, start=0):
+        """Validate and unmarshal the instances with the schema.
+
+        The schema is compiled only once for all the instances.  It
+        generates ``(unmarshaled, None)`` for each valid instance and
+        ``(None, errors)`` for each invalid instance in order.  The index
+        of the instance, counted from ``start``, is prepended to ``path``
+        of the errors.
+
+        See :func:`oas.executors.unmarshal_many` to spread the instances
+        across an executor.
+        """
+        func = self.compile(schema)
+        for index, instance in enumerate(instances, start):
+            try:
+                yield func(instance), None
+            except Invalid:
+                try:
+                    self._validator.validate(
+                        instance, schema, self.max_errors
+                    )
+                except ValidationError as e:
+                    for error in e.errors:
+                        prepend_path(error, (index,))
+                    yield None, e.errors
+                else:  # pragma: no cover
+                    yield self._unmarshal(instance, schema), None
+
+    def compile(self, schema):
+        """Return the compiled function to unmarshal instances.
+
+        The function raises :exc:`~oas.schema.compilers.Invalid` without
+        details if the instance is invalid.  If the schema never
+        transforms instances, the function only validates the instance.
+        The function is cached only if the schema is in the spec.
+        """
+        try:
+            return self._functions[id(schema)][1]
+        except KeyError:
+            pass
+
+        if self.lazy:
+            validate = self._compiler.compile_validator(schema)
+            copy = _copy if self.copy else None
+            unmarshal_lazy = self._unmarshal_lazy
+
+            def func(instance):
+                validate(instance)
+                if copy is not None:
+                    instance = copy(instance)
+                return unmarshal_lazy(instance, schema)
+
+        elif self._compiler.is_identity(schema):
+            validate = self._compiler.compile_validator(schema)
+            copy = _copy if self.copy else None
+
+            def func(instance):
+                validate(instance)
+                return instance if copy is None else copy(instance)
+
+        else:
+            unmarshal = self._compiler.compile(schema)
+            if self.copy:
+
+                def func(instance):
+                    return _copy(unmarshal(instance))
+
+            else:
+                func = unmarshal
+
+        if self._compiler.owns(schema):
+            self._functions[id(schema)] = (schema, func)
+        return func
+
+    @cached_property
+    def _spec_dict(self):
+        return self._spec.data if self._spec is not None else {}
 
     @cached_property
     def _validator(self):
         return SchemaValidator(
-            self._spec.data if self._spec is not None else {},
+            self._spec_dict,
             format_checker=self._formats.format_checker,
+            backend=self._backend,
+            use_re2=self._use_re2,
+        )
+
+    @cached_property
+    def _resolver(self):
+        return jsonschema.RefResolver.from_schema(self._spec_dict)
+
+    @cached_property
+    def _compiler(self):
+        return SchemaCompiler(
+            self._spec_dict,
+            self._formats,
+            self._unmarshal,
+            use_re2=self._use_re2,
         )
 
+    def _unmarshal_lazy(self, instance, schema):
+        if instance is None or self._compiler.is_identity(schema):
+            return instance
+
+        if not (
+            schema.get('allOf') or schema.get('oneOf') or schema.get('anyOf')
+        ):
+            schema_type = schema.get('type')
+            if schema_type == 'object':
+                return ObjectView(instance, schema, self._unmarshal_lazy)
+            if schema_type == 'array' and isinstance(
+                schema.get('items'), dict
+            ):
+                return ArrayView(
+                    instance, schema['items'], self._unmarshal_lazy
+                )
+
+        return self._unmarshal(instance, schema)
+
     def _unmarshal(self, instance, schema):
         if instance is None:
             # Support nullable value
@@ -44,7 +212,8 @@ class SchemaUnmarshaler(object):
             result = self._unmarshal(instance, next(sub_schemas))
             # If the first sub-schema of ``allOf`` specifies an object, also
             # unmarshal the remaining sub-schemas and merge the results.
-            if schema['allOf'][0].get('type', 'object') == 'object':
+            first_type = schema['allOf'][0].get('type', 'object')
+            if first_type == 'object' and isinstance(instance, dict):
                 for sub_schema in sub_schemas:
                     for k, v in iteritems(
                         self._unmarshal(instance, sub_schema)
@@ -56,11 +225,18 @@ class SchemaUnmarshaler(object):
                             result[k] = v
             return result
 
-        for sub_schema in schema.get('oneOf') or schema.get('anyOf') or []:
+        sub_schemas = schema.get('oneOf') or schema.get('anyOf') or []
+        if sub_schemas and 'discriminator' in schema:
+            index = self._discriminate(instance, schema, sub_schemas)
+            if index is not None:
+                sub_schemas = [sub_schemas[index]]
+
+        for sub_schema in sub_schemas:
+            # The compiled function selects the branch and unmarshals the
+            # instance in one pass without collecting the errors.
             try:
-                # TODO: Remove duplicate validation
-                return self.unmarshal(instance, sub_schema)
-            except ValidationError:
+                return self.compile(sub_schema)(instance)
+            except Invalid:
                 pass
 
         try:
@@ -70,6 +246,28 @@ class SchemaUnmarshaler(object):
         else:
             return handler(self, instance, schema)
 
+    def _discriminate(self, instance, schema, sub_schemas):
+        """Return the index of the branch selected by the discriminator.
+
+        It returns ``None`` if the instance has no valid discriminator
+        value, e.g. if it is not an object.
+        """
+        if not isinstance(instance, dict):
+            return None
+        discriminator = schema['discriminator']
+        value = instance.get(discriminator['propertyName'])
+        if not isinstance(value, string_types):
+            return None
+
+        key = id(schema)
+        try:
+            branches = self._branches[key][1]
+        except KeyError:
+            branches = get_branches(discriminator, sub_schemas, self._resolver)
+            if self._compiler.owns(schema):
+                self._branches[key] = (schema, branches)
+        return branches.get(value)
+
     def _unmarshal_array(self, instance, schema):
         # ``items`` MUST be present if the ``type`` is ``array``.
         return [self._unmarshal(x, schema['items']) for x in instance]
@@ -86,10 +284,9 @@ class SchemaUnmarshaler(object):
             try:
                 value = instance[name]
             except KeyError:
-                try:
-                    value = sub_schema['default']
-                except KeyError:
+                if 'default' not in sub_schema:
                     continue
+                value = copy_default(sub_schema)
             result[name] = self._unmarshal(value, sub_schema)
 
         additional_properties = schema.get('additionalProperties', True)
@@ -120,3 +317,11 @@ class SchemaUnmarshaler(object):
         'array': _unmarshal_array,
         'object': _unmarshal_object,
     }
+
+
+def _copy(instance):
+    if isinstance(instance, dict):
+        return dict((k, _copy(v)) for k, v in iteritems(instance))
+    if isinstance(instance, list):
+        return [_copy(x) for x in instance]
+    return instance
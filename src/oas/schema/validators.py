@@ -3,10 +3,17 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import itertools
+
+import jsonschema
 from jsonschema import Draft4Validator
 from jsonschema import validators
+from six import iteritems
+from six import string_types
 
 from ..exceptions import ValidationError
+from .discriminators import get_branches
+from .patterns import search
 
 
 def _nullable(base_validator):
@@ -19,20 +26,192 @@ def _nullable(base_validator):
     return _validator
 
 
-_Validator = validators.extend(
-    Draft4Validator,
-    {
-        'type': _nullable(Draft4Validator.VALIDATORS['type']),
-        'enum': _nullable(Draft4Validator.VALIDATORS['enum']),
-    },
-)
+def _discriminated(base_validator):
+    def _validator(validator, sub_schemas, instance, schema):
+        discriminator = schema.get('discriminator')
+        if discriminator is None or not validator.is_type(instance, 'object'):
+            for error in base_validator(
+                validator, sub_schemas, instance, schema
+            ):
+                yield error
+            return
+
+        property_name = discriminator['propertyName']
+        try:
+            value = instance[property_name]
+        except KeyError:
+            yield jsonschema.ValidationError(
+                '{!r} is a required property'.format(property_name),
+                validator='discriminator',
+                validator_value=discriminator,
+            )
+            return
+
+        branches = get_branches(discriminator, sub_schemas, validator.resolver)
+        if isinstance(value, string_types):
+            index = branches.get(value)
+        else:
+            index = None
+        if index is None:
+            yield jsonschema.ValidationError(
+                '{!r} is not a valid value of {!r}'.format(
+                    value, property_name
+                ),
+                validator='discriminator',
+                validator_value=discriminator,
+                path=(property_name,),
+            )
+            return
+
+        for error in validator.descend(
+            instance, sub_schemas[index], schema_path=index
+        ):
+            yield error
+
+    return _validator
+
+
+def _pattern(use_re2):
+    def _validator(validator, pattern, instance, schema):
+        if validator.is_type(instance, 'string') and not search(
+            pattern, instance, use_re2
+        ):
+            yield jsonschema.ValidationError(
+                '%r does not match %r' % (instance, pattern)
+            )
+
+    return _validator
+
+
+def _pattern_properties(use_re2):
+    def _validator(validator, pattern_properties, instance, schema):
+        if not validator.is_type(instance, 'object'):
+            return
+
+        for pattern, sub_schema in iteritems(pattern_properties):
+            for k, v in iteritems(instance):
+                if search(pattern, k, use_re2):
+                    for error in validator.descend(
+                        v, sub_schema, path=k, schema_path=pattern
+                    ):
+                        yield error
+
+    return _validator
+
+
+def _join_reprs(values):
+    return ', '.join(repr(value) for value in values)
+
+
+def _additional_properties(use_re2):
+    # The same as ``Draft4Validator`` except for the regular expressions
+    def _validator(validator, additional_properties, instance, schema):
+        if not validator.is_type(instance, 'object'):
+            return
+
+        properties = schema.get('properties', {})
+        patterns = '|'.join(schema.get('patternProperties', {}))
+        extras = [
+            k
+            for k in instance
+            if k not in properties
+            and not (patterns and search(patterns, k, use_re2))
+        ]
+
+        if validator.is_type(additional_properties, 'object'):
+            for extra in extras:
+                for error in validator.descend(
+                    instance[extra], additional_properties, path=extra
+                ):
+                    yield error
+        elif not additional_properties and extras:
+            if 'patternProperties' in schema:
+                verb = 'does' if len(extras) == 1 else 'do'
+                message = '%s %s not match any of the regexes: %s' % (
+                    _join_reprs(sorted(extras)),
+                    verb,
+                    _join_reprs(sorted(schema['patternProperties'])),
+                )
+            else:
+                verb = 'was' if len(extras) == 1 else 'were'
+                message = (
+                    'Additional properties are not allowed (%s %s unexpected)'
+                    % (_join_reprs(extras), verb)
+                )
+            yield jsonschema.ValidationError(message)
+
+    return _validator
+
+
+def _extend(use_re2):
+    return validators.extend(
+        Draft4Validator,
+        {
+            'type': _nullable(Draft4Validator.VALIDATORS['type']),
+            'enum': _nullable(Draft4Validator.VALIDATORS['enum']),
+            'oneOf': _discriminated(Draft4Validator.VALIDATORS['oneOf']),
+            'anyOf': _discriminated(Draft4Validator.VALIDATORS['anyOf']),
+            'pattern': _pattern(use_re2),
+            'patternProperties': _pattern_properties(use_re2),
+            'additionalProperties': _additional_properties(use_re2),
+        },
+    )
+
+
+_Validator = _extend(False)
+_RE2Validator = _extend(True)
+
+
+class JSONSchemaBackend(object):
+    """Validator backend interpreting schemas with :mod:`jsonschema`.
+
+    A validator backend is created with the root schema, the format
+    checker and whether to compile ``pattern`` by RE2, and generates
+    :class:`jsonschema.ValidationError` of the instance with
+    :meth:`iter_errors`.
+    """
+
+    def __init__(self, schema, format_checker=None, use_re2=False):
+        validator_class = _RE2Validator if use_re2 else _Validator
+        self._validator = validator_class(
+            schema, format_checker=format_checker
+        )
+
+    def iter_errors(self, instance, schema):
+        return self._validator.iter_errors(instance, schema)
 
 
 class SchemaValidator(object):
-    def __init__(self, schema, format_checker=None):
-        self._validator = _Validator(schema, format_checker=format_checker)
+    """Validator of instances with schemas.
+
+    :param schema: The root schema to resolve ``$ref``.
+    :param format_checker: :class:`jsonschema.FormatChecker`.
+    :param backend: The class of the validator backend,
+        :class:`JSONSchemaBackend` by default.  See also
+        :class:`~oas.schema.codegen.CodegenBackend`.
+    :param use_re2: Whether to compile ``pattern`` by RE2.  See
+        :func:`~oas.schema.patterns.compile_pattern`.
+    """
+
+    def __init__(
+        self, schema, format_checker=None, backend=None, use_re2=False
+    ):
+        if backend is None:
+            backend = JSONSchemaBackend
+
+        self._validator = backend(
+            schema, format_checker=format_checker, use_re2=use_re2
+        )
+
+    def validate(self, instance, schema, max_errors=None):
+        """Validate the instance with the schema.
 
-    def validate(self, instance, schema):
-        errors = list(self._validator.iter_errors(instance, schema))
+        If ``max_errors`` is given, it stops walking the instance after
+        finding that number of errors.
+        """
+        errors = self._validator.iter_errors(instance, schema)
+        if max_errors is not None:
+            errors = itertools.islice(errors, max_errors)
+        errors = list(errors)
         if errors:
             raise ValidationError(errors)
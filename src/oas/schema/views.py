@@ -0,0 +1,147 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import copy
+
+from six import iteritems
+
+try:
+    from collections.abc import Mapping
+    from collections.abc import Sequence
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+    from collections import Sequence
+
+
+def copy_default(schema):
+    """Return the copy of the mutable ``default`` of the schema.
+
+    The default is copied deeply, so that modifying the unmarshaled value
+    does not modify the spec.
+    """
+    default = schema['default']
+    if isinstance(default, (dict, list)):
+        return copy.deepcopy(default)
+    return default
+
+
+class ObjectView(Mapping):
+    """Read-only view of the validated object unmarshaled on access.
+
+    The value of each property is unmarshaled when it is accessed first,
+    and memoized.  The properties with ``default`` are included even if
+    they are absent from the object.
+
+    :param instance: The validated object.
+    :param schema: The schema of the object.
+    :param unmarshal: The function to unmarshal the value of a property
+        with its schema.
+    """
+
+    def __init__(self, instance, schema, unmarshal):
+        self._instance = instance
+        self._properties = schema.get('properties', {})
+        # The schema of the additional properties, which is ``None`` if
+        # they are dropped as by ``SchemaUnmarshaler``.
+        additional_properties = schema.get('additionalProperties', True)
+        if isinstance(additional_properties, dict):
+            self._additional_properties = additional_properties
+        elif additional_properties is True:
+            self._additional_properties = {}
+        else:
+            self._additional_properties = None
+        self._unmarshal = unmarshal
+        self._values = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        value, schema = self._lookup(key)
+        value = self._values[key] = self._unmarshal(value, schema)
+        return value
+
+    def _lookup(self, key):
+        try:
+            schema = self._properties[key]
+        except KeyError:
+            if self._additional_properties is None:
+                raise KeyError(key)
+            return self._instance[key], self._additional_properties
+
+        try:
+            return self._instance[key], schema
+        except KeyError:
+            pass
+        if 'default' not in schema:
+            raise KeyError(key)
+        return copy_default(schema), schema
+
+    def __iter__(self):
+        properties = self._properties
+        additional = self._additional_properties is not None
+        for key in self._instance:
+            if additional or key in properties:
+                yield key
+        for key, schema in iteritems(properties):
+            if key not in self._instance and 'default' in schema:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, dict(self))
+
+
+class ArrayView(Sequence):
+    """Read-only view of the validated array unmarshaled on access.
+
+    :param instance: The validated array.
+    :param items: The schema of the items.
+    :param unmarshal: The function to unmarshal an item with the schema.
+    """
+
+    def __init__(self, instance, items, unmarshal):
+        self._instance = instance
+        self._items = items
+        self._unmarshal = unmarshal
+        self._values = {}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self._instance)
+        try:
+            return self._values[index]
+        except KeyError:
+            pass
+
+        value = self._instance[index]
+        value = self._values[index] = self._unmarshal(value, self._items)
+        return value
+
+    def __len__(self):
+        return len(self._instance)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, ArrayView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, list(self))
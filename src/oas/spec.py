@@ -3,63 +3,158 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import copy
+import gc
 
-import jsonref
-
-try:
-    from functools import lru_cache
-except ImportError:  # pragma: no cover
-    from functools32 import lru_cache
+from six import iteritems
+from six import itervalues
 from six.moves.urllib_parse import urlparse
 
 from .exceptions import UndocumentedMediaType
+from .parameters.unmarshalers import compile_parameters
+from .parameters.unmarshalers import ParameterList
+from .refs import resolve_refs
+from .routers import Router
+from .utils import cached_property
+
+_methods = frozenset(
+    ['get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace']
+)
 
 
 def create_spec_from_dict(spec_dict):
-    deref_spec_dict = jsonref.JsonRef.replace_refs(spec_dict)
-    return Spec(copy.deepcopy(deref_spec_dict))
+    deref_spec_dict, load_stats = resolve_refs(spec_dict)
+    return Spec(deref_spec_dict, load_stats=load_stats)
 
 
 class Spec(object):
-    def __init__(self, spec_dict):
+    def __init__(self, spec_dict, load_stats=None):
         self.data = spec_dict
+        self.load_stats = load_stats
         self.base_path = _get_base_path(spec_dict)
         self._base_security = _get_security(spec_dict)
 
-    @lru_cache(maxsize=None)
+    def compile(self, schema_unmarshaler=None):
+        """Build the operation table and the router in advance.
+
+        The plans to unmarshal the parameters are also built.  If
+        ``schema_unmarshaler`` is given, the schemas of the operations are
+        compiled by it.
+        """
+        operations = self._operations
+        self._router
+        for operation, _ in itervalues(operations):
+            compile_parameters(operation['parameters'])
+        if schema_unmarshaler is not None:
+            for operation, _ in itervalues(operations):
+                for schema in _iter_schemas(operation):
+                    schema_unmarshaler.compile(schema)
+        return self
+
+    def freeze(self, schema_unmarshaler=None):
+        """Warm up the spec and freeze it for sharing between processes.
+
+        It builds everything lazily built otherwise by :meth:`compile`,
+        and then moves all the objects tracked by the garbage collector to
+        the permanent generation with :func:`gc.freeze` if available.
+        The objects are no longer written by the collector of forked
+        processes, so that the memory pages are kept shared.
+
+        Call it in the parent process right before forking workers.
+        """
+        self.compile(schema_unmarshaler)
+        if hasattr(gc, 'freeze'):
+            gc.collect()
+            gc.freeze()
+        return self
+
     def get_operation(self, uri_template, method, media_type):
         if not uri_template.startswith(self.base_path):
             return None
 
         path = uri_template[len(self.base_path) :]
         try:
-            # ``paths`` is required in OpenAPI Object.
-            path_item = self.data['paths'][path]
-            operation = path_item[method]
+            operation, media_types = self._operations[path, method]
         except KeyError:
             return None
 
-        if 'requestBody' in operation:
-            # TODO: Support media type range
-            # ``content`` is required in Request Body Object.
-            if media_type not in operation['requestBody']['content']:
-                raise UndocumentedMediaType()
+        # TODO: Support media type range
+        if media_types is not None and media_type not in media_types:
+            raise UndocumentedMediaType()
+
+        return operation
 
+    def match_operation(self, path, method, media_type):
+        """Return the operation and the path parameters of the request.
+
+        Unlike :meth:`get_operation`, it takes the concrete request path
+        including the base path.  It returns ``None`` if no operation
+        matches the request.
+        """
+        matched = self.route(path)
+        if matched is None:
+            return None
+
+        uri_template, path_params = matched
+        operation = self.get_operation(uri_template, method, media_type)
+        if operation is None:
+            return None
+        return operation, path_params
+
+    def route(self, path):
+        """Return the URI template and the path parameters of the path.
+
+        It returns ``None`` if no URI template matches the path.
+        """
+        return self._router.match(path)
+
+    def get_security_schemes(self):
+        try:
+            return self.data['components']['securitySchemes']
+        except KeyError:
+            return None
+
+    @cached_property
+    def _operations(self):
+        """Return the operation table keyed by the path and the method.
+
+        The value is a tuple of the operation and the set of the media
+        types of the request body, which is ``None`` if the operation has
+        no request body.
+        """
+        operations = {}
+        for path, path_item in iteritems(self.data.get('paths', {})):
+            for method, operation in iteritems(path_item):
+                if method not in _methods:
+                    continue
+                operations[path, method] = self._build_operation(
+                    operation, path_item
+                )
+        return operations
+
+    @cached_property
+    def _router(self):
+        return Router(
+            self.base_path + path for path in self.data.get('paths', {})
+        )
+
+    def _build_operation(self, operation, path_item):
         result = operation.copy()
-        result['parameters'] = list(self._iter_parameters(result, path_item))
+        result['parameters'] = ParameterList(
+            self._iter_parameters(result, path_item)
+        )
         # ``security`` of Operation Object overrides any declared
         # top-level ``security``.
         result['security'] = _get_security(
             result, base_security=self._base_security
         )
-        return result
 
-    def get_security_schemes(self):
-        try:
-            return self.data['components']['securitySchemes']
-        except KeyError:
-            return None
+        if 'requestBody' in operation:
+            # ``content`` is required in Request Body Object.
+            media_types = frozenset(operation['requestBody']['content'])
+        else:
+            media_types = None
+
+        return result, media_types
 
     def _iter_parameters(self, operation, path_item):
         """Iterate parameters of Operation Object and Path Item Object.
@@ -103,3 +198,16 @@ def _get_base_path(spec_dict):
 
 def _get_security(spec_dict, base_security=None):
     return spec_dict.get('security', base_security)
+
+
+def _iter_schemas(operation):
+    for parameter_spec_dict in operation['parameters']:
+        if 'schema' in parameter_spec_dict:
+            yield parameter_spec_dict['schema']
+
+    if 'requestBody' in operation:
+        for media_type_spec_dict in itervalues(
+            operation['requestBody']['content']
+        ):
+            if 'schema' in media_type_spec_dict:
+                yield media_type_spec_dict['schema']
@@ -4,6 +4,12 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import functools
+import json
+
+from six.moves.http_cookies import SimpleCookie
+from six.moves.urllib_parse import parse_qsl
+
+from .exceptions import MalformedJSON
 
 
 class cached_property(object):
@@ -16,3 +22,61 @@ class cached_property(object):
             return self
         value = instance.__dict__[self.__name__] = self.func(instance)
         return value
+
+
+def is_json_media_type(media_type):
+    return media_type is not None and (
+        media_type == 'application/json' or media_type.endswith('+json')
+    )
+
+
+def load_media(media_type, body):
+    """Deserialize the request body of the media type.
+
+    Only JSON is deserialized.  The body of the other media types is
+    returned as is.
+
+    :raises ~oas.exceptions.MalformedJSON: If the body is not valid JSON.
+    """
+    if not is_json_media_type(media_type):
+        return body
+    try:
+        return json.loads(body.decode('utf-8'))
+    except ValueError:
+        raise MalformedJSON()
+
+
+def parse_media_type(content_type):
+    """Return the media type of the content type without parameter."""
+    if content_type:
+        return content_type.split(';', 1)[0].strip().lower()
+    return None
+
+
+class QueryDict(dict):
+    """Dict of the query parameters where the first value wins.
+
+    All the values of a parameter are available by :meth:`getall`.
+    """
+
+    def __init__(self, pairs=()):
+        super(QueryDict, self).__init__()
+        self._lists = {}
+        for k, v in pairs:
+            self.setdefault(k, v)
+            self._lists.setdefault(k, []).append(v)
+
+    def getall(self, name):
+        """Return the list of all the values of the parameter."""
+        return self._lists[name]
+
+
+def parse_query(query_string):
+    """Parse the query string into :class:`QueryDict`."""
+    return QueryDict(parse_qsl(query_string, keep_blank_values=True))
+
+
+def parse_cookie(cookie_string):
+    cookie = SimpleCookie()
+    cookie.load(str(cookie_string))
+    return {k: morsel.value for k, morsel in cookie.items()}
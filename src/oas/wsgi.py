@@ -0,0 +1,245 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+
+from .exceptions import MalformedJSON
+from .exceptions import UndocumentedMediaType
+from .exceptions import UnmarshalError
+from .request.models import Request
+from .request.unmarshalers import unmarshal_operation_parameters
+from .request.unmarshalers import unmarshal_request
+from .schema.unmarshalers import SchemaUnmarshaler
+from .utils import cached_property
+from .utils import is_json_media_type
+from .utils import load_media
+from .utils import parse_cookie
+from .utils import parse_media_type
+from .utils import parse_query
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+ENVIRON_OPERATION = 'oas.operation'
+ENVIRON_PARAMETERS = 'oas.parameters'
+ENVIRON_REQUEST_BODY = 'oas.request_body'
+
+# The response body for the request body which is not valid JSON
+MALFORMED_JSON_ERROR = {
+    'request_body': [
+        {'path': [], 'validator': None, 'message': 'Malformed JSON'}
+    ]
+}
+
+
+class OASMiddleware(object):
+    """WSGI middleware to unmarshal requests.
+
+    The unmarshaled parameters and request body are stored in the environ
+    with the keys :data:`ENVIRON_PARAMETERS` and
+    :data:`ENVIRON_REQUEST_BODY`.  Requests which do not match any
+    operation are passed through as is.  Invalid requests are responded
+    with ``400 Bad Request`` without calling the application.  Only JSON
+    request bodies are unmarshaled.  The request body of the other
+    documented media types, e.g. forms, is left to the application, and
+    :data:`ENVIRON_REQUEST_BODY` is ``None``.
+
+    :param app: The WSGI application.
+    :param spec: :class:`~oas.spec.Spec`.
+    :param schema_unmarshaler: :class:`~oas.SchemaUnmarshaler` used for
+        all the requests.  Its :attr:`~oas.SchemaUnmarshaler.max_errors`
+        also caps the errors in the response.
+    :param max_message_length: The maximum length of the error messages
+        in the response.
+    :param instance_repr: Whether to include ``repr`` of the invalid
+        instances in the error messages.  See
+        :meth:`~oas.exceptions.UnmarshalError.to_dict`.
+    """
+
+    def __init__(
+        self,
+        app,
+        spec,
+        schema_unmarshaler=None,
+        max_message_length=None,
+        instance_repr=True,
+    ):
+        if schema_unmarshaler is None:
+            schema_unmarshaler = SchemaUnmarshaler(spec=spec)
+        # Compile up front rather than by the first requests in parallel.
+        spec.compile(schema_unmarshaler)
+
+        self.app = app
+        self.spec = spec
+        self.schema_unmarshaler = schema_unmarshaler
+        self.max_message_length = max_message_length
+        self.instance_repr = instance_repr
+
+    def __call__(self, environ, start_response):
+        path = environ.get('SCRIPT_NAME', '') + environ.get('PATH_INFO', '')
+        matched = self.spec.route(path)
+        if matched is None:
+            return self.app(environ, start_response)
+
+        uri_template, path_params = matched
+        request = WSGIRequest(environ, uri_template, path_params)
+        try:
+            operation = self.spec.get_operation(
+                uri_template, request.method, request.media_type
+            )
+        except UndocumentedMediaType:
+            return _respond_error(
+                start_response,
+                '415 Unsupported Media Type',
+                {'media_type': request.media_type},
+            )
+        if operation is None:
+            return self.app(environ, start_response)
+
+        try:
+            if is_json_media_type(request.media_type):
+                parameters, request_body = unmarshal_request(
+                    self.schema_unmarshaler, request, operation
+                )
+            else:
+                parameters = self._unmarshal_parameters(request, operation)
+                request_body = None
+        except UnmarshalError as e:
+            return _respond_error(
+                start_response, '400 Bad Request', self.error_to_dict(e)
+            )
+        except MalformedJSON:
+            return _respond_error(
+                start_response, '400 Bad Request', MALFORMED_JSON_ERROR
+            )
+
+        environ[ENVIRON_OPERATION] = operation
+        environ[ENVIRON_PARAMETERS] = parameters
+        environ[ENVIRON_REQUEST_BODY] = request_body
+        return self.app(environ, start_response)
+
+    def _unmarshal_parameters(self, request, operation):
+        parameters, parameter_errors = unmarshal_operation_parameters(
+            self.schema_unmarshaler,
+            request,
+            operation,
+            max_errors=self.schema_unmarshaler.max_errors,
+        )
+        if parameter_errors:
+            raise UnmarshalError(parameter_errors)
+        return parameters
+
+    def error_to_dict(self, error):
+        """Serialize :class:`~oas.exceptions.UnmarshalError` with the caps."""
+        return error.to_dict(
+            max_errors=self.schema_unmarshaler.max_errors,
+            max_message_length=self.max_message_length,
+            instance_repr=self.instance_repr,
+        )
+
+
+class WSGIRequest(Request):
+    """:class:`~oas.Request` over the WSGI environ.
+
+    The query, the headers and the cookies are parsed on first access, and
+    the body is read from ``wsgi.input`` at most once.
+    """
+
+    def __init__(self, environ, uri_template, path_params):
+        self._environ = environ
+        self._uri_template = uri_template
+        self._path_params = path_params
+
+    @property
+    def uri_template(self):
+        return self._uri_template
+
+    @cached_property
+    def method(self):
+        return self._environ['REQUEST_METHOD'].lower()
+
+    @property
+    def context(self):
+        return self._environ
+
+    @property
+    def path(self):
+        return self._path_params
+
+    @cached_property
+    def query(self):
+        return parse_query(self._environ.get('QUERY_STRING', ''))
+
+    @cached_property
+    def header(self):
+        return _Headers(self._environ)
+
+    @cached_property
+    def cookie(self):
+        return parse_cookie(self._environ.get('HTTP_COOKIE', ''))
+
+    @cached_property
+    def content_length(self):
+        try:
+            return int(self._environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return 0
+
+    @cached_property
+    def media_type(self):
+        return parse_media_type(self._environ.get('CONTENT_TYPE'))
+
+    @cached_property
+    def media(self):
+        return load_media(self.media_type, self.body)
+
+    @cached_property
+    def body(self):
+        body = self._environ['wsgi.input'].read(self.content_length)
+        # Let the application read the consumed body again.
+        self._environ['wsgi.input'] = io.BytesIO(body)
+        return body
+
+
+class _Headers(Mapping):
+    """Case-insensitive view of the headers in the WSGI environ."""
+
+    def __init__(self, environ):
+        self._environ = environ
+
+    def __getitem__(self, name):
+        return self._environ[_to_environ_key(name)]
+
+    def __iter__(self):
+        for key in self._environ:
+            if key.startswith('HTTP_'):
+                yield key[5:].replace('_', '-').title()
+            elif key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                yield key.replace('_', '-').title()
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _to_environ_key(name):
+    key = name.upper().replace('-', '_')
+    if key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+        return key
+    return 'HTTP_' + key
+
+
+def _respond_error(start_response, status, obj):
+    body = json.dumps(obj, default=str).encode('utf-8')
+    start_response(
+        str(status),
+        [
+            (str('Content-Type'), str('application/json')),
+            (str('Content-Length'), str(len(body))),
+        ],
+    )
+    return [body]
@@ -7,8 +7,13 @@ from __future__ import unicode_literals
 import os
 
 import pytest
+import six
 import yaml
 
+if six.PY2:
+    # ``async`` syntax and ``concurrent.futures`` are not available.
+    collect_ignore = ['test_asgi.py', 'test_executors.py']
+
 
 @pytest.fixture
 def petstore_dict():
@@ -5,8 +5,10 @@ from __future__ import unicode_literals
 
 import pytest
 
+from oas.parameters.deserializers import compile_deserializer
 from oas.parameters.deserializers import deserialize_parameter
 from oas.parameters.models import Parameters
+from oas.utils import parse_query
 
 LOCATION = 'query'
 NAME = 'p'
@@ -98,8 +100,7 @@ def test_deserialize_parameter_parse_success(
         ('x', 'number'),
         ('2', 'boolean'),
         ('x', 'boolean'),
-        ('{}', 'object'),  # Unsupported yet
-        ('[]', 'array'),  # Unsupported yet
+        ('x', 'unknown'),
     ],
 )
 def test_deserialize_parameter_parse_error(value, schema_type):
@@ -108,3 +109,148 @@ def test_deserialize_parameter_parse_error(value, schema_type):
 
     result = deserialize(parameters, parameter_spec_dict)
     assert result == (value, parameter_spec_dict['schema'])
+
+
+@pytest.mark.parametrize(
+    'location,style,explode,values,expected',
+    [
+        ('path', None, None, {'p': '1,2'}, [1, 2]),
+        ('path', 'simple', True, {'p': '1,2'}, [1, 2]),
+        ('path', 'label', False, {'p': '.1,2'}, [1, 2]),
+        ('path', 'label', True, {'p': '.1.2'}, [1, 2]),
+        ('path', 'matrix', False, {'p': ';p=1,2'}, [1, 2]),
+        ('path', 'matrix', True, {'p': ';p=1;p=2'}, [1, 2]),
+        ('query', None, None, parse_query('p=1&p=2&q=3'), [1, 2]),
+        ('query', None, None, {'p': '1'}, [1]),
+        ('query', 'form', False, {'p': '1,2'}, [1, 2]),
+        ('query', 'form', False, {'p': ''}, []),
+        ('query', 'spaceDelimited', False, {'p': '1 2'}, [1, 2]),
+        ('query', 'spaceDelimited', True, parse_query('p=1&p=2'), [1, 2]),
+        ('query', 'pipeDelimited', False, {'p': '1|2'}, [1, 2]),
+        ('header', None, None, {'p': '1,2'}, [1, 2]),
+        ('cookie', 'form', False, {'p': '1,2'}, [1, 2]),
+        ('query', 'form', False, {'p': '1,x'}, [1, 'x']),
+        ('path', 'label', False, {'p': '1,2'}, '1,2'),
+    ],
+)
+def test_deserialize_parameter_array(
+    location, style, explode, values, expected
+):
+    parameter_spec_dict = {
+        'name': NAME,
+        'in': location,
+        'schema': {'type': 'array', 'items': {'type': 'integer'}},
+    }
+    if style is not None:
+        parameter_spec_dict['style'] = style
+    if explode is not None:
+        parameter_spec_dict['explode'] = explode
+
+    value, schema = compile_deserializer(parameter_spec_dict)(values)
+    assert value == expected
+    assert schema is parameter_spec_dict['schema']
+
+
+@pytest.mark.parametrize(
+    'location,style,explode,values,expected',
+    [
+        ('path', None, None, {'p': 'a,1,b,x'}, {'a': 1, 'b': 'x'}),
+        ('path', 'simple', True, {'p': 'a=1,b=x'}, {'a': 1, 'b': 'x'}),
+        ('path', 'label', False, {'p': '.a,1,b,x'}, {'a': 1, 'b': 'x'}),
+        ('path', 'label', True, {'p': '.a=1.b=x'}, {'a': 1, 'b': 'x'}),
+        ('path', 'matrix', False, {'p': ';p=a,1,b,x'}, {'a': 1, 'b': 'x'}),
+        ('path', 'matrix', True, {'p': ';a=1;b=x'}, {'a': 1, 'b': 'x'}),
+        (
+            'query',
+            None,
+            None,
+            {'a': '1', 'c': 'x', 'd': '0'},
+            {'a': 1, 'c': 'x', 'd': False},
+        ),
+        ('query', 'form', False, {'p': 'a,1,c,1'}, {'a': 1, 'c': True}),
+        ('query', 'pipeDelimited', False, {'p': 'a|1'}, {'a': 1}),
+        (
+            'query',
+            'deepObject',
+            True,
+            {'p[a]': '1', 'p[b]': 'x', 'q[a]': '2', 'p': '3'},
+            {'a': 1, 'b': 'x'},
+        ),
+        ('path', 'simple', False, {'p': 'a,1,b'}, 'a,1,b'),
+        ('path', 'simple', True, {'p': 'a=1,b'}, 'a=1,b'),
+    ],
+)
+def test_deserialize_parameter_object(
+    location, style, explode, values, expected
+):
+    parameter_spec_dict = {
+        'name': NAME,
+        'in': location,
+        'schema': {
+            'type': 'object',
+            'properties': {'a': {'type': 'integer'}, 'b': {}},
+            'additionalProperties': {'type': 'boolean'},
+        },
+    }
+    if style is not None:
+        parameter_spec_dict['style'] = style
+    if explode is not None:
+        parameter_spec_dict['explode'] = explode
+
+    value, schema = compile_deserializer(parameter_spec_dict)(values)
+    assert value == expected
+    assert schema is parameter_spec_dict['schema']
+
+
+@pytest.mark.parametrize(
+    'style,value,expected',
+    [('label', '.2', 2), ('label', '2', '2'), ('matrix', ';p=2', 2)],
+)
+def test_deserialize_parameter_primitive_style(style, value, expected):
+    parameter_spec_dict = {
+        'name': NAME,
+        'in': 'path',
+        'style': style,
+        'schema': {'type': 'integer'},
+    }
+
+    result = compile_deserializer(parameter_spec_dict)({NAME: value})
+    assert result == (expected, parameter_spec_dict['schema'])
+
+
+@pytest.mark.parametrize(
+    'style,values',
+    [('form', {'c': '1'}), ('deepObject', {'p': '1', 'q[a]': '1'})],
+)
+def test_deserialize_parameter_object_missing(style, values):
+    parameter_spec_dict = {
+        'name': NAME,
+        'in': 'query',
+        'style': style,
+        'explode': True,
+        'schema': {
+            'type': 'object',
+            'properties': {'a': {}},
+            'additionalProperties': False,
+            'default': {'a': 'x'},
+        },
+    }
+
+    result = compile_deserializer(parameter_spec_dict)(values)
+    assert result == ({'a': 'x'}, parameter_spec_dict['schema'])
+
+
+@pytest.mark.parametrize('additional_properties', [None, True, {}])
+def test_deserialize_parameter_object_free_form(additional_properties):
+    parameter_spec_dict = {'name': NAME, 'in': 'query', 'schema': {}}
+    parameter_spec_dict['schema']['type'] = 'object'
+    if additional_properties is not None:
+        parameter_spec_dict['schema'][
+            'additionalProperties'
+        ] = additional_properties
+    deserialize = compile_deserializer(parameter_spec_dict, {'page'})
+
+    value, _ = deserialize({'color': 'red', 'size': 'L', 'page': '2'})
+    assert value == {'color': 'red', 'size': 'L'}
+
+    pytest.raises(KeyError, deserialize, {'page': '2'})
@@ -6,11 +6,14 @@ from __future__ import unicode_literals
 
 import datetime
 import functools
+import pickle
 
 import jsonschema
 import pytest
 
 from oas.parameters.models import Parameters
+from oas.parameters.unmarshalers import compile_parameters
+from oas.parameters.unmarshalers import ParameterList
 from oas.parameters.unmarshalers import unmarshal_parameters
 from oas.schema.unmarshalers import SchemaUnmarshaler
 
@@ -112,3 +115,82 @@ def test_unmarshal_error(unmarshal):
     assert errors[0].schema == {'type': 'string', 'format': str('date')}
     assert list(errors[0].schema_path) == [0, 'schema', 'format']
     assert list(errors[0].path) == [LOCATION, 'p']
+
+
+def test_compile_parameters():
+    parameter_spec_dicts = ParameterList(
+        [
+            {'name': 'p1', 'in': 'query'},
+            {'name': 'p2', 'in': 'header'},
+            {'name': 'p3', 'in': 'query'},
+        ]
+    )
+    plan = compile_parameters(parameter_spec_dicts)
+
+    assert compile_parameters(parameter_spec_dicts) is plan
+    assert plan.locations == ('query', 'header')
+    assert [step[:3] for step in plan.steps] == [
+        (0, 'query', 'p1'),
+        (1, 'header', 'p2'),
+        (2, 'query', 'p3'),
+    ]
+
+
+def test_compile_parameters_list():
+    parameter_spec_dicts = [{'name': 'p1', 'in': 'query'}]
+    plan = compile_parameters(parameter_spec_dicts)
+
+    # Plain lists keep no plan.
+    assert compile_parameters(parameter_spec_dicts) is not plan
+
+
+def test_parameter_list_pickle():
+    parameter_spec_dicts = ParameterList([{'name': 'p1', 'in': 'query'}])
+    compile_parameters(parameter_spec_dicts)
+
+    unpickled = pickle.loads(pickle.dumps(parameter_spec_dicts, 2))
+
+    assert isinstance(unpickled, ParameterList)
+    assert unpickled == parameter_spec_dicts
+    assert unpickled.plan is None
+
+
+def test_locations_read_once(mocker, unmarshal):
+    query = mocker.PropertyMock(return_value={'p1': '1', 'p2': '2'})
+    mocker.patch.object(MockParameters, 'query', query)
+    parameters = MockParameters()
+    parameter_spec_dicts = [
+        {'name': 'p1', 'in': LOCATION, 'schema': {'type': 'integer'}},
+        {'name': 'p2', 'in': LOCATION, 'schema': {'type': 'integer'}},
+        {'name': 'p3', 'in': 'path', 'schema': {'default': 3}},
+    ]
+
+    unmarshaled, errors = unmarshal(parameters, parameter_spec_dicts)
+
+    assert unmarshaled == {LOCATION: {'p1': 1, 'p2': 2}, 'path': {'p3': 3}}
+    assert errors is None
+    query.assert_called_once_with()
+
+
+def test_free_form_object(mocker, unmarshal):
+    query = {'page': '2', 'color': 'red', 'size': 'L'}
+    mocker.patch.object(MockParameters, 'query', query)
+    parameters = MockParameters()
+    parameter_spec_dicts = [
+        {'name': 'page', 'in': LOCATION, 'schema': {'type': 'integer'}},
+        {
+            'name': 'filter',
+            'in': LOCATION,
+            'schema': {
+                'type': 'object',
+                'additionalProperties': {'type': 'string'},
+            },
+        },
+    ]
+
+    unmarshaled, errors = unmarshal(parameters, parameter_spec_dicts)
+
+    assert unmarshaled == {
+        LOCATION: {'page': 2, 'filter': {'color': 'red', 'size': 'L'}}
+    }
+    assert errors is None
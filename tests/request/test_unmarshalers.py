@@ -11,6 +11,7 @@ import pytest
 
 from oas.exceptions import UnmarshalError
 from oas.request.models import Request
+from oas.request.models import UnmarshaledRequest
 from oas.request.unmarshalers import unmarshal_request
 from oas.schema.unmarshalers import SchemaUnmarshaler
 
@@ -63,6 +64,34 @@ def test_unmarshal_request(unmarshal):
     assert request_body == datetime.date(2020, 1, 2)
 
 
+def test_unmarshal_request_typed(unmarshal):
+    request = MockRequest(query={'p': '42'}, media='2020-01-02')
+    operation = {
+        'parameters': [
+            {'name': 'p', 'in': 'query', 'schema': {'type': 'integer'}},
+            {'name': 'q', 'in': 'query', 'schema': {'type': 'integer'}},
+        ],
+        'requestBody': {
+            'content': {
+                request.media_type: {
+                    'schema': {'type': 'string', 'format': 'date'}
+                }
+            }
+        },
+    }
+    result = unmarshal(request, operation, typed=True)
+    assert result == UnmarshaledRequest(
+        path={},
+        query={'p': 42},
+        header={},
+        cookie={},
+        body=datetime.date(2020, 1, 2),
+    )
+    assert not hasattr(result, '__dict__')
+    with pytest.raises(AttributeError):
+        result.body = None
+
+
 def test_unmarshal_request_without_request_body(unmarshal):
     request = MockRequest(query={'p': '42'}, media='2020-01-02')
     operation = {
@@ -98,3 +127,40 @@ def test_unmarshal_request_error(unmarshal):
     request_body_errors = exc_info.value.request_body_errors
     assert len(request_body_errors) == 1
     assert request_body_errors[0].schema_path[0] == 'requestBody'
+
+
+@pytest.mark.parametrize(
+    'max_errors,expected_parameters,expected_request_body',
+    [(None, 1, None), (2, 2, None), (3, 2, 1)],
+)
+def test_unmarshal_request_max_errors(
+    max_errors, expected_parameters, expected_request_body
+):
+    request = MockRequest(query={'p': 'x', 'q': 'y'}, media=['a', 'b'])
+    operation = {
+        'parameters': [
+            {'name': 'p', 'in': 'query', 'schema': {'type': 'integer'}},
+            {'name': 'q', 'in': 'query', 'schema': {'type': 'integer'}},
+        ],
+        'requestBody': {
+            'content': {
+                request.media_type: {
+                    'schema': {'type': 'array', 'items': {'type': 'integer'}}
+                }
+            }
+        },
+    }
+    schema_unmarshaler = SchemaUnmarshaler(max_errors=1)
+
+    with pytest.raises(UnmarshalError) as exc_info:
+        unmarshal_request(
+            schema_unmarshaler, request, operation, max_errors=max_errors
+        )
+
+    parameter_errors = exc_info.value.parameter_errors
+    assert len(parameter_errors) == expected_parameters
+    request_body_errors = exc_info.value.request_body_errors
+    if expected_request_body is None:
+        assert request_body_errors is None
+    else:
+        assert len(request_body_errors) == expected_request_body
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+import pytest
+
+from oas.exceptions import ErrorRecord
+from oas.exceptions import ValidationError
+from oas.refs import resolve_refs
+from oas.schema.codegen import CodegenBackend
+from oas.schema.formats import default_formats
+from oas.schema.unmarshalers import SchemaUnmarshaler
+from oas.schema.validators import JSONSchemaBackend
+
+
+def _summarize(errors):
+    return sorted(
+        (
+            list(e.path),
+            list(e.schema_path),
+            e.validator,
+            e.message,
+            _summarize(e.context),
+        )
+        for e in errors
+    )
+
+
+def _assert_same_errors(spec_dict, instance, schema):
+    format_checker = default_formats.format_checker
+    expected = JSONSchemaBackend(spec_dict, format_checker=format_checker)
+    backend = CodegenBackend(spec_dict, format_checker=format_checker)
+    assert _summarize(backend.iter_errors(instance, schema)) == _summarize(
+        expected.iter_errors(instance, schema)
+    )
+
+
+@pytest.mark.parametrize(
+    'schema,instance',
+    [
+        ({'type': 'integer'}, 1),
+        ({'type': 'integer'}, 1.0),
+        ({'type': 'integer'}, True),
+        ({'type': 'number'}, 1.5),
+        ({'type': 'number'}, False),
+        ({'type': 'boolean'}, 0),
+        ({'type': 'string'}, None),
+        ({'type': 'string', 'nullable': True}, None),
+        ({'type': ['string', 'integer']}, 1.5),
+        ({'type': 'null'}, None),
+        ({'type': 'object'}, []),
+        ({'type': 'array'}, {}),
+        ({'enum': [1, 2]}, True),
+        ({'enum': [True]}, 1),
+        ({'enum': ['a']}, 'b'),
+        ({'enum': ['a'], 'nullable': True}, None),
+        ({'multipleOf': 2}, 3),
+        ({'multipleOf': 0.5}, 1.25),
+        ({'maximum': 2}, 3),
+        ({'maximum': 2, 'exclusiveMaximum': True}, 2),
+        ({'minimum': 2}, 1),
+        ({'minimum': 2, 'exclusiveMinimum': True}, 2),
+        ({'maxLength': 2}, 'abc'),
+        ({'minLength': 2}, 'a'),
+        ({'pattern': '^a'}, 'ba'),
+        ({'pattern': 'a'}, 'ba'),
+        ({'format': 'date'}, '2020/01/02'),
+        ({'format': 'date'}, 20200102),
+        ({'format': 'int32'}, 2 ** 31),
+        ({'format': 'unknown'}, 'x'),
+        ({'items': {'type': 'integer'}}, [1, 'a', 'b']),
+        ({'items': [{'type': 'integer'}, {'type': 'string'}]}, ['a', 1]),
+        (
+            {'items': [{'type': 'integer'}], 'additionalItems': False},
+            [1, 2, 3],
+        ),
+        ({'items': [{'type': 'integer'}], 'additionalItems': False}, [1, 2]),
+        (
+            {
+                'items': [{'type': 'integer'}],
+                'additionalItems': {'type': 'string'},
+            },
+            [1, 'a', 2],
+        ),
+        ({'maxItems': 1}, [1, 2]),
+        ({'minItems': 1}, []),
+        ({'uniqueItems': True}, [1, True]),
+        ({'uniqueItems': True}, [{}, {}]),
+        ({'uniqueItems': True}, [1, 1]),
+        ({'maxProperties': 1}, {'a': 1, 'b': 2}),
+        ({'minProperties': 1}, {}),
+        ({'required': ['a', 'b']}, {'c': 1}),
+        ({'properties': {'a': {'type': 'string'}}}, {'a': 1}),
+        ({'patternProperties': {'^x-': {'type': 'string'}}}, {'x-a': 1}),
+        (
+            {
+                'properties': {'a': {}},
+                'patternProperties': {'^x-': {}},
+                'additionalProperties': False,
+            },
+            {'a': 1, 'x-b': 2, 'c': 3},
+        ),
+        ({'additionalProperties': False}, {'a': 1}),
+        ({'additionalProperties': {'type': 'string'}}, {'a': 1, 'b': 'c'}),
+        ({'dependencies': {'a': ['b']}}, {'a': 1}),
+        ({'dependencies': {'a': {'required': ['b']}}}, {'a': 1}),
+        ({'allOf': [{'type': 'integer'}, {'minimum': 2}]}, 1.5),
+        ({'anyOf': [{'type': 'integer'}, {'type': 'string'}]}, 1.5),
+        ({'anyOf': [{'type': 'integer'}, {'type': 'string'}]}, 1),
+        ({'oneOf': [{'type': 'integer'}, {'type': 'number'}]}, 1),
+        ({'oneOf': [{'type': 'integer'}, {'type': 'string'}]}, 1),
+        ({'oneOf': [{'type': 'integer'}, {'type': 'string'}]}, None),
+        ({'not': {'type': 'integer'}}, 1),
+        ({'not': {'type': 'integer'}}, 'a'),
+        ({'type': 'object', 'properties': {}}, {'a': 1}),
+        ({'patternProperties': {}}, {'a': 1}),
+        ({'dependencies': {}}, {'a': 1}),
+        ({'items': []}, [1]),
+        ({'anyOf': []}, 1),
+        ({'oneOf': []}, 1),
+        (
+            {
+                'type': 'object',
+                'required': ['a'],
+                'properties': {
+                    'a': {'type': 'array', 'items': {'minimum': 0}},
+                    'b': {'readOnly': True, 'type': 'string'},
+                },
+            },
+            {'a': [1, -1], 'b': 1},
+        ),
+    ],
+)
+def test_iter_errors(schema, instance):
+    _assert_same_errors({}, instance, schema)
+
+
+def test_iter_errors_ref():
+    spec_dict = {
+        'components': {
+            'schemas': {
+                'Node': {
+                    'type': 'object',
+                    'properties': {
+                        'value': {'type': 'integer'},
+                        'next': {'$ref': '#/components/schemas/Node'},
+                    },
+                }
+            }
+        }
+    }
+    schema = {'$ref': '#/components/schemas/Node'}
+    instance = {'value': 'a', 'next': {'next': {'value': 'b'}}}
+    _assert_same_errors(spec_dict, instance, schema)
+
+
+@pytest.mark.parametrize('keyword', ['oneOf', 'anyOf'])
+@pytest.mark.parametrize(
+    'instance',
+    [
+        {'pet_type': 'Cat', 'name': 1},
+        {'pet_type': 'dog', 'bark': 1},
+        {'pet_type': 'Bird'},
+        {'pet_type': 1},
+        {},
+        'Cat',
+    ],
+)
+def test_iter_errors_discriminator(keyword, instance):
+    spec_dict = {
+        'components': {
+            'schemas': {
+                'Cat': {
+                    'type': 'object',
+                    'properties': {'name': {'type': 'string'}},
+                },
+                'Dog': {
+                    'type': 'object',
+                    'properties': {'bark': {'type': 'boolean'}},
+                },
+            }
+        }
+    }
+    schema = {
+        keyword: [
+            {'$ref': '#/components/schemas/Cat'},
+            {'$ref': '#/components/schemas/Dog'},
+        ],
+        'discriminator': {
+            'propertyName': 'pet_type',
+            'mapping': {'dog': '#/components/schemas/Dog'},
+        },
+    }
+    _assert_same_errors(spec_dict, instance, schema)
+
+
+def test_iter_errors_error_record():
+    backend = CodegenBackend({})
+    (error,) = backend.iter_errors(
+        {'a': 'x'}, {'properties': {'a': {'type': 'integer'}}}
+    )
+    assert isinstance(error, ErrorRecord)
+    assert list(error.iter_path()) == ['a']
+
+
+def test_iter_errors_cache():
+    schema = {'type': 'integer'}
+    backend = CodegenBackend({})
+    assert list(backend.iter_errors(1, schema)) == []
+    assert backend.get_source(schema) is backend.get_source(schema)
+
+
+def test_iter_errors_recursive():
+    spec_dict = {
+        'components': {
+            'schemas': {
+                'Node': {
+                    'type': 'object',
+                    'properties': {
+                        'next': {'$ref': '#/components/schemas/Node'}
+                    },
+                    'additionalProperties': False,
+                }
+            }
+        }
+    }
+    spec_dict, _ = resolve_refs(spec_dict)
+    schema = spec_dict['components']['schemas']['Node']
+    instance = {'next': {'next': {'a': 1}}}
+    _assert_same_errors(spec_dict, instance, schema)
+
+
+def test_schema_unmarshaler():
+    schema = {
+        'type': 'object',
+        'properties': {'date': {'type': 'string', 'format': 'date'}},
+    }
+    schema_unmarshaler = SchemaUnmarshaler(backend=CodegenBackend)
+    assert schema_unmarshaler.unmarshal({}, schema) == {}
+    with pytest.raises(ValidationError) as exc_info:
+        schema_unmarshaler.unmarshal({'date': 'x'}, schema)
+    error = exc_info.value.errors[0]
+    assert list(error.path) == ['date']
+    assert error.validator == 'format'
+    assert error.message == "'x' is not a 'date'"
+
+
+def test_iter_errors_threads():
+    properties = dict(
+        ('p{}'.format(i), {'type': 'integer'}) for i in range(60)
+    )
+    schema = {'type': 'object', 'properties': properties}
+    instance = dict((k, 'x') for k in properties)
+    backend = CodegenBackend({})
+    started = threading.Event()
+    results = []
+
+    def target():
+        started.wait()
+        results.append(len(list(backend.iter_errors(instance, schema))))
+
+    threads = [threading.Thread(target=target) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [60] * 8
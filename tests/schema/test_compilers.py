@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import datetime
+import sys
+import threading
+
+import pytest
+import six
+
+from oas.exceptions import ValidationError
+from oas.refs import resolve_refs
+from oas.schema.compilers import Invalid
+from oas.schema.compilers import SchemaCompiler
+from oas.schema.formats import default_formats
+from oas.schema.unmarshalers import SchemaUnmarshaler
+from oas.schema.validators import SchemaValidator
+
+
+def _unmarshal(instance, schema):
+    return SchemaUnmarshaler()._unmarshal(instance, schema)
+
+
+@pytest.fixture
+def compiler():
+    return SchemaCompiler({}, default_formats, _unmarshal)
+
+
+def _is_valid(schema, instance):
+    validator = SchemaValidator(
+        {}, format_checker=default_formats.format_checker
+    )
+    try:
+        validator.validate(instance, schema)
+    except ValidationError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize(
+    'schema,instance',
+    [
+        ({'type': 'integer'}, 1),
+        ({'type': 'integer'}, 1.0),
+        ({'type': 'integer'}, True),
+        ({'type': 'number'}, 1.5),
+        ({'type': 'number'}, False),
+        ({'type': 'boolean'}, 0),
+        ({'type': 'string'}, None),
+        ({'type': 'string', 'nullable': True}, None),
+        ({'type': ['string', 'integer']}, 1),
+        ({'type': 'null'}, None),
+        ({'enum': [1, 2]}, True),
+        ({'enum': [True]}, 1),
+        ({'enum': ['a']}, 'a'),
+        ({'enum': ['a'], 'nullable': True}, None),
+        ({'multipleOf': 2}, 3),
+        ({'multipleOf': 0.5}, 1.5),
+        ({'maximum': 2}, 2),
+        ({'maximum': 2, 'exclusiveMaximum': True}, 2),
+        ({'minimum': 2}, 2),
+        ({'minimum': 2, 'exclusiveMinimum': True}, 2),
+        ({'maxLength': 2}, 'abc'),
+        ({'minLength': 2}, 'a'),
+        ({'pattern': '^a'}, 'ba'),
+        ({'pattern': 'a'}, 'ba'),
+        ({'format': 'date'}, '2020/01/02'),
+        ({'format': 'date'}, 20200102),
+        ({'format': 'int32'}, 2 ** 31),
+        ({'format': 'unknown'}, 'x'),
+        ({'items': {'type': 'integer'}}, [1, 'a']),
+        ({'items': [{'type': 'integer'}]}, [1, 'a']),
+        ({'items': [{'type': 'integer'}], 'additionalItems': False}, [1, 2]),
+        (
+            {
+                'items': [{'type': 'integer'}],
+                'additionalItems': {'type': 'string'},
+            },
+            [1, 'a'],
+        ),
+        ({'maxItems': 1}, [1, 2]),
+        ({'minItems': 1}, []),
+        ({'uniqueItems': True}, [1, True]),
+        ({'uniqueItems': True}, [{}, {}]),
+        ({'maxProperties': 1}, {'a': 1, 'b': 2}),
+        ({'minProperties': 1}, {}),
+        ({'required': ['a']}, {'b': 1}),
+        ({'properties': {'a': {'type': 'string'}}}, {'a': 1}),
+        ({'patternProperties': {'^x-': {'type': 'string'}}}, {'x-a': 1}),
+        (
+            {
+                'properties': {'a': {}},
+                'patternProperties': {'^x-': {}},
+                'additionalProperties': False,
+            },
+            {'a': 1, 'x-b': 2},
+        ),
+        ({'additionalProperties': False}, {'a': 1}),
+        ({'additionalProperties': {'type': 'string'}}, {'a': 1}),
+        ({'dependencies': {'a': ['b']}}, {'a': 1}),
+        ({'dependencies': {'a': {'required': ['b']}}}, {'a': 1, 'b': 2}),
+        ({'allOf': [{'type': 'integer'}, {'minimum': 2}]}, 1),
+        ({'anyOf': [{'type': 'integer'}, {'type': 'string'}]}, 1.5),
+        ({'oneOf': [{'type': 'integer'}, {'type': 'number'}]}, 1),
+        ({'oneOf': [{'type': 'integer'}, {'type': 'string'}]}, 1),
+        ({'not': {'type': 'integer'}}, 1),
+        ({'not': {'type': 'integer'}}, 'a'),
+    ],
+)
+def test_compile_validator(compiler, schema, instance):
+    validate = compiler.compile_validator(schema)
+    unmarshal = compiler.compile(schema)
+
+    expected = _is_valid(schema, instance)
+    for func in (validate, unmarshal):
+        try:
+            func(instance)
+        except Invalid:
+            assert not expected
+        else:
+            assert expected
+
+
+@pytest.mark.parametrize(
+    'schema,instance',
+    [
+        ({'type': 'string', 'format': 'date'}, '2020-01-02'),
+        ({'type': 'string', 'format': 'date', 'nullable': True}, None),
+        ({'type': 'integer', 'format': 'int32'}, 1),
+        ({'type': 'array', 'items': {'type': 'string', 'format': 'date'}}, []),
+        (
+            {
+                'type': 'object',
+                'properties': {
+                    'a': {'type': 'string', 'format': 'date'},
+                    'b': {'type': 'string', 'format': 'date'},
+                    'c': {'format': 'date', 'default': '2020-01-03'},
+                },
+                'patternProperties': {'^x-': {}},
+                'additionalProperties': {'type': 'string', 'format': 'date'},
+            },
+            {'a': '2020-01-01', 'x-a': '2020-01-02', 'z': '2020-01-04'},
+        ),
+        (
+            {
+                'type': 'object',
+                'properties': {'a': {}},
+                'patternProperties': {'^x-': {}},
+                'additionalProperties': False,
+            },
+            {'a': 1, 'x-a': 2},
+        ),
+        (
+            {
+                'allOf': [
+                    {'type': 'string'},
+                    {'type': 'string', 'format': 'date'},
+                ]
+            },
+            '2020-01-02',
+        ),
+        (
+            {
+                'oneOf': [
+                    {'type': 'integer'},
+                    {'type': 'string', 'format': 'date'},
+                ],
+                'anyOf': [{'type': 'string'}, {'type': 'integer'}],
+            },
+            '2020-01-02',
+        ),
+    ],
+)
+def test_compile_unmarshaler(compiler, schema, instance):
+    unmarshal = compiler.compile(schema)
+    assert unmarshal(instance) == _unmarshal(instance, schema)
+
+
+def test_compile_cache():
+    schema = {'type': 'string', 'format': 'date'}
+    spec_dict = {'definitions': {'Date': schema}}
+    compiler = SchemaCompiler(spec_dict, default_formats, _unmarshal)
+
+    assert compiler.owns(schema)
+    assert compiler.compile(schema) is compiler.compile(schema)
+    assert compiler.compile_validator(schema) is compiler.compile_validator(
+        schema
+    )
+
+
+def test_compile_no_cache(compiler):
+    schema = {
+        'type': 'array',
+        'items': {'type': 'string', 'format': 'date'},
+    }
+
+    assert not compiler.owns(schema)
+    assert compiler.compile(schema) is not compiler.compile(schema)
+    assert not compiler.is_identity(schema)
+    assert compiler.compile(schema)(['2020-01-02']) == [
+        datetime.date(2020, 1, 2)
+    ]
+    assert not compiler._unmarshalers
+    assert not compiler._validators
+    assert not compiler._identities
+
+
+def test_compile_ref():
+    spec_dict = {
+        'components': {
+            'schemas': {
+                'Node': {
+                    'type': 'object',
+                    'properties': {
+                        'date': {'type': 'string', 'format': 'date'},
+                        'next': {'$ref': '#/components/schemas/Node'},
+                    },
+                }
+            }
+        }
+    }
+    compiler = SchemaCompiler(spec_dict, default_formats, _unmarshal)
+    unmarshal = compiler.compile(spec_dict['components']['schemas']['Node'])
+
+    instance = {'date': '2020-01-02', 'next': {'next': {'date': 'x'}}}
+    pytest.raises(Invalid, unmarshal, instance)
+
+    instance = {'date': '2020-01-02', 'next': {'next': {}}}
+    assert unmarshal(instance) == {
+        'date': datetime.date(2020, 1, 2),
+        'next': {'next': {}},
+    }
+
+
+@pytest.mark.parametrize('keyword', ['oneOf', 'anyOf'])
+def test_compile_discriminator(keyword):
+    spec_dict = {
+        'components': {
+            'schemas': {
+                'Cat': {'type': 'object', 'required': ['kind']},
+                'Dog': {
+                    'type': 'object',
+                    'properties': {
+                        'born': {'type': 'string', 'format': 'date'}
+                    },
+                },
+            }
+        }
+    }
+    schema = {
+        keyword: [
+            {'$ref': '#/components/schemas/Cat'},
+            {'$ref': '#/components/schemas/Dog'},
+        ],
+        'discriminator': {
+            'propertyName': 'kind',
+            'mapping': {'dog': '#/components/schemas/Dog'},
+        },
+    }
+    compiler = SchemaCompiler(spec_dict, default_formats, _unmarshal)
+    validate = compiler.compile_validator(schema)
+    unmarshal = compiler.compile(schema)
+
+    # Both the branches are valid but only the mapped one is used.
+    instance = {'kind': 'dog', 'born': '2020-01-02'}
+    validate(instance)
+    assert unmarshal(instance) == instance
+
+    for instance in ({'kind': 'Cow'}, {'kind': ['dog']}, {}):
+        pytest.raises(Invalid, validate, instance)
+        pytest.raises(Invalid, unmarshal, instance)
+
+    # Instances other than objects are validated without the discriminator.
+    pytest.raises(Invalid, validate, 1)
+
+
+@pytest.mark.parametrize(
+    'schema,expected',
+    [
+        ({}, True),
+        ({'type': 'string'}, True),
+        ({'type': 'string', 'format': 'date'}, False),
+        ({'type': 'string', 'format': 'unknown'}, True),
+        ({'type': 'array', 'items': {'type': 'integer'}}, True),
+        (
+            {'type': 'array', 'items': {'type': 'string', 'format': 'date'}},
+            False,
+        ),
+        ({'type': 'object', 'properties': {'a': {'type': 'string'}}}, True),
+        ({'type': 'object', 'properties': {'a': {'default': 1}}}, False),
+        (
+            {
+                'type': 'object',
+                'additionalProperties': {'type': 'string', 'format': 'date'},
+            },
+            False,
+        ),
+        (
+            {
+                'type': 'object',
+                'patternProperties': {'^x-': {}},
+                'additionalProperties': False,
+            },
+            False,
+        ),
+        ({'type': 'object', 'additionalProperties': False}, True),
+        ({'allOf': [{'type': 'string'}]}, False),
+        ({'oneOf': [{'type': 'string'}, {'type': 'integer'}]}, True),
+        ({'anyOf': [{'type': 'string', 'format': 'date'}]}, False),
+        ({'$ref': '#/definitions/x'}, True),
+    ],
+)
+def test_is_identity(compiler, schema, expected):
+    assert compiler.is_identity(schema) is expected
+
+
+def test_is_identity_recursive():
+    spec_dict = {
+        'definitions': {
+            'Node': {
+                'type': 'object',
+                'properties': {'next': {'$ref': '#/definitions/Node'}},
+            }
+        }
+    }
+    spec_dict, _ = resolve_refs(spec_dict)
+    node = spec_dict['definitions']['Node']
+    assert node['properties']['next'] is node
+    compiler = SchemaCompiler(spec_dict, default_formats, _unmarshal)
+
+    assert compiler.is_identity(node)
+
+    node['properties']['date'] = {'type': 'string', 'format': 'date'}
+    compiler = SchemaCompiler(spec_dict, default_formats, _unmarshal)
+
+    assert not compiler.is_identity(node)
+
+
+def test_is_identity_mutual_recursion():
+    spec_dict = {
+        'definitions': {
+            'A': {
+                'type': 'object',
+                'properties': {
+                    'b': {'$ref': '#/definitions/B'},
+                    'd': {'type': 'string', 'format': 'date'},
+                },
+            },
+            'B': {
+                'type': 'object',
+                'properties': {'a': {'$ref': '#/definitions/A'}},
+            },
+        }
+    }
+    spec_dict, _ = resolve_refs(spec_dict)
+    a = spec_dict['definitions']['A']
+    b = spec_dict['definitions']['B']
+    compiler = SchemaCompiler(spec_dict, default_formats, _unmarshal)
+
+    assert not compiler.is_identity(a)
+    assert not compiler.is_identity(b)
+
+    unmarshaler = SchemaUnmarshaler(lazy=True)
+    instance = {'b': {'a': {'d': '2020-01-02'}}}
+    assert unmarshaler.unmarshal(instance, a)['b']['a']['d'] == (
+        datetime.date(2020, 1, 2)
+    )
+
+
+def test_compile_identity_shallow_copy(compiler):
+    schema = {
+        'type': 'object',
+        'properties': {
+            'date': {'type': 'string', 'format': 'date'},
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+        },
+    }
+    instance = {'date': '2020-01-02', 'tags': ['a'], 'extra': {'b': 1}}
+
+    unmarshaled = compiler.compile(schema)(instance)
+
+    assert unmarshaled == {
+        'date': datetime.date(2020, 1, 2),
+        'tags': ['a'],
+        'extra': {'b': 1},
+    }
+    # The subtrees without transformation are not rebuilt.
+    assert unmarshaled['tags'] is instance['tags']
+    assert unmarshaled['extra'] is instance['extra']
+
+    unmarshaled = compiler.compile(schema['properties']['tags'])(['a'])
+    assert unmarshaled == ['a']
+
+
+def test_compile_wide_object(compiler):
+    properties = dict(
+        ('p{}'.format(i), {'type': 'string', 'format': 'date'})
+        for i in range(200)
+    )
+    properties['d'] = {'type': 'integer', 'default': 1}
+    schema = {'type': 'object', 'properties': properties}
+    instance = {'p1': '2020-01-02', 'p2': 'x'}
+
+    pytest.raises(Invalid, compiler.compile(schema), instance)
+
+    instance = {'p1': '2020-01-02', 'x': 'y'}
+    unmarshaled = compiler.compile(schema)(instance)
+    assert unmarshaled == _unmarshal(instance, schema)
+
+
+@pytest.mark.skipif(six.PY2, reason='requires sys.setswitchinterval')
+def test_compile_threads():
+    properties = dict(
+        ('p{}'.format(i), {'type': 'string', 'format': 'date'})
+        for i in range(60)
+    )
+    schema = {'type': 'object', 'properties': properties}
+    instance = dict((k, '2020-01-02') for k in properties)
+    expected = _unmarshal(instance, schema)
+    compiler = SchemaCompiler({}, default_formats, _unmarshal)
+    started = threading.Event()
+    results = []
+
+    def target():
+        started.wait()
+        for _ in range(20):
+            results.append(compiler.compile(schema)(instance))
+
+    threads = [threading.Thread(target=target) for _ in range(8)]
+    interval = sys.getswitchinterval()
+    # Switch threads as often as possible to run into the first calls.
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        started.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert results == [expected] * 160
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import jsonschema
+import pytest
+
+from oas.refs import resolve_refs
+from oas.schema.discriminators import get_branches
+
+
+def make_spec_dict(mapping=None):
+    discriminator = {'propertyName': 'kind'}
+    if mapping is not None:
+        discriminator['mapping'] = mapping
+    return {
+        'components': {
+            'schemas': {
+                'Cat': {'type': 'object'},
+                'Dog': {'type': 'object'},
+                'Other': {'type': 'object'},
+                'Pet': {
+                    'oneOf': [
+                        {'$ref': '#/components/schemas/Cat'},
+                        {'$ref': '#/components/schemas/Dog'},
+                    ],
+                    'discriminator': discriminator,
+                },
+            }
+        }
+    }
+
+
+@pytest.mark.parametrize('resolved', [False, True])
+@pytest.mark.parametrize(
+    'mapping,expected',
+    [
+        (None, {'Cat': 0, 'Dog': 1}),
+        (
+            {'cat': 'Cat', 'dog': '#/components/schemas/Dog'},
+            {'Cat': 0, 'Dog': 1, 'cat': 0, 'dog': 1},
+        ),
+        ({'Cat': 'Dog'}, {'Cat': 1, 'Dog': 1}),
+        (
+            {'Cat': 'Other', 'x': '#/unknown', 'y': 'other.yaml#/Cat'},
+            {'Dog': 1},
+        ),
+    ],
+)
+def test_get_branches(resolved, mapping, expected):
+    spec_dict = make_spec_dict(mapping)
+    if resolved:
+        spec_dict, _ = resolve_refs(spec_dict)
+    resolver = jsonschema.RefResolver.from_schema(spec_dict)
+    pet = spec_dict['components']['schemas']['Pet']
+
+    branches = get_branches(pet['discriminator'], pet['oneOf'], resolver)
+
+    assert branches == expected
+
+
+def test_get_branches_inline():
+    sub_schemas = [{'type': 'object'}]
+    resolver = jsonschema.RefResolver.from_schema({})
+
+    branches = get_branches({'propertyName': 'kind'}, sub_schemas, resolver)
+
+    assert branches == {}
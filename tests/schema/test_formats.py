@@ -12,6 +12,8 @@ import pytest
 
 from oas.schema.formats import default_formats
 from oas.schema.formats import Formats
+from oas.schema.formats import parse_date
+from oas.schema.formats import parse_date_time
 
 
 @pytest.mark.parametrize(
@@ -118,3 +120,111 @@ def test_custom():
     formats.register('date', 'string')(create_date_parser('%Y/%m/%d'))
     assert formats['date']('2020/01/02') == datetime.date(2020, 1, 2)
     pytest.raises(ValueError, formats['date'], '2020-01-02')
+
+
+def test_cache_size(mocker):
+    formats = Formats()
+    parse = mocker.Mock(side_effect=lambda value: value.upper())
+
+    modifier = formats.register('upper', 'string', cache_size=2)(parse)
+
+    assert modifier is parse
+    assert formats['upper']('a') == 'A'
+    formats.format_checker.check('a', 'upper')
+    assert formats['upper']('a') == 'A'
+    assert parse.call_count == 1
+
+    formats['upper']('b')
+    formats['upper']('c')
+    formats['upper']('a')
+    assert parse.call_count == 4
+
+
+def test_cache_size_typed(mocker):
+    formats = Formats()
+    parse = mocker.Mock(side_effect=lambda value: value)
+
+    formats.register('id', 'integer', cache_size=2)(parse)
+
+    assert formats['id'](True) is True
+    assert formats['id'](1) == 1
+    assert parse.call_count == 2
+
+
+def _call(func, value):
+    try:
+        return func(value)
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize(
+    'value',
+    [
+        '2020-01-02',
+        '2020-02-29',
+        '2019-02-29',
+        '2020-13-01',
+        '0000-01-01',
+        '9999-12-31',
+        '2020-1-2',
+        '2020-01- 2',
+        '2020-01-02\n',
+        ' 2020-01-02',
+        '20200102',
+        '2020-W01-1',
+        '２０２０-01-02',
+    ],
+)
+def test_parse_date_compatibility(value):
+    def reference(value):
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+    assert _call(parse_date, value) == _call(reference, value)
+
+
+@pytest.mark.parametrize(
+    'value',
+    [
+        '2020-01-02T03:04:05Z',
+        '2020-01-02t03:04:05z',
+        '2020-01-02T03:04:05.123456Z',
+        '2020-01-02T03:04:05.1234567Z',
+        '2020-01-02T03:04:05.9999996Z',
+        '2020-01-02T03:04:05.Z',
+        '2020-01-02T03:04:05+09:00',
+        '2020-01-02T03:04:05-09:30',
+        '2020-01-02T03:04:05+00:00',
+        '2020-01-02T03:04:05-00:00',
+        '2020-01-02T03:04:05-00:30',
+        '2020-01-02T03:04:05+23:59',
+        '2020-01-02T03:04:05+24:00',
+        '2020-01-02T03:04:05+05:99',
+        '2020-01-02T03:04:60Z',
+        '2020-01-02T24:00:00Z',
+        '0001-01-01T00:00:00+01:00',
+        '9999-12-31T23:59:59-01:00',
+        '2020-01-02T03:04:05Z\n',
+        '2020-01-02T03:04:05',
+        '2020-01-02 03:04:05Z',
+        '2020-01-02T03:04:05+0900',
+        '２０２０-01-02T03:04:05Z',
+    ],
+)
+def test_parse_date_time_compatibility(value):
+    pyrfc3339 = pytest.importorskip('pyrfc3339')
+
+    def reference(value):
+        return pyrfc3339.parse(value, utc=True).replace(tzinfo=None)
+
+    assert _call(parse_date_time, value) == _call(reference, value)
+
+
+@pytest.mark.parametrize(
+    'value',
+    ['Zm9v', 'Zm9vYg==', 'Zm9vYg', 'Zm9v\nYmFy', 'Zm9v!', '', 'xxx', 'Zé9v'],
+)
+def test_parse_byte_compatibility(value):
+    assert _call(default_formats['byte'], value) == _call(
+        base64.b64decode, value
+    )
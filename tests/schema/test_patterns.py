@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import re
+
+import pytest
+
+from oas.exceptions import ValidationError
+from oas.schema import patterns
+from oas.schema.codegen import CodegenBackend
+from oas.schema.patterns import compile_pattern
+from oas.schema.patterns import search
+from oas.schema.unmarshalers import SchemaUnmarshaler
+
+
+class _FakeRE2(object):
+    class error(Exception):
+        pass
+
+    @classmethod
+    def compile(cls, pattern):
+        if '\\1' in pattern:
+            raise cls.error(pattern)
+        return ('re2', pattern)
+
+
+class _NeverRE2(object):
+    """RE2 which never matches to tell which engine is used."""
+
+    error = _FakeRE2.error
+
+    @staticmethod
+    def compile(pattern):
+        return re.compile('(?!)')
+
+
+@pytest.fixture(autouse=True)
+def _patterns(monkeypatch):
+    monkeypatch.setattr(patterns, '_patterns', {})
+
+
+def test_compile_pattern_cache():
+    regex = compile_pattern('^a+$')
+    assert compile_pattern('^a+$') is regex
+    assert regex.search('aa')
+    assert not regex.search('ab')
+
+
+def test_compile_pattern_re2(monkeypatch):
+    monkeypatch.setattr(patterns, 're2', _FakeRE2)
+    assert compile_pattern('^a+$', use_re2=True) == ('re2', '^a+$')
+    assert compile_pattern('(a)\\1', use_re2=True) == re.compile('(a)\\1')
+
+
+def test_compile_pattern_re2_opt_in(monkeypatch):
+    monkeypatch.setattr(patterns, 're2', _FakeRE2)
+    assert compile_pattern('^a+$') == re.compile('^a+$')
+
+
+def test_compile_pattern_without_re2(monkeypatch):
+    monkeypatch.setattr(patterns, 're2', None)
+    assert compile_pattern('^a+$') == re.compile('^a+$')
+    pytest.raises(ImportError, compile_pattern, '^a+$', use_re2=True)
+
+
+@pytest.mark.parametrize(
+    'pattern,string,expected',
+    [('^a', 'ab', True), ('^a', 'ba', False), ('a', 'ba', True)],
+)
+def test_search(pattern, string, expected):
+    assert search(pattern, string) is expected
+
+
+@pytest.mark.parametrize('backend', [None, CodegenBackend])
+@pytest.mark.parametrize(
+    'schema,instance',
+    [
+        ({'type': 'string', 'pattern': '^a$'}, 'a'),
+        (
+            {
+                'type': 'object',
+                'patternProperties': {'^a$': {'type': 'integer'}},
+                'additionalProperties': False,
+            },
+            {'a': 1},
+        ),
+    ],
+)
+def test_schema_unmarshaler_use_re2(monkeypatch, backend, schema, instance):
+    monkeypatch.setattr(patterns, 're2', _NeverRE2)
+
+    # The pattern matches by re.
+    SchemaUnmarshaler(backend=backend).unmarshal(instance, schema)
+
+    schema_unmarshaler = SchemaUnmarshaler(backend=backend, use_re2=True)
+    pytest.raises(
+        ValidationError, schema_unmarshaler.unmarshal, instance, schema
+    )
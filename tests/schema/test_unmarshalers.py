@@ -11,6 +11,9 @@ import pytest
 from oas.exceptions import ValidationError
 from oas.schema.formats import Formats
 from oas.schema.unmarshalers import SchemaUnmarshaler
+from oas.schema.validators import SchemaValidator
+from oas.schema.views import ObjectView
+from oas.spec import create_spec_from_dict
 
 
 def test_unmarshal_validation_error():
@@ -217,6 +220,29 @@ def test_unmarshal_all_of_array_min_items():
     assert exc_info.value.errors[0].message == '[1] is too short'
 
 
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('instance', ['foo', 5, [1]])
+def test_unmarshal_all_of_untyped_object_error(lazy, instance):
+    schema = {
+        'allOf': [
+            {'required': [str('id')]},
+            {'description': 'x'},
+            {'type': str('object')},
+        ]
+    }
+    with pytest.raises(ValidationError) as exc_info:
+        SchemaUnmarshaler(lazy=lazy).unmarshal(instance, schema)
+    assert exc_info.value.errors[0].validator == 'type'
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('instance', ['foo', 5, [1]])
+def test_unmarshal_all_of_untyped_non_object(lazy, instance):
+    schema = {'allOf': [{'required': ['id']}, {'description': 'x'}]}
+    unmarshaled = SchemaUnmarshaler(lazy=lazy).unmarshal(instance, schema)
+    assert unmarshaled == instance
+
+
 def test_unmarshal_all_of_primitive_number_integer():
     schema = {'allOf': [{'type': 'number'}, {'type': 'integer'}]}
     instance = 1
@@ -258,6 +284,24 @@ def test_unmarshal_one_of_or_any_of(schema_type):
     assert unmarshaled == datetime.date(2018, 1, 2)
 
 
+@pytest.mark.parametrize('schema_type', ['oneOf', 'anyOf'])
+def test_unmarshal_one_of_or_any_of_default(mocker, schema_type):
+    sub_schema = {
+        schema_type: [
+            {'type': 'integer'},
+            {'type': 'string', 'format': 'date'},
+        ],
+        'default': '2018-01-02',
+    }
+    schema = {'type': 'object', 'properties': {'p': sub_schema}}
+    validate = mocker.patch.object(SchemaValidator, 'validate')
+
+    unmarshaled = SchemaUnmarshaler().unmarshal({}, schema)
+
+    assert unmarshaled == {'p': datetime.date(2018, 1, 2)}
+    assert not validate.called
+
+
 @pytest.mark.parametrize(
     'schema',
     [
@@ -272,3 +316,269 @@ def test_unmarshal_nullable(schema):
     instance = None
     unmarshaled = SchemaUnmarshaler().unmarshal(instance, schema)
     assert unmarshaled is None
+
+
+def test_unmarshal_many():
+    schema = {
+        'type': 'object',
+        'properties': {'d': {'type': 'string', 'format': 'date'}},
+    }
+    instances = [{'d': '2018-01-02'}, {'d': 1}, {}, {'d': 'x'}]
+
+    results = list(SchemaUnmarshaler().unmarshal_many(instances, schema))
+
+    assert [r for r, _ in results] == [
+        {'d': datetime.date(2018, 1, 2)},
+        None,
+        {},
+        None,
+    ]
+    assert results[0][1] is None
+    assert [list(e.path) for e in results[1][1]] == [[1, 'd']]
+    assert [list(e.path) for e in results[3][1]] == [[3, 'd']]
+
+
+def test_unmarshal_many_start():
+    schema = {'type': 'integer'}
+
+    results = SchemaUnmarshaler().unmarshal_many(['x'], schema, start=10)
+
+    _, errors = next(results)
+    assert list(errors[0].path) == [10]
+
+
+def test_unmarshal_max_errors():
+    schema = {'type': 'array', 'items': {'type': 'string'}}
+    unmarshaler = SchemaUnmarshaler(max_errors=1)
+
+    with pytest.raises(ValidationError) as exc_info:
+        unmarshaler.unmarshal([1, 2, 3], schema)
+    assert len(exc_info.value.errors) == 1
+
+    with pytest.raises(ValidationError) as exc_info:
+        unmarshaler.unmarshal([1, 2, 3], schema, max_errors=2)
+    assert len(exc_info.value.errors) == 2
+
+
+@pytest.fixture
+def polymorphic_spec():
+    return create_spec_from_dict(
+        {
+            'paths': {},
+            'components': {
+                'schemas': {
+                    'Cat': {
+                        'type': 'object',
+                        'properties': {'lives': {'type': 'integer'}},
+                    },
+                    'Dog': {
+                        'type': 'object',
+                        'properties': {
+                            'born': {'type': 'string', 'format': 'date'}
+                        },
+                    },
+                    'Pet': {
+                        'oneOf': [
+                            {'$ref': '#/components/schemas/Cat'},
+                            {'$ref': '#/components/schemas/Dog'},
+                        ],
+                        'discriminator': {
+                            'propertyName': 'kind',
+                            'mapping': {'dog': 'Dog'},
+                        },
+                    },
+                }
+            },
+        }
+    )
+
+
+def test_unmarshal_discriminator(polymorphic_spec):
+    schema = polymorphic_spec.data['components']['schemas']['Pet']
+    instance = {'kind': 'dog', 'born': '2020-01-02'}
+
+    unmarshaled = SchemaUnmarshaler(spec=polymorphic_spec).unmarshal(
+        instance, schema
+    )
+
+    assert unmarshaled == {'kind': 'dog', 'born': datetime.date(2020, 1, 2)}
+
+
+@pytest.mark.parametrize(
+    'instance,expected',
+    [
+        ({'kind': 'dog', 'born': '2020-01-02'}, datetime.date(2020, 1, 2)),
+        ({'kind': 'Cat', 'born': '2020-01-02'}, '2020-01-02'),
+    ],
+)
+def test_unmarshal_discriminator_lazy(polymorphic_spec, instance, expected):
+    polymorphic_spec.data['components']['schemas']['Cat']['properties'][
+        'born'
+    ] = {'type': 'string'}
+    schema = {
+        'type': 'object',
+        'properties': {
+            'pet': polymorphic_spec.data['components']['schemas']['Pet']
+        },
+    }
+    schema_unmarshaler = SchemaUnmarshaler(spec=polymorphic_spec, lazy=True)
+
+    unmarshaled = schema_unmarshaler.unmarshal({'pet': instance}, schema)
+
+    assert unmarshaled['pet']['born'] == expected
+
+
+@pytest.mark.parametrize(
+    'instance,message,path,validator',
+    [
+        (
+            {'kind': 'Cow'},
+            "'Cow' is not a valid value of 'kind'",
+            ['kind'],
+            'discriminator',
+        ),
+        ({}, "'kind' is a required property", [], 'discriminator'),
+        (
+            {'kind': 'Cat', 'lives': 'x'},
+            "'x' is not of type 'integer'",
+            ['lives'],
+            'type',
+        ),
+    ],
+)
+def test_unmarshal_discriminator_error(
+    polymorphic_spec, instance, message, path, validator
+):
+    schema = polymorphic_spec.data['components']['schemas']['Pet']
+
+    with pytest.raises(ValidationError) as exc_info:
+        SchemaUnmarshaler(spec=polymorphic_spec).unmarshal(instance, schema)
+
+    errors = exc_info.value.errors
+    assert len(errors) == 1
+    assert errors[0].message.replace("u'", "'") == message
+    assert list(errors[0].path) == path
+    assert errors[0].validator == validator
+
+
+def test_unmarshal_identity():
+    schema = {
+        'type': 'object',
+        'properties': {'a': {'type': 'array', 'items': {'type': 'string'}}},
+    }
+    instance = {'a': ['x'], 'b': {'c': 1}}
+
+    unmarshaled = SchemaUnmarshaler().unmarshal(instance, schema)
+    assert unmarshaled is instance
+
+    unmarshaled = SchemaUnmarshaler(copy=True).unmarshal(instance, schema)
+    assert unmarshaled == instance
+    assert unmarshaled is not instance
+    assert unmarshaled['a'] is not instance['a']
+    assert unmarshaled['b'] is not instance['b']
+
+
+def test_unmarshal_copy():
+    schema = {
+        'type': 'object',
+        'properties': {'a': {'type': 'string', 'format': 'date'}},
+    }
+    instance = {'a': '2018-01-02', 'b': {'c': [1]}}
+
+    unmarshaled = SchemaUnmarshaler().unmarshal(instance, schema)
+    assert unmarshaled['b'] is instance['b']
+
+    unmarshaled = SchemaUnmarshaler(copy=True).unmarshal(instance, schema)
+    assert unmarshaled == {'a': datetime.date(2018, 1, 2), 'b': {'c': [1]}}
+    assert unmarshaled['b'] is not instance['b']
+    assert unmarshaled['b']['c'] is not instance['b']['c']
+
+
+def test_unmarshal_identity_error():
+    with pytest.raises(ValidationError):
+        SchemaUnmarshaler().unmarshal({'a': 1}, {'required': ['b']})
+
+
+def test_unmarshal_lazy(mocker):
+    formats = Formats()
+    parse = mocker.Mock(side_effect=lambda value: value.upper())
+    formats.register('upper', 'string')(parse)
+    schema = {
+        'type': 'object',
+        'properties': {
+            'a': {'type': 'string', 'format': 'upper'},
+            'b': {
+                'type': 'array',
+                'items': {'type': 'string', 'format': 'upper'},
+            },
+            'c': {'type': 'string', 'format': 'upper', 'default': 'c'},
+            'd': {'type': 'object'},
+        },
+    }
+    instance = {'a': 'a', 'b': ['x', 'y'], 'd': {'e': 1}}
+    unmarshaler = SchemaUnmarshaler(formats=formats, lazy=True)
+
+    unmarshaled = unmarshaler.unmarshal(instance, schema)
+
+    # The format checker has parsed the values only to validate them.
+    assert parse.call_count == 3
+    assert isinstance(unmarshaled, ObjectView)
+    assert unmarshaled['a'] == 'A'
+    assert unmarshaled['b'][1] == 'Y'
+    assert parse.call_count == 5
+    assert unmarshaled['d'] is instance['d']
+    assert unmarshaled == {'a': 'A', 'b': ['X', 'Y'], 'c': 'C', 'd': {'e': 1}}
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_unmarshal_copy_default(lazy):
+    schema = {
+        'type': 'object',
+        'properties': {
+            'a': {'default': {'b': []}},
+            'c': {'type': 'array', 'items': {}, 'default': [1]},
+        },
+    }
+
+    unmarshaled = SchemaUnmarshaler(lazy=lazy).unmarshal({}, schema)
+    unmarshaled['a']['b'].append(1)
+
+    assert schema['properties']['a']['default'] == {'b': []}
+    assert unmarshaled['c'] is not schema['properties']['c']['default']
+
+
+def test_compile_cache():
+    spec = create_spec_from_dict(
+        {'definitions': {'Date': {'type': 'string', 'format': 'date'}}}
+    )
+    unmarshaler = SchemaUnmarshaler(spec=spec)
+    schema = spec.data['definitions']['Date']
+
+    assert unmarshaler.compile(schema) is unmarshaler.compile(schema)
+
+    schema = {'type': 'string', 'format': 'date'}
+    assert unmarshaler.compile(schema) is not unmarshaler.compile(schema)
+    assert list(unmarshaler._functions) == [
+        id(spec.data['definitions']['Date'])
+    ]
+
+
+def test_unmarshal_lazy_error():
+    schema = {'type': 'array', 'items': {'type': 'string', 'format': 'date'}}
+
+    with pytest.raises(ValidationError):
+        SchemaUnmarshaler(lazy=True).unmarshal(['x'], schema)
+
+
+def test_unmarshal_format_once(mocker):
+    formats = Formats()
+    parse = mocker.Mock(side_effect=lambda value: value.upper())
+    formats.register('upper', 'string')(parse)
+    schema = {'type': 'array', 'items': {'type': 'string', 'format': 'upper'}}
+
+    unmarshaled = SchemaUnmarshaler(formats=formats).unmarshal(
+        ['a', 'b'], schema
+    )
+
+    assert unmarshaled == ['A', 'B']
+    assert parse.call_count == 2
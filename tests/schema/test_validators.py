@@ -142,3 +142,14 @@ def test_validate_nullable_with_format(validator):
         validator.validate(instance, schema)
     except ValidationError as e:
         pytest.fail('Unexpected error: {}'.format(e))
+
+
+@pytest.mark.parametrize('max_errors,expected', [(None, 3), (1, 1), (2, 2)])
+def test_validate_max_errors(validator, max_errors, expected):
+    schema = {'type': 'array', 'items': {'type': 'string'}}
+    instance = [1, 2, 3]
+
+    with pytest.raises(ValidationError) as exc_info:
+        validator.validate(instance, schema, max_errors=max_errors)
+
+    assert len(exc_info.value.errors) == expected
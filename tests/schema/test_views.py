@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from oas.schema.views import ArrayView
+from oas.schema.views import ObjectView
+
+
+def upper(value, schema):
+    if isinstance(value, dict):
+        return ObjectView(value, schema, upper)
+    return value.upper()
+
+
+@pytest.mark.parametrize(
+    'schema,instance,expected',
+    [
+        (
+            {'properties': {'a': {}, 'b': {'default': 'b'}}},
+            {'a': 'a', 'c': 'c'},
+            {'a': 'A', 'b': 'B', 'c': 'C'},
+        ),
+        (
+            {'properties': {'a': {}}, 'additionalProperties': False},
+            {'a': 'a', 'c': 'c'},
+            {'a': 'A'},
+        ),
+        (
+            {'properties': {'a': {}}, 'additionalProperties': {}},
+            {'a': {'b': 'b'}},
+            {'a': {'b': 'B'}},
+        ),
+        (
+            {'properties': {'a': {}}, 'additionalProperties': {}},
+            {'a': 'a', 'b': 'b'},
+            {'a': 'A', 'b': 'B'},
+        ),
+    ],
+)
+def test_object_view(schema, instance, expected):
+    view = ObjectView(instance, schema, upper)
+
+    assert view == expected
+    assert len(view) == len(expected)
+    assert sorted(view) == sorted(expected)
+    assert 'x' not in view
+    pytest.raises(KeyError, view.__getitem__, 'x')
+    assert repr(view).startswith('ObjectView(')
+
+
+def test_object_view_copy_default():
+    schema = {'properties': {'a': {'default': {'b': []}}}}
+    view = ObjectView({}, schema, lambda value, schema: value)
+
+    view['a']['b'].append(1)
+
+    assert view['a'] == {'b': [1]}
+    assert schema['properties']['a']['default'] == {'b': []}
+
+
+def test_object_view_memoize(mocker):
+    unmarshal = mocker.Mock(side_effect=lambda value, schema: [value])
+    view = ObjectView({'a': 1, 'b': 2}, {}, unmarshal)
+
+    assert view['a'] is view['a']
+    assert unmarshal.call_count == 1
+
+
+def test_array_view():
+    view = ArrayView(['a', 'b', 'c'], {}, upper)
+
+    assert view == ['A', 'B', 'C']
+    assert view != ['a', 'b', 'c']
+    assert view != 'ABC'
+    assert len(view) == 3
+    assert view[-1] == 'C'
+    assert view[:2] == ['A', 'B']
+    pytest.raises(IndexError, view.__getitem__, 3)
+    assert repr(view) == "ArrayView({!r})".format(['A', 'B', 'C'])
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from oas.asgi import ASGIRequest
+from oas.asgi import OASMiddleware
+from oas.asgi import SCOPE_PARAMETERS
+from oas.asgi import SCOPE_REQUEST_BODY
+from oas.asgi import unmarshal_request_async
+from oas.exceptions import UnmarshalError
+from oas.schema.unmarshalers import SchemaUnmarshaler
+from oas.spec import create_spec_from_dict
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def make_scope(method, path, query=b'', headers=()):
+    return {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': list(headers),
+    }
+
+
+def make_receive(*chunks):
+    messages = [
+        {'type': 'http.request', 'body': chunk, 'more_body': True}
+        for chunk in chunks
+    ]
+    messages.append({'type': 'http.request', 'body': b'', 'more_body': False})
+    received = []
+
+    async def receive():
+        message = messages.pop(0)
+        received.append(message)
+        return message
+
+    receive.received = received
+    return receive
+
+
+class App(object):
+    async def __call__(self, scope, receive, send):
+        self.scope = scope
+        self.message = await receive()
+        await send({'type': 'http.response.start', 'status': 200})
+        await send({'type': 'http.response.body', 'body': b'ok'})
+
+
+@pytest.fixture
+def app():
+    return App()
+
+
+@pytest.fixture
+def middleware(petstore_dict, app):
+    return OASMiddleware(
+        app, create_spec_from_dict(petstore_dict), max_body_size=32
+    )
+
+
+def call(middleware, scope, receive):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    run(middleware(scope, receive, send))
+    return sent[0]['status'], sent[-1].get('body')
+
+
+JSON_HEADERS = [(b'content-type', b'application/json; charset=utf-8')]
+
+
+def test_middleware(middleware, app):
+    scope = make_scope(
+        'PATCH',
+        '/api/v1/pets/42',
+        query=b'page=2',
+        headers=JSON_HEADERS
+        + [(b'X-API-Version', b'v2'), (b'cookie', b'tracking=x')],
+    )
+    receive = make_receive(b'{"name"', b': "foo"}')
+
+    status, _ = call(middleware, scope, receive)
+
+    assert status == 200
+    assert app.scope[SCOPE_PARAMETERS] == {
+        'path': {'pet_id': 42},
+        'query': {'page': 2},
+        'header': {'X-API-Version': 'v2'},
+        'cookie': {'tracking': 'x'},
+    }
+    assert app.scope[SCOPE_REQUEST_BODY] == {'name': 'foo'}
+    assert app.message['body'] == b'{"name": "foo"}'
+
+
+def test_middleware_compile(mocker, petstore_dict, app):
+    spec = create_spec_from_dict(petstore_dict)
+    mocker.spy(spec, 'compile')
+
+    middleware = OASMiddleware(app, spec)
+
+    spec.compile.assert_called_once_with(middleware.schema_unmarshaler)
+
+
+def test_middleware_pass_through(middleware, app):
+    scope = make_scope('GET', '/unknown')
+
+    status, _ = call(middleware, scope, make_receive())
+
+    assert status == 200
+    assert SCOPE_PARAMETERS not in app.scope
+
+
+def test_middleware_parameter_error_before_body(middleware):
+    scope = make_scope('PATCH', '/api/v1/pets/x', headers=JSON_HEADERS)
+    receive = make_receive(b'{"name": "foo"}')
+
+    status, body = call(middleware, scope, receive)
+
+    assert status == 400
+    errors = json.loads(body.decode('utf-8'))
+    assert errors['parameters'][0]['path'] == ['path', 'pet_id']
+    assert receive.received == []
+
+
+def test_middleware_request_body_error(middleware):
+    scope = make_scope('PATCH', '/api/v1/pets/42', headers=JSON_HEADERS)
+
+    status, body = call(middleware, scope, make_receive(b'{"name": 1}'))
+
+    assert status == 400
+    errors = json.loads(body.decode('utf-8'))
+    assert errors['request_body'][0]['path'] == ['name']
+
+
+def test_middleware_malformed_json(middleware):
+    scope = make_scope('PATCH', '/api/v1/pets/42', headers=JSON_HEADERS)
+
+    status, _ = call(middleware, scope, make_receive(b'{'))
+
+    assert status == 400
+
+
+def test_middleware_malformed_json_offload(petstore_dict, app):
+    executor = ThreadPoolExecutor(max_workers=1)
+    middleware = OASMiddleware(
+        app,
+        create_spec_from_dict(petstore_dict),
+        executor=executor,
+        offload_threshold=0,
+    )
+    scope = make_scope('PATCH', '/api/v1/pets/42', headers=JSON_HEADERS)
+
+    with executor:
+        status, _ = call(middleware, scope, make_receive(b'{'))
+
+    assert status == 400
+
+
+def test_middleware_form(petstore_dict, app):
+    request_body_spec_dict = petstore_dict['paths']['/v1/pets/{pet_id}'][
+        'patch'
+    ]['requestBody']
+    request_body_spec_dict['content']['application/x-www-form-urlencoded'] = {
+        'schema': {'type': 'object'}
+    }
+    middleware = OASMiddleware(app, create_spec_from_dict(petstore_dict))
+    scope = make_scope(
+        'PATCH',
+        '/api/v1/pets/42',
+        query=b'page=2',
+        headers=[(b'content-type', b'application/x-www-form-urlencoded')],
+    )
+    receive = make_receive(b'name=foo')
+
+    status, _ = call(middleware, scope, receive)
+
+    assert status == 200
+    assert app.scope[SCOPE_PARAMETERS]['query'] == {'page': 2}
+    assert app.scope[SCOPE_REQUEST_BODY] is None
+    # The body is received only by the application.
+    assert app.message['body'] == b'name=foo'
+    assert len(receive.received) == 1
+
+
+@pytest.mark.parametrize(
+    'headers', [JSON_HEADERS, JSON_HEADERS + [(b'content-length', b'33')]]
+)
+def test_middleware_too_large(middleware, headers):
+    scope = make_scope('PATCH', '/api/v1/pets/42', headers=headers)
+    receive = make_receive(b'{"name": "', b'x' * 30, b'"}')
+
+    status, _ = call(middleware, scope, receive)
+
+    assert status == 413
+    assert len(receive.received) < 3
+
+
+def test_middleware_undocumented_media_type(middleware):
+    scope = make_scope(
+        'PATCH', '/api/v1/pets/42', headers=[(b'content-type', b'text/plain')]
+    )
+
+    status, _ = call(middleware, scope, make_receive())
+
+    assert status == 415
+
+
+@pytest.mark.parametrize('threshold,offloaded', [(0, True), (1024, False)])
+def test_middleware_offload(petstore_dict, app, mocker, threshold, offloaded):
+    executor = ThreadPoolExecutor(max_workers=1)
+    submit = mocker.spy(executor, 'submit')
+    middleware = OASMiddleware(
+        app,
+        create_spec_from_dict(petstore_dict),
+        executor=executor,
+        offload_threshold=threshold,
+    )
+    scope = make_scope('PATCH', '/api/v1/pets/42', headers=JSON_HEADERS)
+
+    with executor:
+        status, _ = call(middleware, scope, make_receive(b'{"name": "foo"}'))
+
+    assert status == 200
+    assert app.scope[SCOPE_REQUEST_BODY] == {'name': 'foo'}
+    assert submit.called is offloaded
+
+
+def test_unmarshal_request_async(petstore_dict):
+    spec = create_spec_from_dict(petstore_dict)
+    operation = spec.get_operation(
+        '/api/v1/pets/{pet_id}', 'patch', 'application/json'
+    )
+    scope = make_scope('PATCH', '/api/v1/pets/x', headers=JSON_HEADERS)
+    request = ASGIRequest(scope, '/api/v1/pets/{pet_id}', {'pet_id': 'x'})
+    request.body = b'{"name": 1}'
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(UnmarshalError) as exc_info:
+            run(
+                unmarshal_request_async(
+                    SchemaUnmarshaler(spec=spec),
+                    request,
+                    operation,
+                    executor=executor,
+                    threshold=0,
+                )
+            )
+
+    errors = exc_info.value.to_dict()
+    assert errors['parameters'][0]['path'] == ['path', 'pet_id']
+    assert errors['request_body'][0]['path'] == ['name']
+
+
+def test_unmarshal_request_async_typed(petstore_dict):
+    spec = create_spec_from_dict(petstore_dict)
+    operation = spec.get_operation(
+        '/api/v1/pets/{pet_id}', 'patch', 'application/json'
+    )
+    scope = make_scope(
+        'PATCH', '/api/v1/pets/42', query=b'page=2', headers=JSON_HEADERS
+    )
+    request = ASGIRequest(scope, '/api/v1/pets/{pet_id}', {'pet_id': '42'})
+    request.body = b'{"name": "x"}'
+
+    result = run(
+        unmarshal_request_async(
+            SchemaUnmarshaler(spec=spec), request, operation, typed=True
+        )
+    )
+
+    assert result.path == {'pet_id': 42}
+    assert result.query == {'page': 2}
+    assert result.header == {}
+    assert result.body == {'name': 'x'}
+
+
+def test_asgi_request_query_latin1():
+    scope = make_scope('GET', '/', query=b'a=\xe9&b=%C3%A9')
+    request = ASGIRequest(scope, '/', {})
+
+    assert request.query == {'a': '\xe9', 'b': '\xe9'}
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+
+import pytest
+import yaml
+
+from oas import cache
+from oas.cache import create_spec_from_cache
+from oas.spec import Spec
+
+
+@pytest.fixture
+def source():
+    spec_path = os.path.join(os.path.dirname(__file__), 'petstore.yaml')
+    with open(spec_path, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def cache_path(tmpdir):
+    return str(tmpdir.join('spec.cache'))
+
+
+def test_create_spec_from_cache(mocker, source, cache_path):
+    loader = mocker.Mock(side_effect=yaml.safe_load)
+
+    spec = create_spec_from_cache(cache_path, source, loader=loader)
+    assert isinstance(spec, Spec)
+    assert loader.call_count == 1
+    assert os.path.exists(cache_path)
+
+    cached_spec = create_spec_from_cache(cache_path, source, loader=loader)
+    assert loader.call_count == 1
+    assert cached_spec.data == spec.data
+    assert cached_spec.base_path == spec.base_path
+
+    operation = cached_spec.get_operation(
+        '/api/v1/pets', 'post', 'application/json'
+    )
+    schemas = cached_spec['components']['schemas']
+    media_type_spec_dict = operation['requestBody']['content'][
+        'application/json'
+    ]
+    assert media_type_spec_dict['schema'] is schemas['PetNew']
+
+
+def test_create_spec_from_cache_stale(mocker, source, cache_path):
+    loader = mocker.Mock(side_effect=yaml.safe_load)
+
+    create_spec_from_cache(cache_path, source, loader=loader)
+    create_spec_from_cache(cache_path, source + b'\n', loader=loader)
+    assert loader.call_count == 2
+
+    mocker.patch.object(cache, 'FORMAT_VERSION', cache.FORMAT_VERSION + 1)
+    create_spec_from_cache(cache_path, source, loader=loader)
+    assert loader.call_count == 3
+
+
+@pytest.mark.parametrize('content', [b'', b'OASSPEC', b'broken'])
+def test_create_spec_from_cache_broken(mocker, source, cache_path, content):
+    with open(cache_path, 'wb') as f:
+        f.write(content)
+    loader = mocker.Mock(side_effect=yaml.safe_load)
+
+    spec = create_spec_from_cache(cache_path, source, loader=loader)
+    assert isinstance(spec, Spec)
+    assert loader.call_count == 1
+
+
+def test_create_spec_from_cache_unwritable(mocker, source, tmpdir):
+    cache_path = str(tmpdir.join('missing', 'spec.cache'))
+    loader = mocker.Mock(side_effect=yaml.safe_load)
+
+    spec = create_spec_from_cache(cache_path, source, loader=loader)
+    assert isinstance(spec, Spec)
+    assert not os.path.exists(cache_path)
+
+    mocker.patch('tempfile.mkstemp', side_effect=OSError(13, 'denied'))
+    spec = create_spec_from_cache(cache_path, source, loader=loader)
+    assert isinstance(spec, Spec)
+    assert loader.call_count == 2
@@ -4,8 +4,13 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import pickle
+
 import jsonschema
+import pytest
 
+from oas.exceptions import ErrorRecord
+from oas.exceptions import prepend_path
 from oas.exceptions import UnmarshalError
 
 
@@ -55,3 +60,169 @@ def test_unmarshal_error():
 def test_no_unmarshal_error():
     error = UnmarshalError()
     assert error.to_dict() == {}
+
+
+def test_error_record():
+    cause = ValueError()
+    error = ErrorRecord(
+        '%r is not a %r',
+        ('x', 'date'),
+        validator='format',
+        validator_value='date',
+        instance='x',
+        schema={'format': 'date'},
+        path=['a'],
+        schema_path=['format'],
+        cause=cause,
+    )
+    prepend_path(error, ('query', 'p'), (0, 'schema'))
+    error.prepend((), ('parameters',))
+
+    assert isinstance(error, jsonschema.ValidationError)
+    assert error.message == "'x' is not a 'date'"
+    assert list(error.iter_path()) == ['query', 'p', 'a']
+    assert list(error.path) == ['query', 'p', 'a']
+    assert error.relative_path is error.path
+    assert list(error.schema_path) == ['parameters', 0, 'schema', 'format']
+    assert error.cause is cause
+    assert error.__cause__ is cause
+
+    # The deques are kept once accessed.
+    error.path.appendleft('x')
+    error.prepend(('y',), ('z',))
+    assert list(error.path) == ['y', 'x', 'query', 'p', 'a']
+    assert list(error.iter_path()) == ['y', 'x', 'query', 'p', 'a']
+    assert list(error.schema_path)[0] == 'z'
+
+
+def test_error_record_context():
+    child = ErrorRecord('child', path=[0])
+    error = ErrorRecord('parent', path=['a'], context=[child])
+
+    assert child.parent is error
+    assert list(child.absolute_path) == ['a', 0]
+
+
+def test_error_record_to_jsonschema():
+    child = ErrorRecord('%r is too short', ('',), validator='minLength')
+    error = ErrorRecord(
+        'parent', validator='anyOf', path=['a'], context=[child]
+    )
+
+    converted = error.to_jsonschema()
+    assert type(converted) is jsonschema.ValidationError
+    assert converted.message == 'parent'
+    assert list(converted.path) == ['a']
+    assert type(converted.context[0]) is jsonschema.ValidationError
+    assert converted.context[0].message == "'' is too short"
+    assert converted.context[0].parent is converted
+    # The attributes not given are left unset.
+    assert str(converted) == 'parent'
+
+
+def test_error_record_pickle():
+    error = ErrorRecord('%r is bad', (1,), validator='type', path=['a'])
+    error.prepend(('b',))
+
+    unpickled = pickle.loads(pickle.dumps(error))
+    assert unpickled.message == '1 is bad'
+    assert unpickled.validator == 'type'
+    assert list(unpickled.path) == ['b', 'a']
+
+
+def test_prepend_path_jsonschema():
+    error = jsonschema.ValidationError('x', path=['a'], schema_path=['b'])
+    prepend_path(error, ('c', 'd'), ('e',))
+    assert list(error.path) == ['c', 'd', 'a']
+    assert list(error.schema_path) == ['e', 'b']
+
+
+def test_unmarshal_error_error_record():
+    error = ErrorRecord('%r is bad', (1,), validator='type', path=['b'])
+    error.prepend(('a',))
+    assert UnmarshalError([error]).to_dict() == {
+        'parameters': [
+            {'path': ['a', 'b'], 'validator': 'type', 'message': '1 is bad'}
+        ]
+    }
+
+
+def test_unmarshal_error_max_errors():
+    errors = [ErrorRecord('bad', validator='type') for _ in range(3)]
+    error = UnmarshalError(errors[:2], errors[2:])
+
+    obj = error.to_dict(max_errors=1)
+
+    assert len(obj['parameters']) == 1
+    assert obj['request_body'] == []
+    assert obj['omitted'] == 2
+    assert 'omitted' not in error.to_dict(max_errors=3)
+
+
+def test_unmarshal_error_max_message_length():
+    error = ErrorRecord('%r is bad', ('x' * 100,), validator='type')
+
+    obj = UnmarshalError([error]).to_dict(max_message_length=20)
+
+    assert obj['parameters'][0]['message'] == "'xxxxxxxxxxxxxxxx..."
+
+
+def test_unmarshal_error_short_instance_repr():
+    instance = 'x' * 100
+    error = ErrorRecord(
+        '%r is not of type %r',
+        (instance, 'integer'),
+        validator='type',
+        instance=instance,
+    )
+
+    message = error.format_message(max_length=10)
+
+    assert message.endswith(" is not of type 'integer'")
+    assert len(message) < 40
+
+
+@pytest.mark.parametrize(
+    'instance,expected',
+    [
+        ({'password': 'secret'}, '<object> is not valid'),
+        (['secret'], '<array> is not valid'),
+        ('secret', '<string> is not valid'),
+        (1, '<integer> is not valid'),
+        (True, '<boolean> is not valid'),
+        (None, '<null> is not valid'),
+    ],
+)
+def test_unmarshal_error_no_instance_repr(instance, expected):
+    error = ErrorRecord(
+        '%r is not valid', (instance,), validator='not', instance=instance
+    )
+
+    obj = UnmarshalError([error]).to_dict(instance_repr=False)
+
+    assert obj['parameters'][0]['message'] == expected
+
+
+@pytest.mark.parametrize(
+    'message,instance,expected',
+    [
+        ("'secret' is not valid", 'secret', '<string> is not valid'),
+        ("'x' is a required property", {}, "'x' is a required property"),
+        (
+            "{'const': 1} is not allowed for 1",
+            1,
+            "{'const': 1} is not allowed for <integer>",
+        ),
+        ("Not 'secret' again", 'secret', "Failed validating 'not'"),
+    ],
+)
+def test_unmarshal_error_no_instance_repr_jsonschema(
+    message, instance, expected
+):
+    error = jsonschema.ValidationError(
+        message, validator='not', instance=instance
+    )
+
+    obj = UnmarshalError([error]).to_dict(instance_repr=False)
+
+    assert obj['parameters'][0]['message'] == expected
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+import datetime
+import functools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from oas.executors import initialize_worker
+from oas.executors import submit_request_body
+from oas.executors import unmarshal_many
+from oas.request_body.models import RequestBody
+from oas.schema.unmarshalers import SchemaUnmarshaler
+from oas.spec import create_spec_from_dict
+
+# ``initializer`` of ``ProcessPoolExecutor`` is new in Python 3.7.
+requires_initializer = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason='requires Python 3.7 or later'
+)
+
+
+class MockRequestBody(RequestBody):
+    uri_template = '/api/v1/pets/{pet_id}'
+    method = 'patch'
+    media_type = 'application/json'
+
+    def __init__(self, media, body=None):
+        self._media = media
+        self.body = body
+
+    @property
+    def media(self):
+        return self._media
+
+    @property
+    def content_length(self):
+        return len(self.body) if self.body is not None else 1
+
+
+@pytest.fixture
+def spec(petstore_dict):
+    return create_spec_from_dict(petstore_dict)
+
+
+@pytest.fixture
+def operation(spec):
+    return spec.get_operation(
+        '/api/v1/pets/{pet_id}', 'patch', 'application/json'
+    )
+
+
+def test_submit_request_body_thread(spec, operation):
+    request = MockRequestBody({'name': 'foo'})
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = submit_request_body(
+            executor, SchemaUnmarshaler(spec=spec), request, operation
+        )
+        request_body, errors = future.result()
+
+    assert request_body == {'name': 'foo'}
+    assert errors is None
+
+
+@requires_initializer
+@pytest.mark.parametrize(
+    'request_,expected',
+    [
+        (MockRequestBody(None, b'{"name": "foo"}'), {'name': 'foo'}),
+        (MockRequestBody({'name': 'bar'}), {'name': 'bar'}),
+    ],
+)
+def test_submit_request_body_process(petstore_dict, request_, expected):
+    executor = ProcessPoolExecutor(
+        max_workers=1,
+        initializer=initialize_worker,
+        initargs=(functools.partial(create_spec_from_dict, petstore_dict),),
+    )
+
+    with executor:
+        future = submit_request_body(executor, None, request_, None)
+        request_body, errors = future.result()
+
+    assert request_body == expected
+    assert errors is None
+
+
+@requires_initializer
+def test_submit_request_body_process_errors(petstore_dict):
+    executor = ProcessPoolExecutor(
+        max_workers=1,
+        initializer=initialize_worker,
+        initargs=(functools.partial(create_spec_from_dict, petstore_dict),),
+    )
+    request = MockRequestBody(None, b'{"name": 1}')
+
+    with executor:
+        future = submit_request_body(executor, None, request, None)
+        request_body, errors = future.result()
+
+    assert request_body is None
+    assert [list(e.path) for e in errors] == [['name']]
+    assert list(errors[0].schema_path)[0] == 'requestBody'
+
+
+@requires_initializer
+def test_submit_request_body_process_malformed(petstore_dict):
+    executor = ProcessPoolExecutor(
+        max_workers=1,
+        initializer=initialize_worker,
+        initargs=(functools.partial(create_spec_from_dict, petstore_dict),),
+    )
+    request = MockRequestBody(None, b'{')
+
+    with executor:
+        future = submit_request_body(executor, None, request, None)
+        with pytest.raises(ValueError):
+            future.result()
+
+
+@pytest.mark.parametrize('max_pending', [1, None])
+def test_unmarshal_many_thread(max_pending):
+    instances = [1, 'x', 3, 'y', 5]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(
+            unmarshal_many(
+                executor,
+                SchemaUnmarshaler(),
+                iter(instances),
+                {'type': 'integer'},
+                chunk_size=2,
+                max_pending=max_pending,
+            )
+        )
+
+    assert [r for r, _ in results] == [1, None, 3, None, 5]
+    assert [list(results[i][1][0].path) for i in (1, 3)] == [[1], [3]]
+
+
+@requires_initializer
+def test_unmarshal_many_process(petstore_dict):
+    executor = ProcessPoolExecutor(
+        max_workers=1,
+        initializer=initialize_worker,
+        initargs=(functools.partial(create_spec_from_dict, petstore_dict),),
+    )
+    schema = {'type': 'string', 'format': 'date'}
+    instances = ['2018-01-02', 1, '2018-01-03']
+
+    with executor:
+        results = list(
+            unmarshal_many(executor, None, instances, schema, chunk_size=2)
+        )
+
+    assert [r for r, _ in results] == [
+        datetime.date(2018, 1, 2),
+        None,
+        datetime.date(2018, 1, 3),
+    ]
+    assert list(results[1][1][0].path) == [1]
+
+
+@requires_initializer
+def test_unmarshal_many_process_discriminator():
+    spec_dict = {
+        'components': {
+            'schemas': {
+                'Pet': {
+                    'oneOf': [
+                        {'$ref': '#/components/schemas/Cat'},
+                        {'$ref': '#/components/schemas/Dog'},
+                    ],
+                    'discriminator': {'propertyName': 'kind'},
+                },
+                'Cat': {
+                    'type': 'object',
+                    'properties': {
+                        'kind': {'type': 'string'},
+                        'born': {'type': 'string', 'format': 'date'},
+                    },
+                },
+                'Dog': {
+                    'type': 'object',
+                    'properties': {'kind': {'type': 'string'}},
+                },
+            }
+        }
+    }
+    spec = create_spec_from_dict(spec_dict)
+    executor = ProcessPoolExecutor(
+        max_workers=1,
+        initializer=initialize_worker,
+        initargs=(functools.partial(create_spec_from_dict, spec_dict),),
+    )
+    schema = spec.data['components']['schemas']['Pet']
+    instances = [{'kind': 'Cat', 'born': '2018-01-02'}, {'kind': 'Dog'}]
+
+    with executor:
+        results = list(
+            unmarshal_many(
+                executor, SchemaUnmarshaler(spec=spec), instances, schema
+            )
+        )
+
+    assert results == [
+        ({'kind': 'Cat', 'born': datetime.date(2018, 1, 2)}, None),
+        ({'kind': 'Dog'}, None),
+    ]
+
+
+def test_unmarshal_many_empty():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        results = list(
+            unmarshal_many(executor, SchemaUnmarshaler(), [], {'type': 'x'})
+        )
+
+    assert results == []
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from oas.refs import resolve_refs
+
+
+def test_resolve_refs():
+    document = {
+        'a': {'$ref': '#/definitions/x'},
+        'b': [{'$ref': '#/definitions/x'}, {'$ref': '#/definitions/y/0'}],
+        'definitions': {'x': {'type': 'string'}, 'y': [{'type': 'integer'}]},
+    }
+    result, stats = resolve_refs(document)
+
+    assert result == {
+        'a': {'type': 'string'},
+        'b': [{'type': 'string'}, {'type': 'integer'}],
+        'definitions': {
+            'x': {'type': 'string'},
+            'y': [{'type': 'integer'}],
+        },
+    }
+    assert result['a'] is result['definitions']['x']
+    assert result['b'][0] is result['definitions']['x']
+    assert result['b'][1] is result['definitions']['y'][0]
+    assert result['definitions'] is not document['definitions']
+    assert stats.refs == 3
+    assert stats.nodes == 6
+    assert stats.seconds >= 0
+
+
+def test_resolve_refs_recursive():
+    document = {
+        'definitions': {
+            'node': {
+                'type': 'object',
+                'properties': {'next': {'$ref': '#/definitions/node'}},
+            }
+        }
+    }
+    result, _ = resolve_refs(document)
+
+    node = result['definitions']['node']
+    assert node['properties']['next'] is node
+
+
+def test_resolve_refs_escaped_and_chained():
+    document = {
+        'a': {'$ref': '#/b/x'},
+        'b': {'$ref': '#/c'},
+        'c': {'x': {'$ref': '#/d~1e'}},
+        'd/e': {'type': 'string'},
+    }
+    result, _ = resolve_refs(document)
+
+    assert result['a'] is result['d/e']
+    assert result['b'] is result['c']
+
+
+def test_resolve_refs_unresolvable():
+    document = {
+        'a': {'$ref': 'http://example.com/schema.json'},
+        'b': {'$ref': '#/unknown'},
+        'c': {'$ref': '#/c'},
+        'd': {'$ref': '#/e/x'},
+        'e': {'$ref': '#/d/x'},
+    }
+    result, stats = resolve_refs(document)
+
+    assert result == document
+    assert result['a'] is not document['a']
+    assert stats.refs == 0
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from oas.routers import Router
+
+
+@pytest.fixture
+def router():
+    return Router(
+        [
+            '/',
+            '/pets',
+            '/pets/',
+            '/pets/{pet_id}',
+            '/pets/mine',
+            '/pets/{pet_id}/photos/{photo_id}',
+            '/pets/mine/photos/latest',
+            '/files/{name}.{ext}',
+            '/files/{path}',
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    'path,expected',
+    [
+        ('/', ('/', {})),
+        ('/pets', ('/pets', {})),
+        ('/pets/', ('/pets/', {})),
+        ('/pets/1', ('/pets/{pet_id}', {'pet_id': '1'})),
+        ('/pets/mine', ('/pets/mine', {})),
+        (
+            '/pets/1/photos/2',
+            (
+                '/pets/{pet_id}/photos/{photo_id}',
+                {'pet_id': '1', 'photo_id': '2'},
+            ),
+        ),
+        ('/pets/mine/photos/latest', ('/pets/mine/photos/latest', {})),
+        (
+            '/pets/mine/photos/2',
+            (
+                '/pets/{pet_id}/photos/{photo_id}',
+                {'pet_id': 'mine', 'photo_id': '2'},
+            ),
+        ),
+        (
+            '/files/a.b.json',
+            ('/files/{name}.{ext}', {'name': 'a', 'ext': 'b.json'}),
+        ),
+        ('/files/readme', ('/files/{path}', {'path': 'readme'})),
+        ('/pets/1/photos', None),
+        ('/pets//photos/2', None),
+        ('/unknown', None),
+        ('pets', None),
+    ],
+)
+def test_match(router, path, expected):
+    assert router.match(path) == expected
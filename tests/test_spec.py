@@ -21,7 +21,8 @@ def test_create_spec_from_dict(petstore_dict):
     spec = create_spec_from_dict(petstore_dict)
 
     schemas = spec['components']['schemas']
-    assert schemas['PetNew']['allOf'][0] == schemas['PetUpdate']
+    assert schemas['PetNew']['allOf'][0] is schemas['PetUpdate']
+    assert spec.load_stats.refs > 0
 
 
 def test_spec_get_operation_parameters(petstore_dict, media_type):
@@ -63,6 +64,81 @@ def test_spec_get_operation_request_body_undocumented_media_type(
         spec.get_operation('/api/v1/pets', 'post', 'text/plain')
 
 
+def test_spec_get_operation_cached(petstore_dict, media_type):
+    spec = create_spec_from_dict(petstore_dict)
+
+    operation = spec.get_operation('/api/v1/pets', 'post', media_type)
+    assert spec.get_operation('/api/v1/pets', 'post', media_type) is operation
+
+
+def test_spec_get_operation_not_method(petstore_dict):
+    petstore_dict['paths']['/v1/pets']['parameters'] = []
+    spec = create_spec_from_dict(petstore_dict)
+
+    assert spec.get_operation('/api/v1/pets', 'parameters', None) is None
+
+
+def test_spec_compile(mocker, petstore_dict, media_type):
+    spec = create_spec_from_dict(petstore_dict)
+    schema_unmarshaler = mocker.Mock()
+
+    assert spec.compile(schema_unmarshaler) is spec
+
+    schemas = spec['components']['schemas']
+    schema_unmarshaler.compile.assert_any_call(schemas['PetNew'])
+    schema_unmarshaler.compile.assert_any_call(schemas['PetUpdate'])
+
+
+def test_spec_compile_parameters(mocker, petstore_dict):
+    compile_parameters = mocker.patch('oas.spec.compile_parameters')
+    spec = create_spec_from_dict(petstore_dict)
+
+    spec.compile()
+
+    operation = spec.get_operation('/api/v1/pets', 'get', None)
+    compile_parameters.assert_any_call(operation['parameters'])
+
+
+def test_spec_compile_parameters_plan(petstore_dict):
+    spec = create_spec_from_dict(petstore_dict).compile()
+
+    operation = spec.get_operation('/api/v1/pets', 'get', None)
+    assert operation['parameters'].plan is not None
+
+
+def test_spec_freeze(mocker, petstore_dict):
+    spec = create_spec_from_dict(petstore_dict)
+    schema_unmarshaler = mocker.Mock()
+    mocker.patch.object(spec, 'compile')
+    freeze = mocker.patch('gc.freeze', create=True)
+
+    assert spec.freeze(schema_unmarshaler) is spec
+
+    spec.compile.assert_called_once_with(schema_unmarshaler)
+    freeze.assert_called_once_with()
+
+
+def test_spec_match_operation(petstore_dict, media_type):
+    spec = create_spec_from_dict(petstore_dict)
+
+    operation, path_params = spec.match_operation(
+        '/api/v1/pets/42', 'get', media_type
+    )
+    assert operation is spec.get_operation(
+        '/api/v1/pets/{pet_id}', 'get', media_type
+    )
+    assert path_params == {'pet_id': '42'}
+
+
+@pytest.mark.parametrize(
+    'path,method', [('/v1/pets/42', 'get'), ('/api/v1/pets/42', 'post')]
+)
+def test_spec_match_operation_none(petstore_dict, media_type, path, method):
+    spec = create_spec_from_dict(petstore_dict)
+
+    assert spec.match_operation(path, method, media_type) is None
+
+
 def test_spec_get_operation_unknown_base_path():
     spec = create_spec_from_dict({'servers': [{'url': '/api'}], 'paths': {}})
     assert spec.get_operation('/path', 'get', None) is None
@@ -4,7 +4,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import pytest
+
+from oas.exceptions import MalformedJSON
 from oas.utils import cached_property
+from oas.utils import load_media
+from oas.utils import parse_query
 
 
 def test_cached_property():
@@ -20,3 +25,21 @@ def test_cached_property():
     obj = C()
     assert obj.called == 1
     assert obj.called == 1
+
+
+def test_load_media():
+    assert load_media('application/json', b'{"a": 1}') == {'a': 1}
+    assert load_media('application/merge-patch+json', b'[]') == []
+    assert load_media('text/plain', b'\xff') == b'\xff'
+
+
+@pytest.mark.parametrize('body', [b'{', b'"\xff"'])
+def test_load_media_malformed(body):
+    pytest.raises(MalformedJSON, load_media, 'application/json', body)
+
+
+def test_parse_query():
+    query = parse_query('a=1&b=2&a=3&c=')
+    assert query == {'a': '1', 'b': '2', 'c': ''}
+    assert query.getall('a') == ['1', '3']
+    assert query.getall('c') == ['']
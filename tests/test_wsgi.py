@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+
+from oas.schema.formats import Formats
+from oas.schema.unmarshalers import SchemaUnmarshaler
+from oas.spec import create_spec_from_dict
+from oas.wsgi import ENVIRON_PARAMETERS
+from oas.wsgi import ENVIRON_REQUEST_BODY
+from oas.wsgi import OASMiddleware
+from oas.wsgi import WSGIRequest
+
+
+def make_environ(method, path, query=None, body=None, headers=None):
+    environ = {
+        str('REQUEST_METHOD'): str(method),
+        str('PATH_INFO'): str(path),
+    }
+    if query is not None:
+        environ[str('QUERY_STRING')] = str(query)
+    if body is not None:
+        environ[str('CONTENT_TYPE')] = str('application/json')
+        environ[str('CONTENT_LENGTH')] = str(len(body))
+        environ[str('wsgi.input')] = io.BytesIO(body)
+    for k, v in (headers or {}).items():
+        environ[str(k)] = str(v)
+    setup_testing_defaults(environ)
+    return environ
+
+
+class App(object):
+    def __call__(self, environ, start_response):
+        self.environ = environ
+        self.body = environ['wsgi.input'].read()
+        start_response(str('200 OK'), [])
+        return [b'ok']
+
+
+@pytest.fixture
+def app():
+    return App()
+
+
+@pytest.fixture
+def middleware(petstore_dict, app):
+    return OASMiddleware(app, create_spec_from_dict(petstore_dict))
+
+
+def call(middleware, environ):
+    statuses = []
+
+    def start_response(status, headers):
+        statuses.append(status)
+
+    body = b''.join(middleware(environ, start_response))
+    return statuses[0], body
+
+
+def test_middleware(middleware, app):
+    body = b'{"name": "foo"}'
+    environ = make_environ(
+        'PATCH',
+        '/api/v1/pets/42',
+        query='page=2&page=3',
+        body=body,
+        headers={'HTTP_X_API_VERSION': 'v2', 'HTTP_COOKIE': 'tracking=x'},
+    )
+
+    status, _ = call(middleware, environ)
+
+    assert status == '200 OK'
+    assert app.environ[ENVIRON_PARAMETERS] == {
+        'path': {'pet_id': 42},
+        'query': {'page': 2},
+        'header': {'X-API-Version': 'v2'},
+        'cookie': {'tracking': 'x'},
+    }
+    assert app.environ[ENVIRON_REQUEST_BODY] == {'name': 'foo'}
+    assert app.body == body
+
+
+@pytest.mark.parametrize(
+    'method,path', [('GET', '/unknown'), ('PUT', '/api/v1/pets/42')]
+)
+def test_middleware_pass_through(middleware, app, method, path):
+    environ = make_environ(method, path)
+
+    status, _ = call(middleware, environ)
+
+    assert status == '200 OK'
+    assert ENVIRON_PARAMETERS not in app.environ
+
+
+def test_middleware_unmarshal_error(middleware):
+    environ = make_environ('PATCH', '/api/v1/pets/x', body=b'{"name": 1}')
+
+    status, body = call(middleware, environ)
+
+    assert status == '400 Bad Request'
+    errors = json.loads(body.decode('utf-8'))
+    assert errors['parameters'][0]['path'] == ['path', 'pet_id']
+    assert errors['request_body'][0]['path'] == ['name']
+
+
+def test_middleware_malformed_json(middleware):
+    environ = make_environ('PATCH', '/api/v1/pets/42', body=b'{')
+
+    status, _ = call(middleware, environ)
+
+    assert status == '400 Bad Request'
+
+
+def test_middleware_undocumented_media_type(middleware):
+    environ = make_environ(
+        'PATCH',
+        '/api/v1/pets/42',
+        body=b'name=foo',
+        headers={'CONTENT_TYPE': 'application/x-www-form-urlencoded'},
+    )
+
+    status, _ = call(middleware, environ)
+
+    assert status == '415 Unsupported Media Type'
+
+
+@pytest.mark.parametrize(
+    'query,expected', [('page=2', '200 OK'), ('page=x', '400 Bad Request')]
+)
+def test_middleware_form(petstore_dict, app, query, expected):
+    request_body_spec_dict = petstore_dict['paths']['/v1/pets/{pet_id}'][
+        'patch'
+    ]['requestBody']
+    request_body_spec_dict['content']['application/x-www-form-urlencoded'] = {
+        'schema': {'type': 'object'}
+    }
+    middleware = OASMiddleware(app, create_spec_from_dict(petstore_dict))
+    environ = make_environ(
+        'PATCH',
+        '/api/v1/pets/42',
+        query=query,
+        body=b'name=foo',
+        headers={'CONTENT_TYPE': 'application/x-www-form-urlencoded'},
+    )
+
+    status, _ = call(middleware, environ)
+
+    assert status == expected
+    if status == '200 OK':
+        assert app.environ[ENVIRON_PARAMETERS]['query'] == {'page': 2}
+        assert app.environ[ENVIRON_REQUEST_BODY] is None
+        assert app.body == b'name=foo'
+
+
+def test_middleware_value_error(petstore_dict, app):
+    formats = Formats()
+
+    @formats.register('uuid', 'string')
+    def parse_uuid(value):
+        raise ValueError(value)
+
+    petstore_dict['components']['schemas']['PetUpdate']['properties'][
+        'name'
+    ]['format'] = 'uuid'
+    middleware = OASMiddleware(
+        app,
+        create_spec_from_dict(petstore_dict),
+        schema_unmarshaler=SchemaUnmarshaler(formats=formats),
+    )
+    environ = make_environ('PATCH', '/api/v1/pets/42', body=b'{"name": "x"}')
+
+    pytest.raises(ValueError, call, middleware, environ)
+
+
+def test_wsgi_request_header():
+    environ = make_environ(
+        'GET',
+        '/',
+        headers={'HTTP_X_FOO': 'foo', 'CONTENT_TYPE': 'text/plain'},
+    )
+    request = WSGIRequest(environ, '/', {})
+
+    assert request.header['x-foo'] == 'foo'
+    assert request.header['Content-Type'] == 'text/plain'
+    assert dict(request.header)['X-Foo'] == 'foo'
+    assert request.media_type == 'text/plain'
+
+
+def test_middleware_error_caps(petstore_dict, app):
+    middleware = OASMiddleware(
+        app,
+        create_spec_from_dict(petstore_dict),
+        max_message_length=10,
+        instance_repr=False,
+    )
+    environ = make_environ('PATCH', '/api/v1/pets/x', body=b'{"name": 1}')
+
+    status, body = call(middleware, environ)
+
+    assert status == '400 Bad Request'
+    errors = json.loads(body.decode('utf-8'))
+    assert errors['parameters'][0]['message'] == '<string...'
+
+
+def test_middleware_compile(mocker, petstore_dict, app):
+    spec = create_spec_from_dict(petstore_dict)
+    mocker.spy(spec, 'compile')
+
+    middleware = OASMiddleware(app, spec)
+
+    spec.compile.assert_called_once_with(middleware.schema_unmarshaler)